@@ -1,2 +1,19 @@
-from .core import consume, configure
 from .exceptions import ArggoAlreadyConfiguredError, ArggoReservedError
+
+__all__ = [
+    "consume",
+    "configure",
+    "ArggoAlreadyConfiguredError",
+    "ArggoReservedError",
+]
+
+
+def __getattr__(name):
+    # `arggo.core` (and, through it, the parser and experiment machinery) is only
+    # loaded once a decorator is actually looked up, so importing a submodule such
+    # as `arggo.parser` on its own stays cheap.
+    if name in ("consume", "configure"):
+        from . import core
+
+        return getattr(core, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,46 @@
+import os
+import pickle
+from os.path import join
+from typing import Dict, List, Optional, Tuple
+
+# Bump whenever the layout of an entry changes
+_DISCOVERY_FORMAT_VERSION = 1
+
+_CACHE_FILE_NAME = ".arggo_discovery.pickle"
+
+# A directory's (mtime_ns, script, sub_folders). `script` is the script recorded in the
+# directory's parameters.json, or None if it isn't a run. `sub_folders` are the names of
+# the directories left to scan below it, always empty for runs.
+DiscoveryEntry = Tuple[int, Optional[str], List[str]]
+
+
+class DiscoveryCache:
+    """What a previous lookup found under a logging directory, keyed by paths relative
+    to it. An entry stays valid for as long as its directory's mtime is unchanged, which
+    holds until an entry is added to, removed from or renamed in that directory."""
+
+    def __init__(self, logging_dir: str) -> None:
+        super().__init__()
+        self.path = join(logging_dir, _CACHE_FILE_NAME)
+
+    def load(self) -> Dict[str, DiscoveryEntry]:
+        try:
+            with open(self.path, "rb") as f:
+                version, entries = pickle.load(f)
+        except Exception:
+            # A missing, truncated or otherwise unreadable cache is just empty
+            return dict()
+        return entries if version == _DISCOVERY_FORMAT_VERSION else dict()
+
+    def store(self, entries: Dict[str, DiscoveryEntry]) -> bool:
+        # Write-then-rename, so concurrent lookups never observe a partial file
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump((_DISCOVERY_FORMAT_VERSION, entries), f, protocol=4)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        return True
@@ -0,0 +1,111 @@
+import dataclasses
+import os
+import re
+from enum import Enum
+from os.path import join
+from typing import Any, Optional
+
+# Bump whenever the layout of a compiled spec (or the logic producing it) changes,
+# so that specs written by an older Arggo are never picked up by a newer one.
+_SPEC_FORMAT_VERSION = 3
+
+# E.g. `<object object at 0x7f...>`, the default repr of objects, which differs in every process
+_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+
+
+def stable_repr(value: Any) -> str:
+    """A representation of `value` that is stable across processes. Plain `repr`
+    embeds memory addresses for functions and classes, which would never match."""
+    if isinstance(value, type) and issubclass(value, Enum):
+        members = ", ".join(f"{m.name}={m.value!r}" for m in value)
+        return f"{value.__module__}.{value.__qualname__}({members})"
+    if callable(value) and hasattr(value, "__qualname__"):
+        return f"{getattr(value, '__module__', None)}.{value.__qualname__}"
+    if isinstance(value, dict):
+        items = ", ".join(f"{k!r}: {stable_repr(v)}" for k, v in value.items())
+        return f"{{{items}}}"
+    return repr(value)
+
+
+def spec_cache_key(dtype, salt: str = "") -> Optional[str]:
+    """Derive a cache key from the definition of the dataclass `dtype`: its name and
+    every field's name, type, default (or default factory) and metadata. Any change to the
+    dataclass (or to `salt`) yields a different key, which invalidates previously cached specs.
+
+    :return: The key, or None if part of the definition has no representation that is stable
+    across processes (such as an object's default repr), so that its spec can't be cached
+    """
+    parts = [
+        str(_SPEC_FORMAT_VERSION),
+        salt,
+        f"{dtype.__module__}.{dtype.__qualname__}",
+    ]
+    for field in dataclasses.fields(dtype):
+        if field.default_factory is not dataclasses.MISSING:
+            # Not the value it returns: calling it runs user code, and cached specs get
+            # fresh values from it anyway
+            default = f"factory {stable_repr(field.default_factory)}"
+        else:
+            default = stable_repr(field.default)
+        parts.append(
+            "|".join(
+                (
+                    field.name,
+                    str(field.init),
+                    stable_repr(field.type),
+                    default,
+                    stable_repr(dict(field.metadata)),
+                )
+            )
+        )
+    text = "\n".join(parts)
+    if _ADDRESS.search(text) is not None:
+        return None
+    import hashlib
+
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    return f"{dtype.__qualname__}-{digest}"
+
+
+class SpecCache:
+    """A directory of pickled, compiled argument specs, one file per key."""
+
+    def __init__(self, cache_dir: str) -> None:
+        super().__init__()
+        self.cache_dir = cache_dir
+
+    def _path(self, key: str) -> str:
+        return join(self.cache_dir, f"{key}.pickle")
+
+    def load(self, key: str) -> Optional[Any]:
+        # Only needed once a cache is in use
+        import pickle
+
+        try:
+            with open(self._path(key), "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            # A missing, truncated or otherwise stale entry is just a cache miss
+            return None
+
+    def store(self, key: str, spec: Any) -> bool:
+        import pickle
+
+        try:
+            payload = pickle.dumps(spec)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            # E.g. a mapped_field() with a lambda mapper. Such specs are simply
+            # recompiled by every process.
+            return False
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write-then-rename, so concurrent processes never observe a partial file
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        return True
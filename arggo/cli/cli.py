@@ -1,14 +1,29 @@
+import datetime
 import json
 import os
+import re
 import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from itertools import repeat
 from os.path import join
+from typing import List, Optional
 
 import jinja2
 from interactive_argparse import PyInquirerPrompter, Question, QuestionKind
 
-from arggo.experiment import FinishedExperiment
+from arggo._internal.discovery_cache import DiscoveryCache
+from arggo.experiment import ExperimentIndex, FinishedExperiment
+from arggo.cli.logs import follow, search_lines, tail_lines
+from arggo.launcher import run_subprocesses
+from arggo.log_rotation import log_segments
+from arggo.parser import HydraSweep
+from arggo.profiling import render_profile
 
 _DIR = os.path.dirname(os.path.realpath(__file__))
+_OUTPUT_FILE_NAME = "output.log"
 
 
 def write_new_file(template_file: str, output_file: str, *args, **kwargs):
@@ -36,55 +51,323 @@ def experiment_run(name: str):
     subprocess.run([executable, command, "--arggo_interactive"])
 
 
-def _validate_parameters_file(file_path: str, experiment_name: str):
+def experiment_launch(
+    name: str, args: List[str], logging_dir: str, max_concurrency: int
+):
+    # Every point of the sweep becomes its own run of the script, in its own process
+    executable = "python"
+    command = f"{name}.py"
+    commands = ([executable, command, *run_args] for run_args in HydraSweep(args))
+    log_dir = join(
+        logging_dir, "launches", datetime.datetime.now().strftime("%Y-%m-%d/%H-%M-%S")
+    )
+
+    def report(index: int, exit_code: int):
+        print(f"Run {index} exited with code {exit_code}")
+
+    exit_codes = run_subprocesses(commands, log_dir, max_concurrency, on_exit=report)
+    failed = sum(1 for exit_code in exit_codes if exit_code != 0)
+    print(
+        f"{len(exit_codes) - failed} of {len(exit_codes)} runs succeeded. "
+        f"Their output is in {log_dir}"
+    )
+
+
+# parameters.json files end with their "__arggo" metadata section, so the script name
+# can usually be found without reading (let alone parsing) the whole file.
+_PARAMETERS_TAIL_SIZE = 8192
+_SCRIPT_PATTERN = re.compile(r'"script":\s*("(?:[^"\\]|\\.)*"|null)')
+
+
+def _read_script(file_path: str):
+    with open(file_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - _PARAMETERS_TAIL_SIZE))
+        tail = f.read().decode("utf-8", errors="replace")
+    metadata_start = tail.rfind('"__arggo"')
+    if metadata_start != -1:
+        match = _SCRIPT_PATTERN.search(tail, metadata_start)
+        if match is not None:
+            return json.loads(match.group(1))
+    # An unusually large metadata section: fall back to parsing the whole file
     with open(file_path) as f:
         parameters = json.load(f)
-        metaparams = dict(parameters["__arggo"])
-        script = metaparams.get("script", None)
-        if script is None:
-            return False
-
-        return script.split("/")[-1].replace(".py", "") == experiment_name.replace(
-            ".py", ""
-        )
+    return dict(parameters["__arggo"]).get("script", None)
 
 
-def _is_experiment_subfolder(path: str, experiment_name: str):
-    parameters_file_path = join(path, "parameters.json")
-    return os.path.isfile(parameters_file_path) and _validate_parameters_file(
-        parameters_file_path, experiment_name
+def _is_experiment(script: str, experiment_name: str):
+    return script.split("/")[-1].replace(".py", "") == experiment_name.replace(
+        ".py", ""
     )
 
 
-def _lookup_experiments(base_dir: str, experiment_name: str):
+def _is_any_experiment(script: str):
+    return True
+
+
+def _validate_parameters_file(file_path: str, experiment_name: str):
+    try:
+        script = _read_script(file_path)
+    except (OSError, ValueError, KeyError):
+        return False
+    return script is not None and _is_experiment(script, experiment_name)
+
+
+def _scan_directory(path: str):
+    """Scan one directory: return the script its parameters.json records (None if it
+    isn't a run), and the names of the subdirectories left to scan. A run's own
+    subdirectories are never descended into."""
+    sub_folders = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name == "parameters.json" and entry.is_file():
+                try:
+                    return _read_script(entry.path), []
+                except (OSError, ValueError, KeyError):
+                    return None, []
+            if entry.is_dir():
+                sub_folders.append(entry.name)
+    return None, sub_folders
+
+
+def _scan_directories(base_dir: str, keys: List[str], cached: dict):
+    scans = []
+    for key in keys:
+        path = join(base_dir, key)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            # Removed since its parent was scanned
+            continue
+        entry = cached.get(key, None)
+        unchanged = entry is not None and entry[0] == mtime
+        if not unchanged:
+            entry = (mtime, *_scan_directory(path))
+        scans.append((key, entry, unchanged))
+    return scans
+
+
+def _lookup_experiments(
+    base_dir: str,
+    experiment_name: Optional[str],
+    max_workers: int = 32,
+    use_cache: bool = True,
+):
     """
-    A recursive method to look up directories which contain previously run experiments.
+    Look up directories which contain previously run experiments. Directories are scanned concurrently on a thread
+    pool, which hides the latency of each `os.scandir` on network filesystems. What was found is cached in `base_dir`:
+    later lookups only rescan directories whose mtime changed since, and take known runs in unchanged directories as
+    they are, without as much as a stat.
     :param base_dir: The base (root) dir to lookup from
-    :param experiment_name: The experiment name to look for
-    :return:
+    :param experiment_name: The experiment name to look for, or None for the runs of every experiment
+    :param max_workers: The number of directories scanned at once
+    :param use_cache: Whether to use (and update) the discovery cache
+    :return: The found directories, in no particular order
     """
+    cache = DiscoveryCache(base_dir)
+    cached = cache.load() if use_cache else dict()
+    entries = dict()
+    # A directory modified within the mtime resolution of now may still change without
+    # its mtime doing so, so it is scanned again next time rather than cached
+    modified_before = time.time_ns() - 2 * 10**9
     found_directories = []
-    if _is_experiment_subfolder(base_dir, experiment_name):
-        found_directories.append(base_dir)
+    if experiment_name is None:
+        is_experiment = _is_any_experiment
+    else:
+        # Runs of the same script are plentiful
+        is_experiment = lru_cache(maxsize=None)(
+            partial(_is_experiment, experiment_name=experiment_name)
+        )
 
-    sub_folders_with_paths = [f.path for f in os.scandir(base_dir) if f.is_dir()]
-    for sub_folder in sub_folders_with_paths:
-        found_directories += _lookup_experiments(sub_folder, experiment_name)
+    def record(key, entry):
+        mtime, script, sub_folders = entry
+        if script is not None and is_experiment(script):
+            found_directories.append(join(base_dir, key))
+        if mtime < modified_before:
+            entries[key] = entry
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Breadth first: every directory of a level is scanned at once, in batches so
+        # the pool's per-task overhead doesn't outweigh a (cached) scandir. The base
+        # dir itself is never cached, as storing the cache modifies it.
+        script, level = _scan_directory(base_dir)
+        if script is not None:
+            return [base_dir] if is_experiment(script) else []
+        while level:
+            batch_size = max(1, len(level) // (max_workers * 4))
+            batches = [
+                level[i : i + batch_size] for i in range(0, len(level), batch_size)
+            ]
+            level = []
+            for scans in executor.map(
+                _scan_directories, repeat(base_dir), batches, repeat(cached)
+            ):
+                for key, entry, unchanged in scans:
+                    record(key, entry)
+                    for sub_folder in entry[2]:
+                        sub_key = key + os.sep + sub_folder
+                        sub_entry = cached.get(sub_key, None)
+                        if unchanged and sub_entry is not None and sub_entry[1]:
+                            # A run that was already there last time
+                            record(sub_key, sub_entry)
+                        else:
+                            level.append(sub_key)
+    if use_cache and entries != cached:
+        cache.store(entries)
     return found_directories
 
 
-def experiment_reproduce(name: str, base_dir: str):
-    found_experiments = sorted(_lookup_experiments(base_dir, name))
-    if len(found_experiments) == 0:
-        print("No experiments found to reproduce")
+def _find_experiments(base_dir: str, experiment_name: str, by_start: bool = False):
+    """The runs of `experiment_name` under `base_dir`, sorted by path, or with `by_start`, by when they started."""
+    index = ExperimentIndex.for_logging_dir(base_dir)
+    if index.exists():
+        if not index.is_complete():
+            # Created by the first run that recorded itself: add the runs from before it, once
+            _reindex(base_dir, index)
+        return index.find(experiment_name, by_start)
+    found_experiments = sorted(_lookup_experiments(base_dir, experiment_name))
+    if by_start:
+        found_experiments.sort(key=_started)
+    return found_experiments
+
+
+def _started(run_dir: str, parameters: Optional[dict] = None):
+    """When the run in `run_dir` started: as it recorded, or for runs that didn't, when its parameters were saved."""
+    parameters_file_path = join(run_dir, "parameters.json")
+    if parameters is None:
+        try:
+            with open(parameters_file_path) as f:
+                parameters = json.load(f)
+        except (OSError, ValueError):
+            parameters = dict()
+    started = dict(parameters.get("__arggo", dict())).get("started", None)
+    if started is None:
+        try:
+            started = os.path.getmtime(parameters_file_path)
+        except OSError:
+            started = 0.0
+    return started
+
+
+def _read_run(run_dir: str):
+    """The `(run_dir, script, parameters, started)` of the run in `run_dir`, or None if its parameters file can't be
+    read (e.g. it is still being written) or doesn't record its script."""
+    try:
+        with open(join(run_dir, "parameters.json")) as f:
+            parameters = json.load(f)
+        started = _started(run_dir, parameters)
+        script = dict(parameters.pop("__arggo"))["script"]
+    except (OSError, ValueError, KeyError, AttributeError, TypeError):
+        return None
+    if script is None:
+        return None
+    return run_dir, script, parameters, started
+
+
+def _reindex(base_dir: str, index: ExperimentIndex, max_workers: int = 32):
+    run_dirs = _lookup_experiments(base_dir, None, max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        runs = [run for run in executor.map(_read_run, run_dirs) if run is not None]
+    index.add_many(runs)
+    index.mark_complete()
+    return len(runs)
+
+
+def experiment_reindex(base_dir: str):
+    index = ExperimentIndex.for_logging_dir(base_dir)
+    count = _reindex(base_dir, index)
+    print(f"Indexed {count} runs into {index.path}")
+
+
+def _resource_usage(run_dir: str):
+    try:
+        with open(join(run_dir, "parameters.json")) as f:
+            return dict(json.load(f)["__arggo"]).get("resources", dict())
+    except (OSError, ValueError, KeyError):
+        return dict()
+
+
+def experiment_list(name: str, base_dir: str, sort_by: Optional[str] = None):
+    experiment_paths = _find_experiments(base_dir, name)
+    if sort_by is None:
+        for experiment_path in experiment_paths:
+            print(experiment_path)
         return
+    usages = [
+        (experiment_path, _resource_usage(experiment_path).get(sort_by, None))
+        for experiment_path in experiment_paths
+    ]
+    # Most expensive first; runs that didn't record it (e.g. still running) last
+    usages.sort(key=lambda usage: (usage[1] is not None, usage[1] or 0), reverse=True)
+    for experiment_path, value in usages:
+        print(f"{experiment_path}\t{'-' if value is None else value}")
+
+
+def _select_experiment(base_dir: str, experiment_name: str, message: str):
+    found_experiments = _find_experiments(base_dir, experiment_name)
+    if len(found_experiments) == 0:
+        return None
     question = Question(
         name="experiment_path",
-        message="Found these experiments. Select one to reproduce:",
+        message=message,
         kind=QuestionKind.SINGLE_CHOICE,
         choices=found_experiments,
     )
     answers = PyInquirerPrompter()([question])
-    experiment_path = answers["experiment_path"]
+    return answers["experiment_path"]
+
+
+def experiment_reproduce(name: str, base_dir: str):
+    experiment_path = _select_experiment(
+        base_dir, name, "Found these experiments. Select one to reproduce:"
+    )
+    if experiment_path is None:
+        print("No experiments found to reproduce")
+        return
     experiment = FinishedExperiment(experiment_path)
     experiment.reproduce()
+
+
+def experiment_logs(
+    name: str,
+    base_dir: str,
+    run: Optional[str] = None,
+    latest: bool = False,
+    lines: Optional[int] = None,
+    pattern: Optional[str] = None,
+    follow_output: bool = False,
+):
+    if run is None and latest:
+        found_experiments = _find_experiments(base_dir, name, by_start=True)
+        run = found_experiments[-1] if found_experiments else None
+    elif run is None:
+        run = _select_experiment(
+            base_dir, name, "Found these experiments. Select one to view its logs:"
+        )
+    if run is None:
+        print("No experiments found")
+        return
+    log_path = join(run, _OUTPUT_FILE_NAME)
+    if not log_segments(log_path):
+        print(f"No {_OUTPUT_FILE_NAME} in {run}")
+        return
+    out = sys.stdout.buffer
+    if pattern is not None:
+        for line in search_lines(log_path, pattern):
+            out.write(line)
+    elif lines is not None or not follow_output:
+        out.writelines(tail_lines(log_path, 10 if lines is None else lines))
+    out.flush()
+    if follow_output and os.path.exists(log_path):
+        try:
+            for chunk in follow(log_path):
+                out.write(chunk)
+                out.flush()
+        except KeyboardInterrupt:
+            pass
+
+
+def experiment_profile(run: str, sort: str = "cumulative", limit: int = 30):
+    if not render_profile(run, sort, limit):
+        print(f"No profile found in {run}. Profile a run with --arggo_profile")
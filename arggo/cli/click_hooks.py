@@ -32,8 +32,116 @@ def reproduce(name: str, logging_dir: str):
     experiment_reproduce(name, logging_dir)
 
 
+@experiment.command(name="list")
+@click.argument("name", nargs=1)
+@click.option(
+    "--logging_dir",
+    type=str,
+    default="logs",
+    help="The directory in which to look for experiments",
+)
+@click.option(
+    "--sort_by",
+    type=click.Choice(
+        [
+            "wall_seconds",
+            "user_seconds",
+            "system_seconds",
+            "children_user_seconds",
+            "children_system_seconds",
+            "peak_rss_bytes",
+            "read_bytes",
+            "write_bytes",
+        ]
+    ),
+    default=None,
+    help="List the runs by what they used, most first",
+)
+def list_(name: str, logging_dir: str, sort_by: str):
+    """List the saved runs of experiment NAME."""
+    experiment_list(name, logging_dir, sort_by)
+
+
+@experiment.command()
+@click.option(
+    "--logging_dir",
+    type=str,
+    default="logs",
+    help="The directory whose runs to index",
+)
+def reindex(logging_dir: str):
+    """Record every run under the logging directory in its experiment index, e.g. runs saved
+    before the index existed."""
+    experiment_reindex(logging_dir)
+
+
 @experiment.command()
 @click.argument("name", nargs=1)
 def run(name: str):
     print(f"Running experiment {name} interactively...")
     experiment_run(name)
+
+
+@experiment.command(context_settings=dict(ignore_unknown_options=True))
+@click.argument("name", nargs=1)
+@click.argument("args", nargs=-1, type=click.UNPROCESSED)
+@click.option(
+    "--max_concurrency",
+    type=int,
+    default=64,
+    help="The maximal number of runs in flight at once",
+)
+@click.option(
+    "--logging_dir",
+    type=str,
+    default="logs",
+    help="The directory under which the output of each run is saved",
+)
+def launch(name: str, args, max_concurrency: int, logging_dir: str):
+    """Launch one run of experiment NAME for every combination of swept key=value ARGS
+    (e.g. lr=0.1,0.01 seed=range(0,100)), as concurrent subprocesses."""
+    print(f"Launching experiment {name}...")
+    experiment_launch(name, list(args), logging_dir, max_concurrency)
+
+
+@experiment.command()
+@click.argument("name", nargs=1)
+@click.option(
+    "--logging_dir",
+    type=str,
+    default="logs",
+    help="The directory in which to look for experiments",
+)
+@click.option("--run", type=str, default=None, help="The run directory to view")
+@click.option("--latest", is_flag=True, help="View the most recent run")
+@click.option("-n", "--lines", type=int, default=None, help="Show the last N lines")
+@click.option("--grep", type=str, default=None, help="Show lines matching a regex")
+@click.option("-f", "--follow", is_flag=True, help="Keep printing appended output")
+def logs(
+    name: str,
+    logging_dir: str,
+    run: str,
+    latest: bool,
+    lines: int,
+    grep: str,
+    follow: bool,
+):
+    """View the output.log of a run of experiment NAME: its last lines (10 by default),
+    the lines matching a regex, or, like `tail -f`, whatever it appends from now on."""
+    experiment_logs(name, logging_dir, run, latest, lines, grep, follow)
+
+
+@experiment.command()
+@click.argument("run", nargs=1, type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--sort",
+    type=str,
+    default="cumulative",
+    help="The key to sort a cProfile profile by, e.g. cumulative, tottime or calls",
+)
+@click.option(
+    "-n", "--limit", type=int, default=30, help="Show that many functions at most"
+)
+def profile(run: str, sort: str, limit: int):
+    """Show the profile saved in RUN, a run directory of a task run with --arggo_profile."""
+    experiment_profile(run, sort, limit)
@@ -0,0 +1,142 @@
+# Views of (possibly very large, rotated) run logs that never read a whole file into
+# memory: plain files are memory mapped, so only the pages actually scanned are ever
+# loaded, and compressed segments are decompressed as a stream.
+import collections
+import mmap
+import os
+import re
+import time
+from typing import Iterator, List
+
+from arggo.log_rotation import log_segments, open_log_segment
+
+
+def _map(f):
+    # mmap refuses empty files
+    if os.fstat(f.fileno()).st_size == 0:
+        return None
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def tail_lines(path: str, count: int) -> List[bytes]:
+    """The last `count` lines of the log at `path`, reaching back into its rotated segments (newest first) if the
+    current file holds fewer. Plain files are scanned backwards from their end."""
+    lines = []
+    for segment_path in reversed(log_segments(path)):
+        if len(lines) >= count:
+            break
+        segment, compressed = open_log_segment(segment_path)
+        with segment:
+            if compressed:
+                # Segments end at line boundaries, so their lines simply follow each other
+                wanted = collections.deque(
+                    _segment_lines(segment), maxlen=count - len(lines)
+                )
+                lines = list(wanted) + lines
+            else:
+                lines = _tail_file(segment, count - len(lines)) + lines
+    return lines
+
+
+def _tail_file(f, count: int) -> List[bytes]:
+    mapped = _map(f)
+    if mapped is None or count <= 0:
+        return []
+    with mapped:
+        end = len(mapped)
+        # A trailing newline ends the last line rather than starting an empty one
+        start = end - 1 if mapped[end - 1 : end] == b"\n" else end
+        for _ in range(count):
+            start = mapped.rfind(b"\n", 0, start)
+            if start == -1:
+                break
+        else:
+            # Step over the newline that precedes the first wanted line
+            start += 1
+            return mapped[start:end].splitlines(keepends=True)
+        return mapped[:end].splitlines(keepends=True)
+
+
+def search_lines(path: str, pattern: str) -> Iterator[bytes]:
+    """Yield every line of the log at `path`, rotated segments included, in which the regular expression `pattern`
+    matches. As with grep, the pattern is matched against each line on its own: `^` and `$` anchor to its start and
+    end, and a match never runs on into the next line."""
+    regex = re.compile(pattern.encode("utf-8"), re.MULTILINE)
+    for segment_path in log_segments(path):
+        segment, compressed = open_log_segment(segment_path)
+        with segment:
+            if compressed:
+                for line in _segment_lines(segment):
+                    if regex.search(line, 0, len(line.rstrip(b"\n"))) is not None:
+                        yield line
+            else:
+                yield from _search_file(segment, regex)
+
+
+def _search_file(f, regex) -> Iterator[bytes]:
+    mapped = _map(f)
+    if mapped is None:
+        return
+    with mapped:
+        position = 0
+        while position < len(mapped):
+            match = regex.search(mapped, position)
+            if match is None:
+                return
+            line_start = mapped.rfind(b"\n", 0, match.start()) + 1
+            content_end = mapped.find(b"\n", match.start())
+            content_end = len(mapped) if content_end == -1 else content_end
+            line_end = min(content_end + 1, len(mapped))
+            # A match across lines (e.g. of `\s`) only counts if the line matches on its own
+            if (
+                match.end() <= content_end
+                or regex.search(mapped, line_start, content_end) is not None
+            ):
+                yield mapped[line_start:line_end]
+            # At most once per line
+            position = line_end
+
+
+def _segment_lines(segment, chunk_size: int = 1 << 20) -> Iterator[bytes]:
+    """The lines of a (decompressing) stream, holding at most about `chunk_size` bytes at once."""
+    remainder = b""
+    while True:
+        chunk = segment.read(chunk_size)
+        if not chunk:
+            break
+        lines = (remainder + chunk).split(b"\n")
+        remainder = lines.pop()
+        for line in lines:
+            yield line + b"\n"
+    if remainder:
+        yield remainder
+
+
+def follow(path: str, poll_interval: float = 0.5) -> Iterator[bytes]:
+    """Like `tail -f`: yield whatever is appended to the file at `path` from now on (the
+    time of this call, not of the first `next`), forever. If the file is replaced or
+    truncated (e.g. rotated), follow it from its start."""
+    f = open(path, "rb")
+    f.seek(0, os.SEEK_END)
+    return _follow(path, f, poll_interval)
+
+
+def _follow(path: str, f, poll_interval: float) -> Iterator[bytes]:
+    try:
+        while True:
+            chunk = f.read(1 << 16)
+            if chunk:
+                yield chunk
+                continue
+            time.sleep(poll_interval)
+            try:
+                current = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if current.st_ino != os.fstat(f.fileno()).st_ino:
+                f.close()
+                f = open(path, "rb")
+            elif current.st_size < f.tell():
+                f.seek(0)
+    finally:
+        f.close()
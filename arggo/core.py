@@ -1,19 +1,34 @@
 import argparse
+import atexit
 import functools
 import os
 import sys
+import time
 from argparse import ArgumentParser, Namespace
 from dataclasses import fields, is_dataclass
 from os.path import join
-from typing import Any, Callable, Optional, get_type_hints, Union, Text, Sequence, List
-from rich.console import Console
-
-console = Console()
-
-from .experiment import NewExperiment
+from typing import (
+    Any,
+    Callable,
+    FrozenSet,
+    Optional,
+    get_type_hints,
+    Union,
+    Text,
+    Sequence,
+    List,
+    Dict,
+)
+
+from .experiment import ExperimentIndex, NewExperiment
+from .experiment.experiment import (
+    DEFAULT_PLUGIN_TIMEOUT,
+    record_plugin_outcomes,
+    record_resource_usage,
+    record_startup_profile,
+)
 from .exceptions import ArggoAlreadyConfiguredError, ArggoReservedError
-from . import integration  # noqa: F401 - importing registers the built-in plugins
-from .plugin import Plugin
+from .plugin import Plugin, PluginMeta, call_hooks
 
 if sys.version_info.major >= 3 and sys.version_info.minor >= 8:
     from typing import Protocol
@@ -22,16 +37,39 @@ else:
 
 from ._internal.global_store import GlobalStore
 from .environment.workdir import Workdir
+from .log_rotation import LogRotation
 from .logger import FileLogger
 from .parser import DataClassArgumentParser
-from interactive_argparse import InteractiveArgumentParser
+from .profiling import (
+    PROFILE_FILE_NAMES,
+    ResourceMeter,
+    StartupProfile,
+    profile_phase,
+    profiled,
+)
 
 _OUTPUT_FILE_NAME = "output.log"
+_STRUCTURED_OUTPUT_FILE_NAME = "output.jsonl"
 
 
 global_store = GlobalStore()
 
 
+@functools.lru_cache(maxsize=None)
+def _console():
+    """`rich` is only needed for the handful of messages Arggo prints itself, so it
+    is imported on first use rather than paying for it on every `import arggo`."""
+    from rich.console import Console
+
+    return Console()
+
+
+def _register_builtin_plugins() -> None:
+    # Importing the package registers the built-in plugins with `PluginMeta`. It
+    # is deferred until plugins are actually needed to keep `import arggo` cheap.
+    from . import integration  # noqa: F401
+
+
 class TaskFunction(Protocol):
     def __call__(self, a: Any, b: Any, **kwargs) -> Any:
         ...
@@ -65,9 +103,30 @@ def _init_work_directory(
     return workdir
 
 
-def _init_logging_to_file(output_dir: str, output_file_name: str = _OUTPUT_FILE_NAME):
+def _experiment_index(workdir: Workdir, logging_dir: str) -> ExperimentIndex:
+    # The index lives at the root of the logging directory, next to the dated run directories
+    return ExperimentIndex.for_logging_dir(
+        join(workdir.original_workdir(), logging_dir)
+    )
+
+
+def _init_logging_to_file(
+    output_dir: str,
+    output_file_name: str = _OUTPUT_FILE_NAME,
+    flush_interval: float = 1.0,
+    rotation: LogRotation = None,
+    structured: bool = False,
+):
     output_file_path = join(output_dir, output_file_name)
-    file_logger = FileLogger(global_store, output_file_path)
+    file_logger = FileLogger(
+        global_store,
+        output_file_path,
+        flush_interval=flush_interval,
+        rotation=rotation,
+        structured_output_file=(
+            join(output_dir, _STRUCTURED_OUTPUT_FILE_NAME) if structured else None
+        ),
+    )
     file_logger.bind()
 
 
@@ -86,25 +145,73 @@ def _add_meta_arguments(meta_parser: ArgumentParser) -> None:
         help=f"Use this argument to reproduce a configuration from a previously saved run. Must be either "
         f"a directory containing a parameters file, or a path to such a file",
     )
+    meta_parser.add_argument(
+        "--arggo_multirun",
+        action="store_true",
+        help="Run once for every combination of swept key=value arguments, e.g. lr=0.1,0.01 seed=range(0,10) "
+        "or data=inputs/*.csv. Each run gets its own numbered subdirectory of the work directory",
+    )
+    meta_parser.add_argument(
+        "--arggo_max_workers",
+        type=int,
+        default=None,
+        help="With --arggo_multirun, run that many jobs at a time in a pool of worker processes (0 for one per "
+        "CPU), instead of one after another in this process",
+    )
+    meta_parser.add_argument(
+        "--arggo_profile_startup",
+        nargs="?",
+        const="record",
+        choices=("record", "print"),
+        default=None,
+        help="Time each phase of Arggo's setup of the run into parameters.json (__arggo.startup_profile), "
+        "and with 'print', also print them as a table",
+    )
+    meta_parser.add_argument(
+        "--arggo_profile",
+        nargs="?",
+        const="cpu",
+        choices=tuple(PROFILE_FILE_NAMES),
+        default=None,
+        help="Profile the task, saving the profile into its run directory: with cProfile ('cpu', the default), "
+        "a sampling timer ('sample') or tracemalloc ('memory'). View it with `arggo experiment profile`",
+    )
+    _register_builtin_plugins()
     for plugin_cls in Plugin.registry:
         plugin_cls.add_meta_arguments(meta_parser)
 
 
-def _build_meta_parser() -> ArgumentParser:
+@functools.lru_cache(maxsize=1)
+def _cached_meta_parser(registry_version: int) -> ArgumentParser:
     meta_parser = ArgumentParser(add_help=False)
     _add_meta_arguments(meta_parser)
     return meta_parser
 
 
+@functools.lru_cache(maxsize=1)
+def _cached_reserved_argument_names(registry_version: int) -> FrozenSet[str]:
+    return frozenset(
+        action.dest
+        for action in _cached_meta_parser(registry_version)._actions
+        if action.dest != "help"
+    )
+
+
+def _build_meta_parser() -> ArgumentParser:
+    """The meta-argument parser is only rebuilt when a new plugin registers itself
+    (bumping `PluginMeta.registry_version`), as plugins add meta-arguments too."""
+    _register_builtin_plugins()
+    return _cached_meta_parser(PluginMeta.registry_version)
+
+
 def _meta_arguments():
     (meta_args,) = _build_meta_parser().parse_known_args()[:1]
     return meta_args
 
 
-def _reserved_argument_names() -> Sequence[str]:
-    return [
-        action.dest for action in _build_meta_parser()._actions if action.dest != "help"
-    ]
+def _reserved_argument_names() -> FrozenSet[str]:
+    _register_builtin_plugins()
+    return _cached_reserved_argument_names(PluginMeta.registry_version)
 
 
 def _check_reserved_arguments(dtype, override_reserved_arguments: bool) -> None:
@@ -131,7 +238,116 @@ def _check_not_already_configured(task_function: TaskFunction) -> None:
         )
 
 
+class _BoundState:
+    """What a decorated entry point resolves on its first call in a process: the parsed
+    parameters and where to inject them, and the run that every call belongs to. Later calls
+    of the same function only need this, so they skip argument parsing, workdir/logging setup
+    and saving parameters."""
+
+    def __init__(
+        self,
+        task_function: TaskFunction,
+        parser_argument_index: int,
+        parameters: Any,
+        plugins: List[Plugin] = None,
+        run_dir: Optional[str] = None,
+    ) -> None:
+        self.task_function = task_function
+        self.parser_argument_index = parser_argument_index
+        self.parameters = parameters
+        self.plugins = [] if plugins is None else plugins
+        self.run_dir = run_dir
+        # Of the last call, for `on_run_end`
+        self.result = None
+        # What the plugins' hooks did, and what the task used, once the run started
+        self.outcomes: Optional[Dict[str, Dict[str, Any]]] = None
+        self.meter: Optional[ResourceMeter] = None
+        self.ended = False
+
+    def invoke(self, *args_passed, **kwargs_passed) -> Any:
+        index = self.parser_argument_index
+        return self.task_function(
+            *args_passed[:index], self.parameters, *args_passed[index:], **kwargs_passed
+        )
+
+    def __call__(self, *args_passed, **kwargs_passed) -> Any:
+        return self.call(self.invoke, args_passed, kwargs_passed)
+
+    def start(self):
+        """Start the run, by calling the plugins' `on_run_start`. It ends with the process, see `end`."""
+        self.outcomes = call_hooks(
+            self.plugins, "on_run_start", self.run_dir, self.parameters
+        )
+        self.meter = ResourceMeter()
+        atexit.register(self.end)
+
+    def call(
+        self,
+        task: Callable[..., Any],
+        args_passed: Sequence[Any],
+        kwargs_passed: Dict[str, Any],
+    ) -> Any:
+        """Call `task` (e.g. `invoke`) as part of the run. An exception out of it ends the run."""
+        if self.outcomes is None or self.ended:
+            return task(*args_passed, **kwargs_passed)
+        try:
+            self.result = task(*args_passed, **kwargs_passed)
+        except BaseException as e:
+            if _is_successful_exit(e):
+                # E.g. sys.exit() at the end of the task
+                self.result = None
+                self.end()
+            else:
+                self.end(e)
+            raise
+        return self.result
+
+    def end(self, exception: Optional[BaseException] = None):
+        """End the run, once: record what the task used over all its calls (see `ResourceMeter`), call the plugins'
+        `on_run_end` with the last call's result (or `on_exception`), and record how long each hook took, in
+        parameters.json. Called at exit, unless a call raised before."""
+        if self.ended:
+            return
+        self.ended = True
+        atexit.unregister(self.end)
+        record_resource_usage(self.run_dir, self.meter.usage())
+        if exception is None:
+            more = call_hooks(self.plugins, "on_run_end", self.run_dir, self.result)
+        else:
+            more = call_hooks(self.plugins, "on_exception", self.run_dir, exception)
+        _merge_outcomes(self.outcomes, more)
+        record_plugin_outcomes(self.run_dir, self.outcomes)
+
+
+def _run_with_hooks(
+    bound_state: _BoundState,
+    args_passed: Sequence[Any],
+    kwargs_passed: Dict[str, Any],
+    profile_mode: Optional[str] = None,
+) -> Any:
+    """Start the run of `bound_state` with its first call, see `_BoundState.end` for how it ends. With a
+    `profile_mode`, the first call of the task (but not the hooks) is profiled into the run's directory.
+    """
+    task = bound_state.invoke
+    if profile_mode is not None:
+        task = profiled(bound_state.invoke, profile_mode, bound_state.run_dir)
+    bound_state.start()
+    return bound_state.call(task, args_passed, kwargs_passed)
+
+
+def _is_successful_exit(exception: BaseException) -> bool:
+    return isinstance(exception, SystemExit) and exception.code in (None, 0)
+
+
+def _merge_outcomes(
+    outcomes: Dict[str, Dict[str, Any]], more: Dict[str, Dict[str, Any]]
+):
+    for name, hooks in more.items():
+        outcomes.setdefault(name, dict()).update(hooks)
+
+
 def _load_default_plugins():
+    _register_builtin_plugins()
     return [plugin_cls() for plugin_cls in Plugin.registry]
 
 
@@ -141,6 +357,11 @@ def _main_annotation(
     init_working_dir=True,
     plugins: List[Plugin] = None,
     override_reserved_arguments: bool = False,
+    log_flush_interval: float = 1.0,
+    log_rotation: LogRotation = None,
+    structured_logs: bool = False,
+    plugin_timeout: Optional[float] = DEFAULT_PLUGIN_TIMEOUT,
+    defer_plugin_metadata: bool = False,
 ) -> Callable[[Any], Any]:
     """Decorate a main method with this decorator to enable Arggo
 
@@ -149,6 +370,14 @@ def _main_annotation(
     :param override_reserved_arguments: By default, a dataclass field whose name collides with one of Arggo's
     reserved meta-argument names (e.g. arggo_interactive) raises ArggoReservedError. Set this to True to allow
     the collision instead.
+    :param log_flush_interval: How often (in seconds) output captured into the run's output.log is flushed to disk.
+    Output is written from a background thread, so printing never waits on the file.
+    :param log_rotation: Rotate output.log into (compressed) segments by size and/or age, see `LogRotation`.
+    :param structured_logs: Also record stdout, stderr and `logging` records as JSON lines in the run's output.jsonl.
+    :param plugin_timeout: How long (in seconds) plugins may take to dump their parameters, which they do concurrently.
+    A plugin that times out or fails is recorded as such in parameters.json instead. None waits indefinitely.
+    :param defer_plugin_metadata: Start the task right after writing parameters.json, without waiting for the plugins.
+    Their metadata is added to the file in the background (and waited for at exit).
     """
     if plugins is None:
         plugins = []
@@ -160,6 +389,10 @@ def _main_annotation(
     def main_decorator(task_function: TaskFunction) -> Callable[[], None]:
         @functools.wraps(task_function)
         def decorated_main(*args_passed, **kwargs_passed) -> Any:
+            bound_state = global_store.get("bound_state", None)
+            if bound_state is not None and bound_state.task_function is task_function:
+                return bound_state(*args_passed, **kwargs_passed)
+
             type_hints = list(get_type_hints(task_function).items())
             if len(type_hints) == 0:
                 return task_function(*args_passed, **kwargs_passed)
@@ -179,7 +412,13 @@ def _main_annotation(
 
             _check_not_already_configured(task_function)
 
+            # Timed regardless, as whether to profile is only known once they're parsed
+            start = time.perf_counter()
             meta_args = _meta_arguments()
+            profile = None
+            if meta_args and meta_args.arggo_profile_startup:
+                profile = StartupProfile()
+                profile.add("meta_arguments", time.perf_counter() - start)
             parser = global_store.get("parser", None)
             update_parser = False
             # TODO Proper caching
@@ -187,54 +426,126 @@ def _main_annotation(
                 _check_reserved_arguments(
                     parser_argument_type_hint, override_reserved_arguments
                 )
-                parser = DataClassArgumentParser(parser_argument_type_hint)
+                with profile_phase(profile, "parser_construction"):
+                    parser = DataClassArgumentParser(parser_argument_type_hint)
                 update_parser = True
 
                 if meta_args and meta_args.arggo_interactive:
-                    console.print(
+                    from interactive_argparse import InteractiveArgumentParser
+
+                    _console().print(
                         "[bold cyan] Running with interactive mode [/bold cyan]"
                     )
                     parser = InteractiveArgumentParser(parser)
 
+            if meta_args and meta_args.arggo_multirun:
+                if (
+                    meta_args.arggo_interactive
+                    or meta_args.arggo_reproduce
+                    or meta_args.arggo_profile
+                ):
+                    raise ValueError(
+                        "--arggo_multirun cannot be combined with --arggo_interactive, --arggo_reproduce or "
+                        "--arggo_profile"
+                    )
+                from .launcher import launch_sweep
+
+                global_store.put("parser", parser)
+                global_store.put("configured_by", task_function)
+                workdir = _init_work_directory(logging_dir, None, init_working_dir)
+                if log_to_file:
+                    _init_logging_to_file(
+                        workdir.workdir(),
+                        flush_interval=log_flush_interval,
+                        rotation=log_rotation,
+                        structured=structured_logs,
+                    )
+
+                return launch_sweep(
+                    task_function,
+                    NewExperiment.from_sweep(parser),
+                    workdir.workdir(),
+                    plugins,
+                    parameter_index=parser_argument_index,
+                    args=args_passed,
+                    kwargs=kwargs_passed,
+                    max_workers=meta_args.arggo_max_workers,
+                    experiment_index=_experiment_index(workdir, logging_dir),
+                    plugin_timeout=plugin_timeout,
+                    defer_plugin_metadata=defer_plugin_metadata,
+                )
+
             if update_parser:
                 global_store.put("parser", parser)
                 global_store.put("configured_by", task_function)
 
-                if meta_args and meta_args.arggo_reproduce is not None:
-                    experiment = NewExperiment.from_reproduced(
-                        parser, meta_args.arggo_reproduce
-                    )
-                else:
-                    # `InteractiveArgumentParser` only prompts when it sees no left-over
-                    # CLI args of its own; arggo's `--arggo_interactive` meta-flag would
-                    # otherwise count as one, so force it to treat the call as bare.
-                    interactive_args = (
-                        [] if meta_args and meta_args.arggo_interactive else None
-                    )
-                    experiment = NewExperiment.from_arguments(
-                        parser, args=interactive_args
-                    )
+                with profile_phase(profile, "parse_arguments"):
+                    if meta_args and meta_args.arggo_reproduce is not None:
+                        experiment = NewExperiment.from_reproduced(
+                            parser, meta_args.arggo_reproduce
+                        )
+                    else:
+                        # `InteractiveArgumentParser` only prompts when it sees no left-over
+                        # CLI args of its own; arggo's `--arggo_interactive` meta-flag would
+                        # otherwise count as one, so force it to treat the call as bare.
+                        interactive_args = (
+                            [] if meta_args and meta_args.arggo_interactive else None
+                        )
+                        experiment = NewExperiment.from_arguments(
+                            parser, args=interactive_args
+                        )
                 global_store.put("experiment", experiment)
             else:
                 experiment = global_store.get("experiment")
 
-            workdir = _init_work_directory(logging_dir, None, init_working_dir)
+            with profile_phase(profile, "init_work_directory"):
+                workdir = _init_work_directory(logging_dir, None, init_working_dir)
             output_dir = workdir.workdir()
 
             # Save output
             if log_to_file:
-                _init_logging_to_file(output_dir)
+                with profile_phase(profile, "init_logging_to_file"):
+                    _init_logging_to_file(
+                        output_dir,
+                        flush_interval=log_flush_interval,
+                        rotation=log_rotation,
+                        structured=structured_logs,
+                    )
 
             # Save parameters
             if save_parameters:
-                experiment.save_json(output_dir, plugins)
+                with profile_phase(profile, "save_json"):
+                    experiment.save_json(
+                        output_dir,
+                        plugins,
+                        _experiment_index(workdir, logging_dir),
+                        plugin_timeout,
+                        defer_plugin_metadata,
+                        profile,
+                    )
 
-            new_args_passed = [
-                *args_passed[:parser_argument_index],
+            if profile is not None:
+                profile.add("total", time.perf_counter() - start)
+                if save_parameters:
+                    record_startup_profile(output_dir, profile)
+                if meta_args.arggo_profile_startup == "print":
+                    _console().print(profile.as_table())
+
+            bound_state = _BoundState(
+                task_function,
+                parser_argument_index,
                 experiment.stripped_parameters,
-                *args_passed[parser_argument_index:],
-            ]
-            return task_function(*new_args_passed, **kwargs_passed)
+                plugins,
+                # Absolute, as the task may well change the working directory
+                os.path.abspath(output_dir),
+            )
+            global_store.put("bound_state", bound_state)
+            return _run_with_hooks(
+                bound_state,
+                args_passed,
+                kwargs_passed,
+                meta_args.arggo_profile if meta_args else None,
+            )
 
         return decorated_main
 
@@ -19,11 +19,25 @@ class DirectoryStrategy(abc.ABC):
     def getcwd(self):
         raise NotImplementedError()
 
+    def makedirs_new(self, path) -> bool:
+        """Create `path`, and return False instead if it already existed."""
+        self.makedirs(path)
+        return True
+
 
 class DefaultDirectoryStrategy(DirectoryStrategy):
     def makedirs(self, path):
         os.makedirs(path, exist_ok=True)
 
+    def makedirs_new(self, path) -> bool:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        try:
+            # Atomically, as other processes may be starting runs in the same second
+            os.mkdir(path)
+        except FileExistsError:
+            return False
+        return True
+
     def chdir(self, path):
         os.chdir(path)
 
@@ -77,8 +91,13 @@ def init_workdir(
     root_directory: str, strategy: DirectoryStrategy, _template="%Y-%m-%d/%H-%M-%S"
 ):
     original_working_dir = strategy.getcwd()
-    output_dir = join(root_directory, datetime.datetime.now().strftime(_template))
-    strategy.makedirs(output_dir)
+    name = datetime.datetime.now().strftime(_template)
+    output_dir = join(root_directory, name)
+    # Runs started in the same second get a numbered directory each
+    suffix = 0
+    while not strategy.makedirs_new(output_dir):
+        suffix += 1
+        output_dir = join(root_directory, f"{name}-{suffix}")
     strategy.chdir(output_dir)
     return os.path.abspath(strategy.getcwd()), original_working_dir
 
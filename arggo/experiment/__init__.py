@@ -1 +1,2 @@
 from .experiment import Experiment, FinishedExperiment, NewExperiment
+from .index import ExperimentIndex
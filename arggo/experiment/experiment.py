@@ -1,17 +1,162 @@
+import atexit
 import json
+import os
 import subprocess
 import sys
+import threading
+import time
+import warnings
 from abc import ABC, abstractmethod
 from argparse import Namespace
+from copy import deepcopy
 from dataclasses import is_dataclass, asdict
 from os.path import join, abspath, isdir, exists
-from typing import List
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
+from arggo.experiment.index import ExperimentIndex
 from arggo.parser import dataclass_to_json, DataClassType
-from arggo.plugin import Plugin
+from arggo.plugin import Plugin, timed_call
+from arggo.profiling import StartupProfile, profile_phase
 
 _PARAMETERS_FILE_NAME = "parameters.json"
 _METADATA_KEY = "__arggo"
+_PLUGINS_KEY = "plugins"
+_STARTUP_PROFILE_KEY = "startup_profile"
+_RESOURCES_KEY = "resources"
+DEFAULT_PLUGIN_TIMEOUT = 30.0
+
+# Background completions of parameters files (see `NewExperiment.save_json`), by path, along with the metadata
+# updates queued behind each (see `_update_metadata`)
+_deferred_writes: Dict[str, Tuple[threading.Thread, List[Callable]]] = dict()
+_deferred_writes_lock = threading.Lock()
+
+
+def wait_for_deferred_writes(timeout: Optional[float] = None) -> bool:
+    """Wait until every parameters file whose plugin sections were deferred is complete.
+    Called at exit, so a run that ends early still gets its plugins' metadata.
+
+    :return: Whether all of them completed within `timeout`
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with _deferred_writes_lock:
+        threads = [thread for thread, _ in _deferred_writes.values()]
+    for thread in threads:
+        thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+    with _deferred_writes_lock:
+        return not _deferred_writes
+
+
+atexit.register(wait_for_deferred_writes)
+
+
+def _write_atomically(path: str, text: str):
+    # Readers see either the previous or the new file, never a partial one
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _update_metadata(base_dir: str, update: Callable[[Dict[str, Any]], None]):
+    """Apply `update` to the __arggo metadata of the parameters file in `base_dir`, and atomically rewrite it."""
+    path = abspath(join(base_dir, _PARAMETERS_FILE_NAME))
+    with _deferred_writes_lock:
+        deferred = _deferred_writes.get(path, None)
+        if deferred is not None:
+            # Applied once the plugins' sections are written, rather than holding up the task until then
+            deferred[1].append(update)
+        else:
+            _apply_update(path, update)
+
+
+def _apply_update(path: str, update: Callable[[Dict[str, Any]], None]):
+    if not exists(path):
+        # The run's parameters weren't saved
+        return
+    try:
+        with open(path) as f:
+            parameters = json.load(f)
+        update(parameters[_METADATA_KEY])
+        _write_atomically(path, json.dumps(parameters, indent=4))
+    except (OSError, ValueError, KeyError) as e:
+        warnings.warn(f"Could not update the metadata in {path}: {e}")
+
+
+def record_plugin_outcomes(base_dir: str, outcomes: Dict[str, Dict[str, Any]]):
+    """Merge `outcomes` (by plugin name, then by hook) into __arggo.plugins of the parameters file in `base_dir`."""
+    if not outcomes:
+        return
+
+    def update(metadata: Dict[str, Any]):
+        statuses = metadata.setdefault(_PLUGINS_KEY, dict())
+        for name, hooks in outcomes.items():
+            statuses.setdefault(name, dict()).update(hooks)
+
+    _update_metadata(base_dir, update)
+
+
+def record_startup_profile(base_dir: str, profile: StartupProfile):
+    """Record `profile` as __arggo.startup_profile of the parameters file in `base_dir`."""
+
+    def update(metadata: Dict[str, Any]):
+        metadata[_STARTUP_PROFILE_KEY] = dict(profile.phases)
+
+    _update_metadata(base_dir, update)
+
+
+def record_resource_usage(base_dir: str, usage: Dict[str, Any]):
+    """Record `usage` (see `ResourceMeter`) as __arggo.resources of the parameters file in `base_dir`."""
+
+    def update(metadata: Dict[str, Any]):
+        metadata[_RESOURCES_KEY] = usage
+
+    _update_metadata(base_dir, update)
+
+
+def _dump_plugins(
+    plugins: List[Plugin], parameters: Dict[str, Any], timeout: Optional[float]
+):
+    """Run every plugin's `parameters_dump` at once, each on a daemon thread of its own, so a plugin that hangs
+    can be left behind rather than hold up the run (or the interpreter's exit).
+
+    :return: The dumps of the plugins that completed in time, and how each plugin's dump went
+    """
+    outcomes = dict()
+
+    def dump(plugin: Plugin):
+        outcomes[plugin.name] = timed_call(plugin.parameters_dump, dict(parameters))
+
+    threads = [
+        threading.Thread(
+            target=dump, args=(plugin,), name=f"arggo-plugin-{plugin.name}", daemon=True
+        )
+        for plugin in plugins
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+
+    dumps, statuses = dict(), dict()
+    for plugin, thread in zip(plugins, threads):
+        plugin_timeout = timeout if plugin.timeout is None else plugin.timeout
+        if plugin_timeout is None:
+            thread.join()
+        else:
+            thread.join(max(0.0, started + plugin_timeout - time.monotonic()))
+        if plugin.name not in outcomes:
+            warnings.warn(
+                f"Plugin {plugin.name} timed out after {plugin_timeout}s; "
+                f"the run continues without its parameters"
+            )
+            statuses[plugin.name] = {"status": "timeout", "seconds": plugin_timeout}
+            continue
+        outcome, result = outcomes[plugin.name]
+        if outcome["status"] == "failed":
+            warnings.warn(f"Plugin {plugin.name} failed: {outcome['error']}")
+        elif result is not None:
+            dumps[plugin.name] = result
+        statuses[plugin.name] = outcome
+    return dumps, statuses
 
 
 class Experiment(ABC):
@@ -30,13 +175,31 @@ class Experiment(ABC):
     def meta_parameters(self):
         raise NotImplementedError()
 
-    def to_json(self, plugins: List[Plugin]):
+    def to_json(
+        self,
+        plugins: List[Plugin],
+        plugin_timeout: Optional[float] = None,
+        pending: List[Plugin] = (),
+        startup_profile: StartupProfile = None,
+    ):
+        """
+        :param pending: Plugins whose metadata is yet to come, recorded as pending rather than dumped
+        :param startup_profile: If given, the plugins' dumps are timed into it
+        """
         meta_params = self.meta_parameters
-        parameters = asdict(self.stripped_parameters)
-        for plugin in plugins:
-            dump = plugin.parameters_dump(parameters)
-            if dump is not None:
-                meta_params[plugin.name] = dump
+        if pending:
+            meta_params[_PLUGINS_KEY] = {
+                plugin.name: {"parameters_dump": {"status": "pending"}}
+                for plugin in pending
+            }
+        if plugins:
+            parameters = asdict(self.stripped_parameters)
+            with profile_phase(startup_profile, "plugin_dumps"):
+                dumps, statuses = _dump_plugins(plugins, parameters, plugin_timeout)
+            meta_params.update(dumps)
+            meta_params[_PLUGINS_KEY] = {
+                name: {"parameters_dump": status} for name, status in statuses.items()
+            }
         return dataclass_to_json(self.stripped_parameters, {_METADATA_KEY: meta_params})
 
 
@@ -51,6 +214,7 @@ class NewExperiment(Experiment):
             )
         self._args = args
         self._reproduced_from_path = reproduced_from_path
+        self._started = time.time()
 
     @property
     def parameters(self):
@@ -68,12 +232,67 @@ class NewExperiment(Experiment):
         additional_metadata["executable"] = sys.executable
         additional_metadata["command"] = " ".join(sys.argv)
         additional_metadata["script"] = sys.argv[0]
+        additional_metadata["started"] = self._started
         return additional_metadata
 
-    def save_json(self, base_dir: str, plugins: List[Plugin]):
-        parameters_file_path = join(base_dir, _PARAMETERS_FILE_NAME)
-        with open(parameters_file_path, "w") as f:
-            f.write(self.to_json(plugins))
+    def save_json(
+        self,
+        base_dir: str,
+        plugins: List[Plugin],
+        index: ExperimentIndex = None,
+        plugin_timeout: Optional[float] = DEFAULT_PLUGIN_TIMEOUT,
+        defer_plugins: bool = False,
+        startup_profile: StartupProfile = None,
+    ):
+        """
+        :param defer_plugins: Write the parameters file without the plugins' sections right away, and complete it in
+        the background once the plugins are done (see `wait_for_deferred_writes`)
+        :param startup_profile: If given, the plugins' dumps are timed into it
+        """
+        parameters_file_path = abspath(join(base_dir, _PARAMETERS_FILE_NAME))
+        if defer_plugins and plugins:
+            _write_atomically(parameters_file_path, self.to_json([], pending=plugins))
+            # The task may well modify its arguments by the time the plugins are done
+            snapshot = NewExperiment(deepcopy(self._args), self._reproduced_from_path)
+            snapshot._started = self._started
+            thread = threading.Thread(
+                target=snapshot._complete_json,
+                args=(parameters_file_path, plugins, plugin_timeout),
+                name="arggo-deferred-parameters",
+                daemon=True,
+            )
+            with _deferred_writes_lock:
+                _deferred_writes[parameters_file_path] = (thread, [])
+            thread.start()
+        else:
+            with open(parameters_file_path, "w") as f:
+                f.write(
+                    self.to_json(
+                        plugins, plugin_timeout, startup_profile=startup_profile
+                    )
+                )
+        if index is not None:
+            index.try_add(base_dir, sys.argv[0], asdict(self._args), self._started)
+
+    def _complete_json(
+        self, path: str, plugins: List[Plugin], plugin_timeout: Optional[float]
+    ):
+        try:
+            text = self.to_json(plugins, plugin_timeout)
+        except Exception as e:
+            warnings.warn(f"Could not complete {path} with plugin metadata: {e}")
+            text = None
+        with _deferred_writes_lock:
+            _, updates = _deferred_writes.pop(path)
+            if text is not None:
+                try:
+                    _write_atomically(path, text)
+                except OSError as e:
+                    warnings.warn(
+                        f"Could not complete {path} with plugin metadata: {e}"
+                    )
+            for update in updates:
+                _apply_update(path, update)
 
     @classmethod
     def from_reproduced(cls, parser, reproduced_from_dir):
@@ -88,6 +307,12 @@ class NewExperiment(Experiment):
         )[:1]
         return NewExperiment(parsed_args)
 
+    @classmethod
+    def from_sweep(cls, parser, args=None) -> Iterator["NewExperiment"]:
+        """Lazily yield one experiment per point of a multirun sweep."""
+        for parsed_args in parser.parse_sweep_into_dataclasses(args=args):
+            yield NewExperiment(parsed_args[0])
+
 
 def _try_discover_parameters_file(path: str):
     if isdir(path):
@@ -131,8 +356,11 @@ class FinishedExperiment(Experiment):
     def meta_parameters(self):
         return self.parameters[_METADATA_KEY]
 
-    def reproduce(self):
-        print(f"Reproducing from {self._base_dir}")
+    def reproduce_command(self) -> List[str]:
         executable = self.meta_parameters["executable"]
         command = self.meta_parameters["script"]
-        subprocess.run([executable, command, "--arggo_reproduce", self._base_dir])
+        return [executable, command, "--arggo_reproduce", self._base_dir]
+
+    def reproduce(self):
+        print(f"Reproducing from {self._base_dir}")
+        subprocess.run(self.reproduce_command())
@@ -0,0 +1,150 @@
+import json
+import os
+import time
+import warnings
+from os.path import abspath, dirname, isdir, join, normpath, relpath
+from typing import Any, Dict, List, Optional
+
+from arggo.types import EnumEncoder
+
+_INDEX_FILE_NAME = "index.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    path TEXT PRIMARY KEY,
+    experiment TEXT NOT NULL,
+    script TEXT,
+    started REAL,
+    config_hash TEXT,
+    parameters TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_experiment ON runs (experiment, path);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def experiment_name(script: str) -> str:
+    """The name an experiment is looked up by: its script's file name, without `.py`."""
+    return script.split("/")[-1].replace(".py", "")
+
+
+def config_hash(parameters: Dict[str, Any]) -> str:
+    import hashlib
+
+    encoded = json.dumps(parameters, sort_keys=True, cls=EnumEncoder)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+class ExperimentIndex:
+    """A SQLite database of the runs under a logging directory, so that finding the runs of an experiment doesn't
+    mean walking (and parsing every `parameters.json` in) the whole tree. Runs are recorded by `NewExperiment.save_json`
+    when they start. Paths are stored relative to the index, so the logging directory can be moved as a whole.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @classmethod
+    def for_logging_dir(cls, logging_dir: str) -> "ExperimentIndex":
+        return cls(join(logging_dir, _INDEX_FILE_NAME))
+
+    def exists(self) -> bool:
+        return os.path.isfile(self.path)
+
+    def _connect(self):
+        import sqlite3
+
+        os.makedirs(dirname(abspath(self.path)), exist_ok=True)
+        # Many runs may start (and write) at the same time
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def add(
+        self,
+        run_dir: str,
+        script: str,
+        parameters: Dict[str, Any],
+        started: Optional[float] = None,
+    ) -> None:
+        self.add_many([(run_dir, script, parameters, started)])
+
+    def add_many(self, runs) -> None:
+        """Record (or update) runs, each given as a `(run_dir, script, parameters, started)` tuple."""
+        index_dir = dirname(abspath(self.path))
+        rows = [
+            (
+                relpath(abspath(run_dir), index_dir),
+                experiment_name(script),
+                script,
+                time.time() if started is None else started,
+                config_hash(parameters),
+                json.dumps(parameters, cls=EnumEncoder),
+            )
+            for run_dir, script, parameters, started in runs
+        ]
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?)", rows
+                )
+        finally:
+            connection.close()
+
+    def try_add(
+        self,
+        run_dir: str,
+        script: str,
+        parameters: Dict[str, Any],
+        started: Optional[float] = None,
+    ) -> bool:
+        """Like `add`, but a failure to update the index only warns: it must never fail the run itself."""
+        try:
+            self.add(run_dir, script, parameters, started)
+        except Exception as e:
+            warnings.warn(f"Could not record run {run_dir} in {self.path}: {e}")
+            return False
+        return True
+
+    def is_complete(self) -> bool:
+        """Whether the index has every run in its logging directory, rather than only those that recorded themselves
+        since the first of them created it (see `mark_complete`)."""
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT value FROM meta WHERE key = 'complete'"
+            ).fetchone()
+        finally:
+            connection.close()
+        return row is not None
+
+    def mark_complete(self) -> None:
+        """Record that every run in the logging directory has been added, e.g. by walking it."""
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('complete', ?)", (time.time(),)
+                )
+        finally:
+            connection.close()
+
+    def find(self, name: str, by_start: bool = False) -> List[str]:
+        """The directories of the recorded runs of experiment `name` that still exist, sorted by path, or with
+        `by_start`, by when they started."""
+        index_dir = dirname(self.path)
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT path FROM runs WHERE experiment = ? ORDER BY "
+                + ("started, path" if by_start else "path"),
+                (name.replace(".py", ""),),
+            ).fetchall()
+        finally:
+            connection.close()
+        paths = [normpath(join(index_dir, path)) for (path,) in rows]
+        return [path for path in paths if isdir(path)]
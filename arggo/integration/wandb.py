@@ -21,6 +21,10 @@ def is_wandb_available() -> bool:
 class WandbPlugin(Plugin):
     _DISABLE_FLAG = "--wandb_disable"
 
+    def __init__(self):
+        # Only a run this plugin started is this plugin's to finish
+        self._started_run = None
+
     @property
     def name(self):
         return "wandb"
@@ -46,5 +50,21 @@ class WandbPlugin(Plugin):
 
         if wandb.run is None:
             wandb.init(config=parameters)
+            self._started_run = wandb.run
         run = wandb.run
         return {"run_id": run.id, "run_name": run.name, "run_url": run.get_url()}
+
+    def _finish(self, exit_code: int) -> None:
+        if self._started_run is None:
+            return
+        import wandb
+
+        if wandb.run is self._started_run:
+            wandb.finish(exit_code=exit_code)
+        self._started_run = None
+
+    def on_run_end(self, run_dir: str, result: Any) -> None:
+        self._finish(exit_code=0)
+
+    def on_exception(self, run_dir: str, exception: BaseException) -> None:
+        self._finish(exit_code=1)
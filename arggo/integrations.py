@@ -1,47 +1,55 @@
 # Integrations with other Python libraries
+#
+# Availability is probed lazily (and only once) on the first call, so importing this
+# module doesn't drag in comet_ml/wandb/torch just to answer a question nobody asked.
+import functools
 import os
 
-try:
-    import comet_ml  # noqa: F401
 
-    _has_comet = True
-except ImportError:
-    _has_comet = False
+@functools.lru_cache(maxsize=None)
+def is_comet_available():
+    try:
+        import comet_ml  # noqa: F401
+    except ImportError:
+        return False
+    return True
 
 
-try:
-    # noinspection PyUnresolvedReferences
-    import wandb
+@functools.lru_cache(maxsize=None)
+def is_wandb_available():
+    try:
+        # noinspection PyUnresolvedReferences
+        import wandb
 
-    wandb.ensure_configured()
-    if wandb.api.api_key is None:
-        _has_wandb = False
-        wandb.termwarn(
-            "W&B installed but not logged in.  Run `wandb login` or set the WANDB_API_KEY env variable."
-        )
-    else:
-        _has_wandb = False if os.getenv("WANDB_DISABLED") else True
-except (ImportError, AttributeError):
-    _has_wandb = False
+        wandb.ensure_configured()
+        if wandb.api.api_key is None:
+            wandb.termwarn(
+                "W&B installed but not logged in.  Run `wandb login` or set the WANDB_API_KEY env variable."
+            )
+            return False
+        return False if os.getenv("WANDB_DISABLED") else True
+    except (ImportError, AttributeError):
+        return False
 
-try:
-    # noinspection PyUnresolvedReferences
-    from torch.utils.tensorboard import SummaryWriter
 
-    _has_tensorboard = True
-except ImportError:
+@functools.lru_cache(maxsize=None)
+def is_tensorboard_available():
     try:
         # noinspection PyUnresolvedReferences
-        from tensorboardX import SummaryWriter
-
-        _has_tensorboard = True
+        from torch.utils.tensorboard import SummaryWriter  # noqa: F401
     except ImportError:
-        _has_tensorboard = False
+        try:
+            # noinspection PyUnresolvedReferences
+            from tensorboardX import SummaryWriter  # noqa: F401
+        except ImportError:
+            return False
+    return True
 
 
-def is_wandb_available():
-    return _has_wandb
-
-
-def is_tensorboard_available():
-    return _has_tensorboard
+@functools.lru_cache(maxsize=None)
+def is_zstandard_available():
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
@@ -0,0 +1,268 @@
+# Launchers that run a task function over every point of a multirun sweep, or many
+# experiment scripts as subprocesses
+import collections
+import importlib
+import os
+import sys
+from os.path import join
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from arggo.experiment import ExperimentIndex, NewExperiment
+from arggo.experiment.experiment import DEFAULT_PLUGIN_TIMEOUT, record_resource_usage
+from arggo.logger import tee_stdout
+from arggo.plugin import Plugin
+from arggo.profiling import ResourceMeter
+
+_OUTPUT_FILE_NAME = "output.log"
+# What a shell reports for a command it couldn't run
+_SPAWN_FAILED_EXIT_CODE = 127
+
+
+class TaskReference:
+    """A picklable stand-in for a (module-level) task function, so that it can be sent to worker processes.
+
+    A consume/configure-decorated function replaces the original in its module, so the original can't be pickled
+    by reference; this resolves it by name in the worker instead, unwrapping the decorator.
+    """
+
+    def __init__(self, task_function: Callable[..., Any]):
+        self.module = task_function.__module__
+        self.qualname = task_function.__qualname__
+        self._task_function = task_function
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"module": self.module, "qualname": self.qualname}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state, _task_function=None)
+
+    def _resolve(self) -> Callable[..., Any]:
+        module = sys.modules.get(self.module, None)
+        if module is None:
+            module = importlib.import_module(self.module)
+        task_function = module
+        for name in self.qualname.split("."):
+            task_function = getattr(task_function, name)
+        return getattr(task_function, "__wrapped__", task_function)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        if self._task_function is None:
+            self._task_function = self._resolve()
+        return self._task_function(*args, **kwargs)
+
+
+def _run_job(
+    task: Callable[..., Any],
+    job_dir: str,
+    parameters: Any,
+    parameter_index: int,
+    args: Sequence[Any],
+    kwargs: Dict[str, Any],
+    in_process: bool,
+) -> Any:
+    """Run one job of a sweep from within its own directory, teeing its stdout into the directory's output log, and
+    record what it used in its parameters.json. In a worker process, its peak RSS is the worker's peak so far.
+    """
+    previous_dir = os.getcwd()
+    os.chdir(job_dir)
+    # Worker processes write straight to the terminal: their inherited `sys.stdout`
+    # may be bound to the parent's own log file.
+    stream = None if in_process else sys.__stdout__
+    meter = ResourceMeter()
+    try:
+        with tee_stdout(join(job_dir, _OUTPUT_FILE_NAME), stream=stream):
+            return task(
+                *args[:parameter_index], parameters, *args[parameter_index:], **kwargs
+            )
+    finally:
+        os.chdir(previous_dir)
+        record_resource_usage(job_dir, meter.usage())
+
+
+def _prepare_jobs(
+    experiments: Iterable[NewExperiment],
+    output_dir: str,
+    plugins: List[Plugin],
+    experiment_index: Optional[ExperimentIndex],
+    plugin_timeout: Optional[float],
+    defer_plugin_metadata: bool,
+):
+    for index, experiment in enumerate(experiments):
+        job_dir = join(output_dir, str(index))
+        os.makedirs(job_dir, exist_ok=True)
+        experiment.save_json(
+            job_dir, plugins, experiment_index, plugin_timeout, defer_plugin_metadata
+        )
+        yield job_dir, experiment.stripped_parameters
+
+
+def launch_sweep(
+    task_function: Callable[..., Any],
+    experiments: Iterable[NewExperiment],
+    output_dir: str,
+    plugins: List[Plugin] = None,
+    parameter_index: int = 0,
+    args: Sequence[Any] = (),
+    kwargs: Optional[Dict[str, Any]] = None,
+    max_workers: Optional[int] = None,
+    experiment_index: Optional[ExperimentIndex] = None,
+    plugin_timeout: Optional[float] = DEFAULT_PLUGIN_TIMEOUT,
+    defer_plugin_metadata: bool = False,
+) -> List[Any]:
+    """Run `task_function` once per experiment, each in its own numbered subdirectory of `output_dir` (`0/`, `1/`,
+    ...) with its own `parameters.json` and `output.log`, and return the results in order.
+
+    :param task_function: The (undecorated) task. Each call receives the experiment's parameters at
+    `parameter_index` among `args`, plus `kwargs`.
+    :param experiments: The experiments to run. Consumed lazily, so this may be a generator over a huge sweep.
+    :param max_workers: If None, jobs run one after another in this process. Otherwise, they run in a pool of this
+    many worker processes (0 for one per CPU). The task function and parameters must then be picklable; a
+    decorated module-level entry point is handled through `TaskReference`.
+    :param experiment_index: If given, every job is recorded in this index as it is prepared.
+    :param plugin_timeout: How long each plugin may take to dump a job's parameters (None to wait indefinitely).
+    :param defer_plugin_metadata: Start each job without waiting for the plugins to dump its parameters.
+    """
+    if plugins is None:
+        plugins = []
+    if kwargs is None:
+        kwargs = dict()
+    jobs = _prepare_jobs(
+        experiments,
+        output_dir,
+        plugins,
+        experiment_index,
+        plugin_timeout,
+        defer_plugin_metadata,
+    )
+    if max_workers is None:
+        return [
+            _run_job(
+                task_function, job_dir, parameters, parameter_index, args, kwargs, True
+            )
+            for job_dir, parameters in jobs
+        ]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    max_workers = max_workers or os.cpu_count() or 1
+    task = TaskReference(task_function)
+    # Children inherit (and may later flush) whatever is still buffered
+    sys.stdout.flush()
+    sys.__stdout__.flush()
+    results = []
+    in_flight: Deque = collections.deque()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for job_dir, parameters in jobs:
+            # Bound the number of pending jobs, so a huge sweep isn't submitted all at once
+            if len(in_flight) >= 2 * max_workers:
+                results.append(in_flight.popleft().result())
+            in_flight.append(
+                executor.submit(
+                    _run_job,
+                    task,
+                    job_dir,
+                    parameters,
+                    parameter_index,
+                    args,
+                    kwargs,
+                    False,
+                )
+            )
+        while in_flight:
+            results.append(in_flight.popleft().result())
+    return results
+
+
+async def _subprocess_worker(
+    commands: Iterator[Tuple[int, Sequence[str]]],
+    log_dir: str,
+    exit_codes: Dict[int, int],
+    on_exit: Optional[Callable[[int, int], None]],
+) -> None:
+    import asyncio
+
+    # Workers share one iterator, so at most one command per worker is ever pending
+    for index, command in commands:
+        with open(join(log_dir, f"{index}.log"), "wb") as log:
+            # The child writes straight into its log file; nothing passes through
+            # (or waits on) this process.
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *command, stdout=log, stderr=asyncio.subprocess.STDOUT
+                )
+            except OSError as e:
+                # E.g. a missing executable. The other commands still run.
+                log.write(f"Could not run {command[0]}: {e}\n".encode("utf-8"))
+                exit_code = _SPAWN_FAILED_EXIT_CODE
+            else:
+                try:
+                    exit_code = await process.wait()
+                except BaseException:
+                    # Cancelled: don't leave the child running behind our back
+                    if process.returncode is None:
+                        process.kill()
+                        await process.wait()
+                    raise
+        exit_codes[index] = exit_code
+        if on_exit is not None:
+            on_exit(index, exit_code)
+
+
+async def launch_subprocesses(
+    commands: Iterable[Sequence[str]],
+    log_dir: str,
+    max_concurrency: int = 64,
+    on_exit: Optional[Callable[[int, int], None]] = None,
+) -> List[int]:
+    """Run every command as a subprocess, keeping up to `max_concurrency` of them running at once.
+
+    :param commands: The commands to run, e.g. `["python", "train.py", "--lr", "0.1"]`. Consumed lazily.
+    :param log_dir: The stdout and stderr of the i-th command are written to `<log_dir>/<i>.log`.
+    :param on_exit: Called with a command's index and exit code as soon as it finishes.
+    :return: The exit codes, in the order of `commands`.
+    """
+    import asyncio
+
+    os.makedirs(log_dir, exist_ok=True)
+    exit_codes: Dict[int, int] = dict()
+    indexed_commands = enumerate(commands)
+    workers = [
+        asyncio.ensure_future(
+            _subprocess_worker(indexed_commands, log_dir, exit_codes, on_exit)
+        )
+        for _ in range(max_concurrency)
+    ]
+    try:
+        await asyncio.gather(*workers)
+    except BaseException:
+        # One worker failed (or all were cancelled): stop the others' children too
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        raise
+    return [exit_codes[index] for index in range(len(exit_codes))]
+
+
+def run_subprocesses(
+    commands: Iterable[Sequence[str]],
+    log_dir: str,
+    max_concurrency: int = 64,
+    on_exit: Optional[Callable[[int, int], None]] = None,
+) -> List[int]:
+    """A blocking version of `launch_subprocesses`, for use outside of an event loop."""
+    import asyncio
+
+    return asyncio.run(
+        launch_subprocesses(commands, log_dir, max_concurrency, on_exit=on_exit)
+    )
@@ -0,0 +1,225 @@
+import os
+import re
+import time
+from dataclasses import dataclass
+from os.path import basename, dirname, exists, join
+from typing import Iterator, List, Optional
+
+from arggo.integrations import is_zstandard_available
+
+_COMPRESSED_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+@dataclass(frozen=True)
+class LogRotation:
+    """When to close the current log file and start a new segment: once it holds
+    `max_bytes`, or once it has been open for `interval` seconds, whichever comes first.
+    Completed segments are compressed with `compression` ("gzip", "zstd" or None)."""
+
+    max_bytes: Optional[int] = None
+    interval: Optional[float] = None
+    compression: Optional[str] = "gzip"
+
+    def __post_init__(self):
+        if self.max_bytes is None and self.interval is None:
+            raise ValueError("LogRotation needs max_bytes, interval or both")
+        if self.compression is not None and self.compression not in (
+            _COMPRESSED_SUFFIXES
+        ):
+            raise ValueError(
+                f"Unknown compression {self.compression!r}, "
+                f"expected one of {sorted(_COMPRESSED_SUFFIXES)} or None"
+            )
+        if self.compression == "zstd" and not is_zstandard_available():
+            raise ImportError(
+                "zstd compression requires the zstandard package (pip install zstandard)"
+            )
+
+
+def _segment_pattern(path: str):
+    return re.compile(rf"{re.escape(basename(path))}\.(\d+)(\.gz|\.zst)?$")
+
+
+def _segments(path: str) -> List[str]:
+    """The completed segments of the log at `path`, oldest first. A segment that is
+    already compressed is listed in its compressed form only."""
+    pattern = _segment_pattern(path)
+    directory = dirname(path) or "."
+    by_index = dict()
+    for name in os.listdir(directory):
+        match = pattern.match(name)
+        if match is None:
+            continue
+        index = int(match.group(1))
+        if match.group(2) is not None or index not in by_index:
+            by_index[index] = join(directory, name)
+    return [by_index[index] for index in sorted(by_index)]
+
+
+def _compress(segment_path: str, compression: str):
+    compressed_path = segment_path + _COMPRESSED_SUFFIXES[compression]
+    tmp_path = f"{compressed_path}.tmp"
+    with open(segment_path, "rb") as source:
+        if compression == "zstd":
+            import zstandard
+
+            with open(tmp_path, "wb") as target:
+                zstandard.ZstdCompressor().copy_stream(source, target)
+        else:
+            import gzip
+            import shutil
+
+            with gzip.open(tmp_path, "wb") as target:
+                shutil.copyfileobj(source, target)
+    # Readers pick up the compressed segment as soon as it's complete
+    os.replace(tmp_path, compressed_path)
+    os.remove(segment_path)
+
+
+def _open_segment(segment_path: str):
+    if segment_path.endswith(".gz"):
+        import gzip
+
+        return gzip.open(segment_path, "rb")
+    if segment_path.endswith(".zst"):
+        import zstandard
+
+        return zstandard.ZstdDecompressor().stream_reader(open(segment_path, "rb"))
+    return open(segment_path, "rb")
+
+
+class RotatingFile:
+    """A binary log file at `path` that is moved aside to `<path>.<n>` whenever
+    `rotation` says so, after which the segment is compressed in the background. Text
+    written to it is encoded as UTF-8. Segments only ever end at a line boundary."""
+
+    def __init__(self, path: str, rotation: LogRotation, write_mode: str = "a"):
+        self.path = path
+        self.rotation = rotation
+        self._write_mode = write_mode
+        segments = _segments(path)
+        if write_mode == "w":
+            # Overwriting the log overwrites all of it
+            for segment_path in segments:
+                os.remove(segment_path)
+            segments = []
+        pattern = _segment_pattern(path)
+        self._next_index = 1 + max(
+            (int(pattern.match(basename(s)).group(1)) for s in segments), default=0
+        )
+        self._compressor = None
+        self._open()
+
+    def _open(self):
+        self._file = open(self.path, f"{self._write_mode}b")
+        self._size = self._file.tell() if self._write_mode == "a" else 0
+        self._opened_at = time.monotonic()
+        self._write_mode = "a"
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def _should_rotate(self) -> bool:
+        rotation = self.rotation
+        if rotation.max_bytes is not None and self._size >= rotation.max_bytes:
+            return True
+        return (
+            rotation.interval is not None
+            and time.monotonic() - self._opened_at >= rotation.interval
+        )
+
+    def _rotate(self):
+        self._file.close()
+        segment_path = f"{self.path}.{self._next_index}"
+        self._next_index += 1
+        os.replace(self.path, segment_path)
+        self._open()
+        if self.rotation.compression is not None:
+            if self._compressor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                # One segment at a time, so the job itself keeps the other cores
+                self._compressor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="arggo-log-compressor"
+                )
+            self._compressor.submit(_compress, segment_path, self.rotation.compression)
+
+    def write(self, message: str) -> int:
+        data = message.encode("utf-8", errors="replace")
+        max_bytes = self.rotation.max_bytes
+        # A batch of writes may span several segments
+        while max_bytes is not None and self._size + len(data) > max_bytes:
+            room = max(max_bytes - self._size, 0)
+            cut = data.rfind(b"\n", 0, room)
+            if cut == -1:
+                cut = data.find(b"\n", room)
+                if cut == -1:
+                    break
+            self._file.write(data[: cut + 1])
+            self._rotate()
+            data = data[cut + 1 :]
+        self._file.write(data)
+        self._size += len(data)
+        if data.endswith(b"\n") and self._should_rotate():
+            self._rotate()
+        return len(message)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+        if self._compressor is not None:
+            self._compressor.shutdown(wait=True)
+
+
+def log_segments(path: str) -> List[str]:
+    """Every part of the log written at `path`, in order: its completed segments, then the current file (if any)."""
+    return _segments(path) + ([path] if exists(path) else [])
+
+
+def open_log_segment(segment_path: str):
+    """Open one of the `log_segments` for reading bytes, decompressing it on the fly, and return it along with whether
+    it is compressed (as opposed to a plain file, which may e.g. be memory mapped)."""
+    try:
+        segment = _open_segment(segment_path)
+    except FileNotFoundError:
+        # Compressed in the meantime
+        compressed = [
+            segment_path + suffix
+            for suffix in _COMPRESSED_SUFFIXES.values()
+            if exists(segment_path + suffix)
+        ]
+        if not compressed:
+            raise
+        segment_path = compressed[0]
+        segment = _open_segment(segment_path)
+    return segment, segment_path.endswith(tuple(_COMPRESSED_SUFFIXES.values()))
+
+
+def read_rotated_log(path: str, chunk_size: int = 1 << 20) -> Iterator[bytes]:
+    """Stream the whole log written at `path` back as chunks of bytes, in order: every
+    completed segment, compressed or not, then the current file. Nothing is
+    decompressed to disk, and at most `chunk_size` bytes are held at once."""
+    for segment_path in log_segments(path):
+        segment, _ = open_log_segment(segment_path)
+        with segment:
+            while True:
+                chunk = segment.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+
+def read_rotated_lines(path: str) -> Iterator[str]:
+    """Like `read_rotated_log`, but yields decoded lines, a line split across two
+    segments (e.g. by an unfinished log) being joined back together."""
+    remainder = b""
+    for chunk in read_rotated_log(path):
+        lines = (remainder + chunk).split(b"\n")
+        remainder = lines.pop()
+        for line in lines:
+            yield line.decode("utf-8", errors="replace") + "\n"
+    if remainder:
+        yield remainder.decode("utf-8", errors="replace")
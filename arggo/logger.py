@@ -1,7 +1,133 @@
+import atexit
+import contextlib
+import json
 import logging
+import os
+import signal
 import sys
+import threading
+import time
+import weakref
+from collections import deque
+from json.encoder import encode_basestring_ascii
+from typing import Callable, List
 
 from arggo._internal.global_store import GlobalStore
+from arggo.log_rotation import LogRotation, RotatingFile
+
+# Writers which still hold output that has to reach their file before the process exits
+_open_writers = weakref.WeakSet()
+
+
+def _flush_open_writers():
+    for writer in list(_open_writers):
+        writer.flush()
+
+
+def _flush_and_terminate(signum, frame):
+    _flush_open_writers()
+    # Then die of the signal as if this handler had never been installed
+    signal.signal(signum, signal.SIG_DFL)
+    os.kill(os.getpid(), signum)
+
+
+def _restart_open_writers():
+    for writer in list(_open_writers):
+        writer._restart()
+
+
+def _install_exit_handlers():
+    atexit.register(_flush_open_writers)
+    if hasattr(os, "register_at_fork"):
+        # Nothing queued before a fork must be written twice, and the child needs its
+        # own writer thread (and lock, which another thread may have held at the fork)
+        os.register_at_fork(
+            before=_flush_open_writers, after_in_child=_restart_open_writers
+        )
+    if threading.current_thread() is not threading.main_thread():
+        return
+    for name in ("SIGTERM", "SIGHUP"):
+        signum = getattr(signal, name, None)
+        # Only take over signals nobody else handles (SIGINT already exits through atexit)
+        if signum is not None and signal.getsignal(signum) == signal.SIG_DFL:
+            signal.signal(signum, _flush_and_terminate)
+
+
+class BufferedFileWriter:
+    """Takes writes off the caller's thread: `write` only queues the message, and a
+    background thread writes the queued messages to `file` in batches, flushing it every
+    `flush_interval` seconds. Once `max_pending` messages are queued, the writer that
+    hits the bound writes the batch itself, so memory use stays bounded. Queued output is
+    also written on `flush`, on `close`, at exit and on SIGTERM/SIGHUP (but not when a
+    stream that tees into it is flushed, e.g. by `print(..., flush=True)`).
+
+    :param format_batch: Turns a batch of queued messages into the text written for them (default: joins them), so
+    that formatting can be moved off the caller's thread as well
+    """
+
+    _exit_handlers_installed = False
+
+    def __init__(
+        self,
+        file,
+        flush_interval: float = 1.0,
+        max_pending: int = 10000,
+        format_batch: Callable[[List], str] = None,
+    ):
+        self.file = file
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._format_batch = "".join if format_batch is None else format_batch
+        self._closed = threading.Event()
+        if not BufferedFileWriter._exit_handlers_installed:
+            _install_exit_handlers()
+            BufferedFileWriter._exit_handlers_installed = True
+        _open_writers.add(self)
+        self._restart()
+
+    def _restart(self):
+        self._pending = deque()
+        # Reentrant, as a signal handler may flush in the middle of a write
+        self._lock = threading.RLock()
+        self._thread = threading.Thread(
+            target=self._run, name="arggo-log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def _write_pending(self):
+        with self._lock:
+            batch = []
+            while self._pending:
+                batch.append(self._pending.popleft())
+            if batch and not self.file.closed:
+                self.file.write(self._format_batch(batch))
+
+    def write(self, message):
+        self._pending.append(message)
+        if len(self._pending) >= self.max_pending:
+            self._write_pending()
+        return len(message)
+
+    def flush(self):
+        with self._lock:
+            self._write_pending()
+            if not self.file.closed:
+                self.file.flush()
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        with self._lock:
+            self.flush()
+            self.file.close()
+        _open_writers.discard(self)
 
 
 class WrapperStream:
@@ -19,29 +145,178 @@ class WrapperStream:
         self.log.write(message)
 
     def flush(self):
-        pass
+        # Only the terminal's: `logging` flushes after every record, and the log is
+        # written (and flushed) by its writer's thread, see `BufferedFileWriter`
+        if self.stream is not None:
+            self.stream.flush()
+
+
+def _format_records(records: List[tuple]) -> str:
+    # Hand-rolled rather than json.dumps per record, which dominates the cost otherwise
+    lines = []
+    for timestamp, stream, level, message, logger in records:
+        level = "null" if level is None else encode_basestring_ascii(level)
+        logger = (
+            "" if logger is None else f',"logger":{encode_basestring_ascii(logger)}'
+        )
+        lines.append(
+            f'{{"time":{timestamp!r},"stream":"{stream}","level":{level}{logger},'
+            f'"message":{encode_basestring_ascii(message)}}}\n'
+        )
+    return "".join(lines)
+
+
+class StructuredStream:
+    """Proxies `stream`, and queues every complete line written to it as a record of
+    `name` on `records`, a `BufferedFileWriter` of JSON lines."""
+
+    def __init__(self, stream, records: BufferedFileWriter, name: str):
+        self.stream = stream
+        self.records = records
+        self.name = name
+        self._partial = ""
+
+    # Proxy
+    def __getattr__(self, attr):
+        return getattr(self.stream, attr)
+
+    def write(self, message):
+        if self.stream is not None:
+            self.stream.write(message)
+        if message == "\n":
+            # The common case: the end of a print()
+            self.records.write((time.monotonic(), self.name, None, self._partial, None))
+            self._partial = ""
+        elif "\n" not in message:
+            self._partial += message
+        else:
+            lines = (self._partial + message).split("\n")
+            self._partial = lines.pop()
+            now = time.monotonic()
+            for line in lines:
+                self.records.write((now, self.name, None, line, None))
+        return len(message)
+
+    def flush(self):
+        # Like `WrapperStream.flush`, leaves the records to their writer's thread
+        if self.stream is not None:
+            self.stream.flush()
+
+
+class StructuredLogRecordFactory:
+    """A `logging` record factory that queues every record it makes as a JSON line on `records`. Unlike a handler
+    on the root logger, it leaves logging's configuration alone: `logging.basicConfig` still takes effect, and records
+    reach the terminal as they otherwise would. Records are only made for the levels a logger is enabled for.
+    """
+
+    def __init__(self, records: BufferedFileWriter, factory=None):
+        self.records = records
+        self.factory = logging.getLogRecordFactory() if factory is None else factory
+        self._formatter = logging.Formatter()
+
+    def __call__(self, *args, **kwargs):
+        record = self.factory(*args, **kwargs)
+        try:
+            message = self._formatter.format(record)
+        except Exception:
+            # E.g. arguments that don't match the message: left for the handlers to report
+            return record
+        self.records.write(
+            (time.monotonic(), "logging", record.levelname, message, record.name)
+        )
+        return record
+
+
+def open_structured_log(output_file, flush_interval: float = 1.0, write_mode="a"):
+    """A `BufferedFileWriter` of JSON lines, one per record, that starts with a record
+    relating the monotonic timestamps of the rest to wall-clock time."""
+    records = BufferedFileWriter(
+        open(output_file, write_mode),
+        flush_interval=flush_interval,
+        format_batch=_format_records,
+    )
+    records.file.write(
+        json.dumps(
+            {
+                "time": time.monotonic(),
+                "stream": "arggo",
+                "wall_time": time.time(),
+                "pid": os.getpid(),
+            },
+            separators=(",", ":"),
+        )
+        + "\n"
+    )
+    return records
 
 
 class FileLogger:
     _KEY_BOUND = "file_logger_bound"
 
-    def __init__(self, global_store: GlobalStore, output_file, write_mode="a"):
+    def __init__(
+        self,
+        global_store: GlobalStore,
+        output_file,
+        write_mode="a",
+        flush_interval: float = 1.0,
+        rotation: LogRotation = None,
+        structured_output_file=None,
+    ):
         self.gs = global_store
         self.terminal = None
         assert write_mode in {"w", "a"}
-        self.log = open(output_file, write_mode)
+        self.output_file = output_file
+        self.write_mode = write_mode
+        self.flush_interval = flush_interval
+        self.rotation = rotation
+        self.structured_output_file = structured_output_file
+        self.log = None
+        self.records = None
 
     def bind(
         self,
     ):
         if not self.gs.get(FileLogger._KEY_BOUND, False):
+            if self.rotation is None:
+                file = open(self.output_file, self.write_mode)
+            else:
+                file = RotatingFile(self.output_file, self.rotation, self.write_mode)
+            self.log = BufferedFileWriter(file, flush_interval=self.flush_interval)
             self.terminal = sys.stdout
             sys.stdout = WrapperStream(sys.stdout, self.log)
             # sys.stderr = WrapperStream(sys.stderr, self.log)
             for handler in logging.root.handlers:
                 if isinstance(handler, logging.StreamHandler):
                     handler.stream = WrapperStream(handler.stream, self.log)
+            if self.structured_output_file is not None:
+                self._bind_structured()
             self.gs.put(FileLogger._KEY_BOUND, True)
 
+    def _bind_structured(self):
+        self.records = open_structured_log(
+            self.structured_output_file, self.flush_interval, self.write_mode
+        )
+        sys.stdout = StructuredStream(sys.stdout, self.records, "stdout")
+        sys.stderr = StructuredStream(sys.stderr, self.records, "stderr")
+        logging.setLogRecordFactory(StructuredLogRecordFactory(self.records))
+
     def original_stdout(self):
         return self.terminal
+
+
+@contextlib.contextmanager
+def tee_stdout(output_file, stream=None, write_mode="a"):
+    """Tee `sys.stdout` into `output_file` for the duration of the block. Unlike `FileLogger.bind`, which is
+    process-wide and permanent, the previous `sys.stdout` is restored afterwards.
+
+    :param stream: Where output still goes besides the file (default: the current `sys.stdout`)
+    """
+    assert write_mode in {"w", "a"}
+    original = sys.stdout
+    log = BufferedFileWriter(open(output_file, write_mode))
+    sys.stdout = WrapperStream(original if stream is None else stream, log)
+    try:
+        yield
+    finally:
+        sys.stdout = original
+        log.close()
@@ -11,11 +11,15 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import copy
 import dataclasses
+import functools
 import json
+import os
 import re
 import sys
 from argparse import (
+    Action,
     ArgumentParser,
     ArgumentTypeError,
     ArgumentError,
@@ -23,13 +27,52 @@ from argparse import (
 from enum import Enum
 from gettext import gettext as _
 from pathlib import Path
-from typing import Any, Iterable, List, NewType, Optional, Tuple, Union, Dict, Type
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NewType,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    Dict,
+    Type,
+    TypeVar,
+)
+
+try:
+    from typing import get_args, get_origin
+except ImportError:  # Python 3.7
+
+    def get_origin(tp):
+        return getattr(tp, "__origin__", None)
+
+    def get_args(tp):
+        return getattr(tp, "__args__", ())
 
+
+try:
+    from typing import Literal
+except ImportError:  # Python 3.7
+    Literal = None
+
+try:
+    from types import UnionType
+except ImportError:  # Python < 3.10, where `int | None` isn't supported anyway
+    UnionType = None
+
+from arggo._internal.spec_cache import SpecCache, spec_cache_key, stable_repr
 from arggo.types import EnumEncoder
 
 DataClass = NewType("DataClass", Any)
 DataClassType = NewType("DataClassType", Any)
 
+# Set this to a directory to persist compiled argument specs across processes
+_SPEC_CACHE_DIR_ENV = "ARGGO_SPEC_CACHE_DIR"
+
 
 # From https://stackoverflow.com/questions/15008758/parsing-boolean-values-with-argparse
 def string_to_bool(v):
@@ -69,6 +112,81 @@ def _convert_hydra_style_args(args: List[str]) -> List[str]:
     return converted
 
 
+_SWEEP_RANGE_PATTERN = re.compile(
+    r"^range\(\s*(-?\d+)\s*,\s*(-?\d+)\s*(?:,\s*(-?\d+)\s*)?\)$"
+)
+_GLOB_CHARACTERS = re.compile(r"[*?\[]")
+
+
+def _sweep_values(value: str) -> Sequence[Any]:
+    """The values a multirun sweeps `value` over: `range(start,stop[,step])`, a glob
+    pattern matching existing paths, or a comma-separated list. Anything else is a
+    single value. Ranges are kept as `range` objects, so they are never materialized."""
+    match = _SWEEP_RANGE_PATTERN.match(value)
+    if match is not None:
+        start, stop, step = match.groups()
+        return range(int(start), int(stop), int(step) if step is not None else 1)
+    if _GLOB_CHARACTERS.search(value) is not None:
+        import glob
+
+        paths = sorted(glob.glob(value))
+        if paths:
+            return paths
+    if "," in value:
+        return value.split(",")
+    return [value]
+
+
+class HydraSweep(Sequence[List[str]]):
+    """The cartesian product of a multirun command line, e.g. `lr=0.1,0.01 seed=range(0,3)`, as a lazy sequence of
+    argparse-style argument lists (one per run). Runs are computed on access from their index, so even a sweep of
+    millions of points takes no more memory than its individual value lists. The last swept key varies fastest, as
+    with `itertools.product`."""
+
+    def __init__(self, args: List[str]):
+        # Each token is either fixed (a plain string) or swept (a key and its values)
+        self._tokens: List[Union[str, Tuple[str, Sequence[Any]]]] = []
+        self._dimensions: List[Sequence[Any]] = []
+        for arg in args:
+            key, sep, value = arg.partition("=")
+            if sep and not arg.startswith("-") and _HYDRA_STYLE_KEY_PATTERN.match(key):
+                values = _sweep_values(value)
+                self._tokens.append((key, values))
+                self._dimensions.append(values)
+            else:
+                self._tokens.append(arg)
+        self._length = 1
+        for values in self._dimensions:
+            self._length *= len(values)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> List[str]:
+        if not isinstance(index, int):
+            raise TypeError(
+                f"Sweep indices must be integers, not {type(index).__name__}"
+            )
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("Sweep index out of range")
+        # Decode `index` as a mixed-radix number, one digit per swept key
+        choices = []
+        for values in reversed(self._dimensions):
+            index, position = divmod(index, len(values))
+            choices.append(values[position])
+        choices.reverse()
+        run_args = []
+        swept = iter(choices)
+        for token in self._tokens:
+            if isinstance(token, str):
+                run_args.append(token)
+            else:
+                run_args.append(f"{token[0]}={next(swept)}")
+        return _convert_hydra_style_args(run_args)
+
+
 def _handle_kwargs_bool(field, kwargs):
     kwargs["type"] = string_to_bool
     if field.type is bool or (
@@ -85,43 +203,230 @@ def _handle_kwargs_bool(field, kwargs):
     return kwargs
 
 
-def _handle_kwargs_list(field, kwargs):
-    # Handle Generic list types
-    kwargs["nargs"] = "+"
-    kwargs["type"] = field.type.__args__[0]
-    assert all(
-        x == kwargs["type"] for x in field.type.__args__
-    ), "{} cannot be a List of mixed types".format(field.name)
+def _handle_kwargs_default(field, kwargs):
+    # A mapped_field() may have already supplied its mapper as
+    # metadata["type"]; only fall back to the raw field type
+    # when no such override is present.
+    if "type" not in kwargs:
+        kwargs["type"] = field.type
+    if field.default is not dataclasses.MISSING:
+        kwargs["default"] = field.default
+    elif field.default_factory is not dataclasses.MISSING:
+        kwargs["default"] = field.default_factory()
+    else:
+        kwargs["required"] = True
+    return kwargs
+
+
+def _handle_kwargs_collection_default(field, kwargs):
     if field.default_factory is not dataclasses.MISSING:
         kwargs["default"] = field.default_factory()
-    elif field.default is dataclasses.MISSING:
+    elif field.default is not dataclasses.MISSING:
+        kwargs["default"] = field.default
+    else:
         kwargs["required"] = True
     return kwargs
 
 
-def _handle_kwargs_enum(field, kwargs):
-    def parse_argument(arg):
-        assert isinstance(arg, str)
-        arg = arg.lower()
-        enum_types = {
-            **{
-                enum_type.name.lower(): enum_type.value
-                for enum_type in list(field.type)
-            },
-            **{str(enum_type.value): enum_type.value for enum_type in list(field.type)},
-        }
-        if arg in enum_types:
-            return field.type(enum_types[arg.lower()])
-        else:
+def _element_type(field, args):
+    element_type = args[0] if args else str
+    assert all(
+        x == element_type for x in args
+    ), "{} cannot be a collection of mixed types".format(field.name)
+    # A bare `List` (or `List[T]` for a TypeVar T) holds strings
+    return element_type if not isinstance(element_type, TypeVar) else str
+
+
+def _handle_kwargs_list(field, kwargs):
+    # Handle Generic list types
+    kwargs["nargs"] = "+"
+    kwargs["type"] = _element_converter(_element_type(field, get_args(field.type)))
+    return _handle_kwargs_collection_default(field, kwargs)
+
+
+class _StoreCollectionAction(Action):
+    """Stores the values of an `nargs` argument as `collection(values)`, rather than
+    as the plain list argparse would store."""
+
+    def __init__(self, *args, collection: Callable[[List[Any]], Any] = list, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.collection = collection
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        try:
+            setattr(namespace, self.dest, self.collection(values))
+        except (ArgumentTypeError, TypeError, ValueError) as e:
+            raise ArgumentError(self, str(e))
+
+
+def _handle_kwargs_set(field, kwargs):
+    kwargs["nargs"] = "+"
+    kwargs["type"] = _element_converter(_element_type(field, get_args(field.type)))
+    kwargs["action"] = _StoreCollectionAction
+    kwargs["collection"] = get_origin(field.type) or field.type
+    return _handle_kwargs_collection_default(field, kwargs)
+
+
+class _PositionalTuple:
+    """Converts each of a fixed number of values with the converter for its position."""
+
+    def __init__(self, converters: Tuple[Callable[[str], Any], ...]):
+        self.converters = converters
+
+    def __call__(self, values: List[str]) -> tuple:
+        return tuple(convert(value) for convert, value in zip(self.converters, values))
+
+
+def _handle_kwargs_tuple(field, kwargs):
+    args = get_args(field.type)
+    kwargs["action"] = _StoreCollectionAction
+    if len(args) == 2 and args[1] is Ellipsis:
+        # Tuple[int, ...]: any number of values of a single type
+        kwargs["nargs"] = "+"
+        kwargs["type"] = _element_converter(args[0])
+        kwargs["collection"] = tuple
+    elif args:
+        # Tuple[int, str]: exactly one value per position
+        kwargs["nargs"] = len(args)
+        kwargs["collection"] = _PositionalTuple(
+            tuple(_element_converter(arg) for arg in args)
+        )
+    else:
+        kwargs["nargs"] = "+"
+        kwargs["collection"] = tuple
+    return _handle_kwargs_collection_default(field, kwargs)
+
+
+class _KeyValueDict:
+    """Builds a dict out of `key:value` tokens, converting keys and values. (Not `key=value`,
+    which would be taken for a Hydra-style argument.)"""
+
+    def __init__(
+        self, key_converter: Callable[[str], Any], value_converter: Callable[[str], Any]
+    ):
+        self.key_converter = key_converter
+        self.value_converter = value_converter
+
+    def __call__(self, values: List[str]) -> dict:
+        result = dict()
+        for value in values:
+            key, sep, item = value.partition(":")
+            if not sep:
+                raise ArgumentTypeError(f"expected key:value, got {value!r}")
+            result[self.key_converter(key)] = self.value_converter(item)
+        return result
+
+
+def _handle_kwargs_dict(field, kwargs):
+    args = get_args(field.type)
+    key_type, value_type = args if len(args) == 2 else (str, str)
+    kwargs["nargs"] = "+"
+    kwargs["action"] = _StoreCollectionAction
+    kwargs["collection"] = _KeyValueDict(
+        _element_converter(key_type), _element_converter(value_type)
+    )
+    return _handle_kwargs_collection_default(field, kwargs)
+
+
+class _LiteralArgument:
+    """Converts a command-line token to the `Literal[...]` value it spells out."""
+
+    def __init__(self, values: Tuple[Any, ...]):
+        self.values = {str(value): value for value in values}
+        self.__name__ = "literal"
+
+    def __call__(self, arg: str):
+        if arg not in self.values:
             msg = "invalid choice: {} (choose from {})"
-            choices = ", ".join(sorted(repr(choice) for choice in enum_types.keys()))
+            choices = ", ".join(repr(choice) for choice in self.values)
             raise ArgumentTypeError(msg.format(arg, choices))
+        return self.values[arg]
+
+
+def _handle_kwargs_literal(field, kwargs):
+    values = get_args(field.type)
+    kwargs["type"] = _LiteralArgument(values)
+    kwargs["choices"] = list(values)
+    return _handle_kwargs_default(field, kwargs)
+
+
+class _EnumLookup:
+    """Lookup tables for one enum type, built once and shared by every parser (and
+    `parse_dict`) that converts values to it."""
+
+    def __init__(self, enum_type: Type[Enum]):
+        self.enum_type = enum_type
+        members = list(enum_type)
+        # Case-folded names first, so that (as before) a value wins over a name
+        # when the two collide.
+        self.index = {member.name.lower(): member for member in members}
+        self.index.update({str(member.value).lower(): member for member in members})
+        self.by_value = {}
+        for member in members:
+            try:
+                self.by_value.setdefault(member.value, member)
+            except TypeError:
+                # Unhashable values can still be looked up through the enum itself
+                pass
+        self.choices = [member.value for member in members]
+        seen_choices = set(self.by_value)
+        for member in members:
+            name = member.name.lower()
+            if name not in seen_choices:
+                seen_choices.add(name)
+                self.choices.append(name)
+        self._choices_description = None
+
+    def choices_description(self) -> str:
+        if self._choices_description is None:
+            self._choices_description = ", ".join(
+                sorted(repr(choice) for choice in self.index.keys())
+            )
+        return self._choices_description
+
+    def from_string(self, arg: str) -> Enum:
+        member = self.index.get(arg.lower(), None)
+        if member is None:
+            msg = "invalid choice: {} (choose from {})"
+            raise ArgumentTypeError(msg.format(arg.lower(), self.choices_description()))
+        return member
+
+    def from_value(self, value: Any) -> Enum:
+        if isinstance(value, self.enum_type):
+            return value
+        try:
+            return self.by_value[value]
+        except (KeyError, TypeError):
+            return self.enum_type(value)
+
+
+@functools.lru_cache(maxsize=None)
+def _enum_lookup(enum_type: Type[Enum]) -> _EnumLookup:
+    return _EnumLookup(enum_type)
+
+
+class _EnumArgument:
+    """Converts a command-line token to a member of `enum_type`, by (case-insensitive) name or value.
+    A class rather than a closure, so that compiled argument specs stay picklable."""
 
-    kwargs["type"] = parse_argument
-    kwargs["choices"] = [x.value for x in field.type]
-    kwargs["choices"] += [
-        x.name.lower() for x in field.type if x.name.lower() not in kwargs["choices"]
-    ]
+    def __init__(self, enum_type: Type[Enum]):
+        self.enum_type = enum_type
+        self.__name__ = enum_type.__name__
+        self._lookup = _enum_lookup(enum_type)
+
+    def __reduce__(self):
+        # Only pickle the enum type; the lookup table is rebuilt (once) on load
+        return _EnumArgument, (self.enum_type,)
+
+    def __call__(self, arg):
+        assert isinstance(arg, str)
+        return self._lookup.from_string(arg)
+
+
+def _handle_kwargs_enum(field, kwargs):
+    lookup = _enum_lookup(field.type)
+    kwargs["type"] = _EnumArgument(field.type)
+    kwargs["choices"] = list(lookup.choices)
     if field.default is not dataclasses.MISSING:
         kwargs["default"] = field.default
     elif field.default_factory is not dataclasses.MISSING:
@@ -131,6 +436,284 @@ def _handle_kwargs_enum(field, kwargs):
     return kwargs
 
 
+# A type handler fills in the `add_argument` kwargs for a field, given the field (whose `type` has been resolved, e.g.
+# with `Optional[...]` unwrapped) and the kwargs gathered so far from the field's metadata.
+TypeHandler = Callable[[dataclasses.Field, Dict[str, Any]], Dict[str, Any]]
+
+_TYPE_HANDLERS: Dict[Any, TypeHandler] = {}
+
+
+def register_type_handler(tp: Any, handler: TypeHandler) -> None:
+    """Register `handler` to build the arguments of fields annotated with `tp`.
+
+    `tp` is matched, in order, against: the exact field type (e.g. `List[int]`); the field type's origin (e.g.
+    `list` for any `List[...]`); and, for classes, each of the field type's base classes. `Optional[X]` (and
+    `X | None`) is unwrapped to `X` unless a handler is registered for the exact optional type.
+    """
+    _TYPE_HANDLERS[tp] = handler
+    _resolve_type_handler.cache_clear()
+    _type_handlers_fingerprint.cache_clear()
+
+
+def register_type_converter(tp: Any, converter: Callable[[str], Any]) -> None:
+    """Register `converter` to turn a command-line token into a `tp` value. A shorthand for `register_type_handler`
+    for types that take a single token, and which is also used for `tp` elements of collections (e.g. `List[tp]`).
+    """
+
+    def handler(field, kwargs):
+        kwargs["type"] = converter
+        return _handle_kwargs_default(field, kwargs)
+
+    handler.converter = converter
+    register_type_handler(tp, handler)
+
+
+def _strip_optional(tp: Any) -> Any:
+    origin = get_origin(tp)
+    if origin is Union or (UnionType is not None and origin is UnionType):
+        args = [arg for arg in get_args(tp) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return tp
+
+
+def _lookup_type_handler(tp: Any) -> Optional[TypeHandler]:
+    handler = _TYPE_HANDLERS.get(tp, None)
+    if handler is None:
+        handler = _TYPE_HANDLERS.get(get_origin(tp), None)
+    if handler is None and isinstance(tp, type):
+        handler = next(
+            (_TYPE_HANDLERS[base] for base in tp.__mro__ if base in _TYPE_HANDLERS),
+            None,
+        )
+    return handler
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_type_handler(tp: Any) -> Tuple[TypeHandler, Any]:
+    """Find the handler for fields annotated with `tp`, along with the type it should see. Memoized per type."""
+    handler = _lookup_type_handler(tp)
+    if handler is not None:
+        return handler, tp
+    resolved = _strip_optional(tp)
+    handler = _lookup_type_handler(resolved) if resolved is not tp else None
+    return handler or _handle_kwargs_default, resolved
+
+
+def _type_handler(tp: Any) -> Tuple[TypeHandler, Any]:
+    try:
+        return _resolve_type_handler(tp)
+    except TypeError:
+        # Unhashable annotations (e.g. `Literal` of a list) can't be memoized
+        return _resolve_type_handler.__wrapped__(tp)
+
+
+def _element_converter(tp: Any) -> Callable[[str], Any]:
+    """The converter for a single `tp` token, e.g. for the elements of a `List[tp]`."""
+    handler, resolved = _type_handler(tp)
+    element = dataclasses.field()
+    element.name, element.type = "element", resolved
+    return handler(element, dict()).get("type", resolved)
+
+
+@functools.lru_cache(maxsize=None)
+def _type_handlers_fingerprint() -> str:
+    # Part of the spec cache key, so cached specs are rebuilt when handlers change
+    return ", ".join(
+        f"{key}: {stable_repr(getattr(handler, 'converter', handler))}"
+        for key, handler in _TYPE_HANDLERS.items()
+    )
+
+
+register_type_handler(bool, _handle_kwargs_bool)
+register_type_handler(Optional[bool], _handle_kwargs_bool)
+register_type_handler(Enum, _handle_kwargs_enum)
+register_type_handler(list, _handle_kwargs_list)
+register_type_handler(set, _handle_kwargs_set)
+register_type_handler(frozenset, _handle_kwargs_set)
+register_type_handler(tuple, _handle_kwargs_tuple)
+register_type_handler(dict, _handle_kwargs_dict)
+if Literal is not None:
+    register_type_handler(Literal, _handle_kwargs_literal)
+
+
+@functools.lru_cache(maxsize=None)
+def _dataclass_constructor(
+    dtype: DataClassType,
+) -> Callable[[Dict[str, Any]], DataClass]:
+    """Generate a function that builds a `dtype` instance by popping exactly its init fields out of a dict of parsed
+    values (e.g. `vars(namespace)`), leaving everything else behind. Like `dataclasses` itself, this compiles
+    specialized source once per type, so splitting a namespace costs one pop per field and nothing more.
+    """
+    names = [f.name for f in dataclasses.fields(dtype) if f.init]
+    arguments = "".join(f"        {name}=values.pop({name!r}),\n" for name in names)
+    source = f"def construct(values):\n    return dtype(\n{arguments}    )\n"
+    scope = {"dtype": dtype}
+    exec(source, scope)
+    return scope["construct"]
+
+
+@functools.lru_cache(maxsize=None)
+def _dataclass_row_constructor(
+    dtype: DataClassType, names: Tuple[str, ...]
+) -> Callable[..., DataClass]:
+    """Generate a function that builds a `dtype` instance from the values of `names`, given positionally, so that
+    it can be mapped directly over columns."""
+    init_fields = [f for f in dataclasses.fields(dtype) if f.init]
+    if names == tuple(f.name for f in init_fields) and not any(
+        getattr(f, "kw_only", False) is True for f in init_fields
+    ):
+        # The columns line up with `__init__`'s own parameters
+        return dtype
+    parameters = "".join(f"{name}, " for name in names)
+    arguments = "".join(f"{name}={name}, " for name in names)
+    source = f"def construct({parameters}):\n    return _arggo_dtype({arguments})\n"
+    scope = {"_arggo_dtype": dtype}
+    exec(source, scope)
+    return scope["construct"]
+
+
+def _cast_column(
+    tp: type, cast: Optional[Callable[[Any], Any]] = None
+) -> Callable[[List[Any]], List[Any]]:
+    cast = tp if cast is None else cast
+
+    def convert(column):
+        return [
+            value if value is None or type(value) is tp else cast(value)
+            for value in column
+        ]
+
+    return convert
+
+
+def _to_int(value: Any) -> int:
+    # Like the CLI's own `int("1.7")`, rather than silently truncating
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(f"invalid int value: {value!r}")
+    return int(value)
+
+
+def _to_float(value: Any) -> float:
+    if isinstance(value, bool):
+        raise ValueError(f"invalid float value: {value!r}")
+    return float(value)
+
+
+def _mapped_column(convert: Callable[[Any], Any]) -> Callable[[List[Any]], List[Any]]:
+    """Columns of enums and bools hold few distinct values, so convert each of those
+    once and map the rest of the column through a dict."""
+
+    def convert_column(column):
+        try:
+            mapping = {value: convert(value) for value in set(column)}
+        except TypeError:
+            # Unhashable values
+            return [convert(value) for value in column]
+        return [mapping[value] for value in column]
+
+    return convert_column
+
+
+def _to_bool(value: Any) -> Any:
+    if value is None or value is True or value is False:
+        return value
+    # Numbers (e.g. 0/1 columns) go through the same truthy strings as the CLI
+    return string_to_bool(str(value))
+
+
+@functools.lru_cache(maxsize=None)
+def _column_converter(
+    tp: Any,
+) -> Optional[Callable[[List[Any]], List[Any]]]:
+    """How `parse_many` converts a whole column of `tp` values at once, or None to pass the column through as-is."""
+    _, resolved = _type_handler(tp)
+    if resolved is bool:
+        return _mapped_column(_to_bool)
+    if resolved is int:
+        return _cast_column(int, _to_int)
+    if resolved is float:
+        return _cast_column(float, _to_float)
+    if resolved is str:
+        return _cast_column(str)
+    if isinstance(resolved, type) and issubclass(resolved, Enum):
+        from_value = _enum_lookup(resolved).from_value
+        return _mapped_column(
+            lambda value: value if value is None else from_value(value)
+        )
+    return None
+
+
+def _as_list(column: Any) -> List[Any]:
+    # `tolist()` turns NumPy arrays (and pandas series) into native Python values in one go
+    return column.tolist() if hasattr(column, "tolist") else list(column)
+
+
+def _to_columns(data: Any) -> Tuple[Dict[str, List[Any]], int]:
+    """The columns of `data` (see `parse_many`) by name, and how many rows they hold, which rows without any keys
+    would otherwise lose."""
+    names = getattr(getattr(data, "dtype", None), "names", None)
+    if names is not None:
+        # A NumPy structured (or record) array
+        return {name: _as_list(data[name]) for name in names}, len(data)
+    if isinstance(data, dict):
+        columns = {name: _as_list(column) for name, column in data.items()}
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(
+                f"All columns must have the same length, got lengths {sorted(lengths)}"
+            )
+        return columns, lengths.pop() if lengths else 0
+    rows = list(data)
+    if len(rows) == 0:
+        return dict(), 0
+    names = rows[0].keys()
+    for i, row in enumerate(rows):
+        if row.keys() != names:
+            raise ValueError(
+                f"Row {i} does not have the same keys as row 0: missing {sorted(names - row.keys())}, "
+                f"extra {sorted(row.keys() - names)}"
+            )
+    return {name: [row[name] for row in rows] for name in names}, len(rows)
+
+
+def _call_default_factories(
+    dtype: DataClassType, spec: List[Tuple[Tuple[str, ...], Dict[str, Any]]]
+):
+    """A cached spec holds the values that default factories returned in the process that compiled it. Call the
+    factories again, as compiling does, so that every parser gets values of its own."""
+    factories = {
+        f"--{field.name}": field.default_factory
+        for field in dataclasses.fields(dtype)
+        if field.init and field.default_factory is not dataclasses.MISSING
+    }
+    if not factories:
+        return
+    for flags, kwargs in spec:
+        factory = factories.get(flags[0], None)
+        if factory is not None and "default" in kwargs:
+            kwargs["default"] = factory()
+
+
+def _resolve_args(
+    args: Optional[List[str]], look_for_args_file: bool, args_filename: Optional[str]
+) -> List[str]:
+    if args_filename or (look_for_args_file and len(sys.argv)):
+        if args_filename:
+            args_file = Path(args_filename)
+        else:
+            args_file = Path(sys.argv[0]).with_suffix(".args")
+
+        if args_file.exists():
+            fargs = args_file.read_text().split()
+            args = fargs + args if args is not None else fargs + sys.argv[1:]
+            # in case of duplicate arguments the first one has precedence
+            # so we append rather than prepend.
+    if args is None:
+        args = sys.argv[1:]
+    return args
+
+
 class DataClassArgumentParser(ArgumentParser):
     """
     This subclass of `argparse.ArgumentParser` uses type hints on dataclasses to generate arguments.
@@ -142,12 +725,19 @@ class DataClassArgumentParser(ArgumentParser):
     dataclass_types: Iterable[DataClassType]
 
     def __init__(
-        self, dataclass_types: Union[DataClassType, Iterable[DataClassType]], **kwargs
+        self,
+        dataclass_types: Union[DataClassType, Iterable[DataClassType]],
+        spec_cache_dir: Optional[str] = None,
+        **kwargs,
     ):
         """
         Args:
             dataclass_types:
                 Dataclass type, or list of dataclass types for which we will "fill" instances with the parsed args.
+            spec_cache_dir:
+                (Optional) A directory in which compiled argument specs are persisted, so that later processes can
+                skip introspecting unchanged dataclasses. Defaults to the `ARGGO_SPEC_CACHE_DIR` environment
+                variable; caching is disabled if neither is set.
             kwargs:
                 (Optional) Passed to `argparse.ArgumentParser()` in the regular way.
         """
@@ -156,26 +746,12 @@ class DataClassArgumentParser(ArgumentParser):
             dataclass_types = [dataclass_types]
         self.dataclass_types = dataclass_types
         self._argument_metadata = dict()
+        if spec_cache_dir is None:
+            spec_cache_dir = os.environ.get(_SPEC_CACHE_DIR_ENV, None)
+        self._spec_cache = SpecCache(spec_cache_dir) if spec_cache_dir else None
         for dtype in self.dataclass_types:
             self._add_dataclass_arguments(dtype)
 
-    @staticmethod
-    def _cleanup_complex_types(field):
-        typestring = str(field.type)
-        for prim_type in (int, float, str):
-            for collection in (List,):
-                if (
-                    typestring == f"typing.Union[{collection[prim_type]}, NoneType]"
-                    or typestring == f"typing.Optional[{collection[prim_type]}]"
-                ):
-                    field.type = collection[prim_type]
-            if (
-                typestring == f"typing.Union[{prim_type.__name__}, NoneType]"
-                or typestring == f"typing.Optional[{prim_type.__name__}]"
-            ):
-                field.type = prim_type
-        return field
-
     def _check_value(self, action, value):
         # converted value must be one of the choices (if specified)
         if isinstance(value, Enum):
@@ -188,6 +764,29 @@ class DataClassArgumentParser(ArgumentParser):
     def _add_dataclass_arguments(self, dtype: DataClassType):
         assert dtype not in self._argument_metadata
         argument_metadata = dict()
+        if self._spec_cache is None:
+            spec = self._compile_dataclass_arguments(dtype)
+        else:
+            key = spec_cache_key(dtype, _type_handlers_fingerprint())
+            spec = None if key is None else self._spec_cache.load(key)
+            if spec is None:
+                spec = self._compile_dataclass_arguments(dtype)
+                if key is not None:
+                    self._spec_cache.store(key, spec)
+            else:
+                _call_default_factories(dtype, spec)
+        for flags, kwargs in spec:
+            self.add_argument(*flags, **kwargs)
+
+        argument_metadata["constructor"] = _dataclass_constructor(dtype)
+        self._argument_metadata[dtype] = argument_metadata
+
+    @classmethod
+    def _compile_dataclass_arguments(
+        cls, dtype: DataClassType
+    ) -> List[Tuple[Tuple[str, ...], Dict[str, Any]]]:
+        """Introspect `dtype` into the `(flags, kwargs)` pairs to pass to `add_argument`, in order."""
+        spec = []
         for field in dataclasses.fields(dtype):
             if not field.init:
                 continue
@@ -202,41 +801,19 @@ class DataClassArgumentParser(ArgumentParser):
                     "We will add compatibility when Python 3.9 is released."
                 )
 
-            field = self._cleanup_complex_types(field)
-            if field.type is bool or field.type == Optional[bool]:
-                if field.default is True:
-                    self.add_argument(
-                        f"--no_{field.name}",
-                        action="store_false",
-                        dest=field.name,
-                        **kwargs,
+            handler, field_type = _type_handler(field.type)
+            field = copy.copy(field)
+            field.type = field_type
+            if handler is _handle_kwargs_bool and field.default is True:
+                spec.append(
+                    (
+                        (f"--no_{field.name}",),
+                        dict(action="store_false", dest=field.name, **kwargs),
                     )
-
-                # Hack because type=bool in argparse does not behave as we want.
-                kwargs = _handle_kwargs_bool(field, kwargs)
-            elif (
-                hasattr(field.type, "__origin__")
-                and re.search(r"^typing\.List\[(.*)\]$", str(field.type)) is not None
-            ):
-                # Handle list types (+ generics)
-                kwargs = _handle_kwargs_list(field, kwargs)
-            elif isinstance(field.type, type) and issubclass(field.type, Enum):
-                kwargs = _handle_kwargs_enum(field, kwargs)
-            else:
-                # A mapped_field() may have already supplied its mapper as
-                # metadata["type"]; only fall back to the raw field type
-                # when no such override is present.
-                if "type" not in kwargs:
-                    kwargs["type"] = field.type
-                if field.default is not dataclasses.MISSING:
-                    kwargs["default"] = field.default
-                elif field.default_factory is not dataclasses.MISSING:
-                    kwargs["default"] = field.default_factory()
-                else:
-                    kwargs["required"] = True
-            self.add_argument(field_name, **kwargs)
-
-        self._argument_metadata[dtype] = argument_metadata
+                )
+            kwargs = handler(field, kwargs)
+            spec.append(((field_name,), kwargs))
+        return spec
 
     def parse_args_into_dataclasses(
         self,
@@ -266,29 +843,13 @@ class DataClassArgumentParser(ArgumentParser):
                   after initialization.
                 - The potential list of remaining argument strings. (same as argparse.ArgumentParser.parse_known_args)
         """
-        if args_filename or (look_for_args_file and len(sys.argv)):
-            if args_filename:
-                args_file = Path(args_filename)
-            else:
-                args_file = Path(sys.argv[0]).with_suffix(".args")
-
-            if args_file.exists():
-                fargs = args_file.read_text().split()
-                args = fargs + args if args is not None else fargs + sys.argv[1:]
-                # in case of duplicate arguments the first one has precedence
-                # so we append rather than prepend.
-        if args is None:
-            args = sys.argv[1:]
+        args = _resolve_args(args, look_for_args_file, args_filename)
         args = _convert_hydra_style_args(args)
         namespace, remaining_args = self.parse_known_args(args=args)
         outputs = []
+        values = vars(namespace)
         for dtype in self.dataclass_types:
-            keys = {f.name for f in dataclasses.fields(dtype) if f.init}
-
-            inputs = {k: v for k, v in vars(namespace).items() if k in keys}
-            for k in keys:
-                delattr(namespace, k)
-            obj = dtype(**inputs)
+            obj = self._argument_metadata[dtype]["constructor"](values)
             outputs.append(obj)
         if len(namespace.__dict__) > 0:
             # additional namespace.
@@ -303,6 +864,27 @@ class DataClassArgumentParser(ArgumentParser):
 
             return (*outputs,)
 
+    def parse_sweep_into_dataclasses(
+        self,
+        args=None,
+        look_for_args_file=True,
+        args_filename=None,
+    ) -> Iterator[Tuple[DataClass, ...]]:
+        """
+        Parse a multirun command line, where Hydra-style `key=value` tokens may sweep over several values
+        (`lr=0.1,0.01`, `seed=range(0,100)` or a glob such as `data=inputs/*.csv`), into the dataclass instances of
+        each point of the cartesian product. Arguments are handled as in `parse_args_into_dataclasses`, with
+        remaining strings ignored.
+        Returns:
+            A lazy iterator over the points of the sweep: each is a tuple of dataclass instances, in the same order
+            as they were passed to the initializer. Use `HydraSweep` directly for the number of points.
+        """
+        sweep = HydraSweep(_resolve_args(args, look_for_args_file, args_filename))
+        for run_args in sweep:
+            yield self.parse_args_into_dataclasses(
+                args=run_args, return_remaining_strings=True, look_for_args_file=False
+            )[:-1]
+
     def parse_json_file(self, json_file: str) -> Tuple[DataClass, ...]:
         """
         Alternative helper method that does not use `argparse` at all, instead loading a json file and populating the
@@ -322,7 +904,9 @@ class DataClassArgumentParser(ArgumentParser):
             inputs = dict()
             for field in fields:
                 if isinstance(field.type, type) and issubclass(field.type, Enum):
-                    inputs[field.name] = field.type(args[field.name])
+                    inputs[field.name] = _enum_lookup(field.type).from_value(
+                        args[field.name]
+                    )
                 elif field.init:
                     inputs[field.name] = args[field.name]
 
@@ -330,6 +914,42 @@ class DataClassArgumentParser(ArgumentParser):
             outputs.append(obj)
         return (*outputs,)
 
+    def parse_many(self, data: Any) -> Tuple[List[DataClass], ...]:
+        """
+        A bulk version of `parse_dict`, for turning many configurations into dataclass instances at once. Rather than
+        handling one dict at a time, every column is validated and converted in a single pass (enum lookup, bool
+        coercion and `int`/`float`/`str` casts), and instances are then built straight from the columns.
+        Args:
+            data:
+                Either a list of dicts (one per instance), a dict of columns (lists, or anything with `tolist()`, such
+                as NumPy arrays), or a NumPy structured array. Fields without a column get their dataclass default.
+        Returns:
+            A tuple with a list of instances for each of the dataclass types, in the same order as they were passed
+            to the initializer.
+        """
+        columns, count = _to_columns(data)
+        outputs = []
+        for dtype in self.dataclass_types:
+            names = []
+            converted = []
+            for field in dataclasses.fields(dtype):
+                if not field.init or field.name not in columns:
+                    continue
+                column = columns[field.name]
+                try:
+                    convert = _column_converter(field.type)
+                except TypeError:
+                    # Unhashable annotations can't be memoized
+                    convert = _column_converter.__wrapped__(field.type)
+                names.append(field.name)
+                converted.append(column if convert is None else convert(column))
+            construct = _dataclass_row_constructor(dtype, tuple(names))
+            if names:
+                outputs.append(list(map(construct, *converted)))
+            else:
+                outputs.append([construct() for _ in range(count)])
+        return (*outputs,)
+
 
 def dataclass_to_json(args: DataClassType, additional_dict: dict = None) -> str:
     """
@@ -1,6 +1,8 @@
+import time
+import warnings
 from abc import ABCMeta, abstractmethod
 from argparse import ArgumentParser
-from typing import Any, Dict, List, Type, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
 
 
 class PluginMeta(ABCMeta):
@@ -9,15 +11,23 @@ class PluginMeta(ABCMeta):
     default plugin - core.py doesn't need to name it explicitly."""
 
     registry: List[Type["Plugin"]] = []
+    # Bumped on every registration, so anything derived from the registry (e.g. the
+    # meta-argument parser) can be cached until a new plugin shows up.
+    registry_version: int = 0
 
     def __new__(mcs, class_name, bases, namespace, **kwargs):
         cls = super().__new__(mcs, class_name, bases, namespace, **kwargs)
         if not cls.__abstractmethods__:
             mcs.registry.append(cls)
+            mcs.registry_version += 1
         return cls
 
 
 class Plugin(metaclass=PluginMeta):
+    # How long (in seconds) `parameters_dump` may take before the run goes on without it.
+    # None defers to the timeout the run was configured with.
+    timeout: Optional[float] = None
+
     @property
     @abstractmethod
     def name(self):
@@ -36,7 +46,52 @@ class Plugin(metaclass=PluginMeta):
         protected by Arggo's reserved-argument-name check."""
         pass
 
+    # Lifecycle hooks, called around the task of a run. Each call is timed, and how it
+    # went is recorded in the run's parameters.json (under __arggo.plugins.<name>).
+
+    def on_run_start(self, run_dir: str, parameters: Any) -> None:
+        """Called once the run's directory and parameters.json exist, before the task starts."""
+        pass
+
+    def on_run_end(self, run_dir: str, result: Any) -> None:
+        """Called at exit, after the task's last call returned `result`, e.g. to flush, upload or close."""
+        pass
+
+    def on_exception(self, run_dir: str, exception: BaseException) -> None:
+        """Called instead of `on_run_end` as soon as a call of the task raised `exception` (which is re-raised
+        afterwards)."""
+        pass
+
     def __eq__(self, other):
         if isinstance(other, Plugin):
             return self.name == other.name
         return False
+
+
+def timed_call(function: Callable[..., Any], *args) -> Tuple[Dict[str, Any], Any]:
+    """Call `function`, and return how it went (its status, duration and error, if any) along with its result."""
+    start = time.perf_counter()
+    try:
+        result = function(*args)
+        outcome = {"status": "ok"}
+    except Exception as e:
+        result = None
+        outcome = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+    outcome["seconds"] = time.perf_counter() - start
+    return outcome, result
+
+
+def call_hooks(plugins: List[Plugin], hook: str, *args) -> Dict[str, Dict[str, Any]]:
+    """Call the lifecycle hook named `hook` of every plugin that implements it. A failing hook only warns.
+
+    :return: How each call went, by plugin name and then by hook
+    """
+    outcomes = dict()
+    for plugin in plugins:
+        if getattr(type(plugin), hook) is getattr(Plugin, hook):
+            continue
+        outcome, _ = timed_call(getattr(plugin, hook), *args)
+        if outcome["status"] == "failed":
+            warnings.warn(f"Plugin {plugin.name} failed in {hook}: {outcome['error']}")
+        outcomes[plugin.name] = {hook: outcome}
+    return outcomes
@@ -0,0 +1,263 @@
+# Measurements of Arggo itself and of the tasks it runs
+import collections
+import contextlib
+import functools
+import os
+import sys
+import threading
+import time
+import typing
+from os.path import exists, join
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+
+class StartupProfile:
+    """How long each phase of setting up a run took, in seconds, in the order the phases ran."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.phases: Dict[str, float] = dict()
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def as_table(self):
+        from rich.table import Table
+
+        table = Table(title="Arggo startup")
+        table.add_column("Phase")
+        table.add_column("Milliseconds", justify="right")
+        for phase, seconds in self.phases.items():
+            table.add_row(phase, f"{seconds * 1000:.3f}")
+        return table
+
+
+# Stands in for a phase when startup isn't being profiled
+_NOT_PROFILED = contextlib.nullcontext()
+
+
+def profile_phase(profile: "StartupProfile", phase: str):
+    """Time `phase` into `profile`, if there is one."""
+    return _NOT_PROFILED if profile is None else profile.phase(phase)
+
+
+class ResourceMeter:
+    """What a process used from the moment a meter is created: wall and CPU time (its own and its waited-for
+    children's), its peak RSS and the bytes it read from and wrote to storage, where the platform reports them.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._start = time.perf_counter()
+        self._times = os.times()
+        self._io = _io_counters()
+
+    def usage(self) -> Dict[str, Any]:
+        times = os.times()
+        usage = {
+            "wall_seconds": time.perf_counter() - self._start,
+            "user_seconds": times.user - self._times.user,
+            "system_seconds": times.system - self._times.system,
+            "children_user_seconds": times.children_user - self._times.children_user,
+            "children_system_seconds": times.children_system
+            - self._times.children_system,
+            # The process's own, since it started rather than since the meter was
+            "peak_rss_bytes": _peak_rss(),
+        }
+        io = _io_counters()
+        for counter in ("read_bytes", "write_bytes"):
+            if io.get(counter, None) is not None and counter in self._io:
+                usage[counter] = io[counter] - self._io[counter]
+            else:
+                usage[counter] = None
+        return usage
+
+
+def _peak_rss() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # In kilobytes everywhere but macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _io_counters() -> Dict[str, int]:
+    try:
+        with open("/proc/self/io") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        # Not Linux, or not permitted
+        return dict()
+    counters = dict()
+    for line in lines:
+        name, _, value = line.partition(":")
+        counters[name] = int(value)
+    return counters
+
+
+# What `profiled` writes into the run's directory, by mode
+PROFILE_FILE_NAMES = {
+    "cpu": "profile.prof",
+    "sample": "profile_samples.txt",
+    "memory": "profile_memory.txt",
+}
+
+
+def profiled(
+    function: Callable[..., Any],
+    mode: str,
+    output_dir: str,
+    sample_interval: float = 0.005,
+    top: int = 50,
+) -> Callable[..., Any]:
+    """
+    Wrap `function` with a profiler, which saves what it measured into `output_dir` once the function returns or
+    raises (see `PROFILE_FILE_NAMES`).
+    :param mode: "cpu" for cProfile, "sample" for a sampling timer (much lower overhead, saved as collapsed stacks
+    that flame graph tools accept) or "memory" for the top allocations that tracemalloc saw
+    :param sample_interval: How often (in seconds) the sampling timer samples
+    :param top: How many allocation sites the memory report lists
+    """
+    output_file = join(output_dir, PROFILE_FILE_NAMES[mode])
+    if mode == "cpu":
+        return functools.partial(_call_profiled, function, output_file)
+    if mode == "sample":
+        return functools.partial(_call_sampled, function, output_file, sample_interval)
+    return functools.partial(_call_traced, function, output_file, top)
+
+
+def _call_profiled(function, output_file, *args, **kwargs):
+    import cProfile
+
+    profile = cProfile.Profile()
+    try:
+        return profile.runcall(function, *args, **kwargs)
+    finally:
+        profile.dump_stats(output_file)
+
+
+def _call_sampled(function, output_file, interval, *args, **kwargs):
+    sampler = _Sampler(threading.get_ident(), interval)
+    sampler.start()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        sampler.stop()
+        with open(output_file, "w") as f:
+            for stack, count in sampler.stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+
+
+def _call_traced(function, output_file, top, *args, **kwargs):
+    import tracemalloc
+
+    # Don't stop tracing that someone else started
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if not was_tracing:
+            tracemalloc.stop()
+        statistics = snapshot.statistics("lineno")
+        with open(output_file, "w") as f:
+            f.write(f"Current: {current} B, peak: {peak} B\n")
+            f.write(f"Top {min(top, len(statistics))} allocation sites:\n")
+            for statistic in statistics[:top]:
+                f.write(f"{statistic}\n")
+
+
+class _Sampler:
+    """Samples the stack of one thread from a daemon thread of its own."""
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        super().__init__()
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: typing.Counter[Tuple[str, ...]] = collections.Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id, None)
+            stack = []
+            code = None
+            # Only the profiled function's frames, not the ones that called it
+            while frame is not None and frame.f_code is not _call_sampled.__code__:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            # Nor the sampler's own, once the function has returned
+            if stack and code is not _Sampler.stop.__code__:
+                self.stacks[tuple(reversed(stack))] += 1
+
+
+def render_profile(run_dir: str, sort: str = "cumulative", limit: int = 30) -> bool:
+    """Print the profiles saved in `run_dir`, and return whether there were any."""
+    import pstats
+
+    found = False
+    for mode, file_name in PROFILE_FILE_NAMES.items():
+        path = join(run_dir, file_name)
+        if not exists(path):
+            continue
+        found = True
+        if mode == "cpu":
+            pstats.Stats(path, stream=sys.stdout).sort_stats(sort).print_stats(limit)
+        elif mode == "sample":
+            _render_samples(path, limit)
+        else:
+            with open(path) as f:
+                sys.stdout.write(f.read())
+    return found
+
+
+def _render_samples(path: str, limit: int) -> None:
+    from rich.console import Console
+    from rich.table import Table
+
+    own = collections.Counter()
+    total = collections.Counter()
+    samples = 0
+    with open(path) as f:
+        for line in f:
+            stack, count = line.rstrip("\n").rsplit(" ", 1)
+            functions = stack.split(";")
+            count = int(count)
+            samples += count
+            own[functions[-1]] += count
+            for function in set(functions):
+                total[function] += count
+    table = Table(title=f"{samples} samples")
+    table.add_column("Function")
+    table.add_column("Own %", justify="right")
+    table.add_column("Total %", justify="right")
+    for function, count in total.most_common(limit):
+        table.add_row(
+            function,
+            f"{100 * own[function] / samples:.1f}",
+            f"{100 * count / samples:.1f}",
+        )
+    Console().print(table)
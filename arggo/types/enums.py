@@ -1,9 +1,15 @@
 import json
 from enum import Enum
+from pathlib import PurePath
 
 
 class EnumEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, Enum):
             return obj.value
+        # Other field types the parser supports, which json can't encode natively
+        if isinstance(obj, PurePath):
+            return str(obj)
+        if isinstance(obj, (set, frozenset)):
+            return list(obj)
         return json.JSONEncoder.default(self, obj)
@@ -0,0 +1,47 @@
+"""Per-call overhead of a consume/configure-decorated entry point.
+
+Run with `python benchmarks/bench_decorated_main.py`. The first call does the one-time
+setup (argument parsing, workdir, logging, saving parameters); this measures the calls
+after it, compared with calling the undecorated function directly.
+"""
+import os
+import sys
+import tempfile
+import timeit
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import arggo  # noqa: E402
+
+
+@dataclass
+class Arguments:
+    learning_rate: float = 0.1
+    epochs: int = 10
+
+
+def step(index: int, args: Arguments):
+    return index
+
+
+def main(number: int = 100_000):
+    sys.argv = sys.argv[:1]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        decorated = arggo.configure(parser_argument_index=1)(step)
+        decorated(0)
+
+        arguments = Arguments()
+        direct = timeit.timeit(lambda: step(0, arguments), number=number)
+        wrapped = timeit.timeit(lambda: decorated(0), number=number)
+
+    direct_us = direct / number * 1e6
+    wrapped_us = wrapped / number * 1e6
+    print(f"direct call:    {direct_us:.3f} us/call")
+    print(f"decorated call: {wrapped_us:.3f} us/call")
+    print(f"overhead:       {wrapped_us - direct_us:.3f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Throughput of printing through `WrapperStream` into a log file: writing the file
+directly from the printing thread, as `FileLogger` used to, against `BufferedFileWriter`.
+
+Run with `python benchmarks/bench_file_logger.py`.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from os.path import join
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arggo.logger import BufferedFileWriter, WrapperStream  # noqa: E402
+
+
+class LineFlushedFile:
+    """A direct writer that flushes every line, for output that survives a crash."""
+
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, message):
+        self.file.write(message)
+        if message.endswith("\n"):
+            self.file.flush()
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def measure(log, count: int):
+    stream = WrapperStream(None, log)
+    line = "epoch 1 step 100 loss 0.123456 accuracy 0.987654"
+    start = time.perf_counter()
+    for _ in range(count):
+        print(line, file=stream)
+    printed = time.perf_counter() - start
+    log.close()
+    return printed, time.perf_counter() - start
+
+
+def main(count: int = 500_000):
+    log_dir = tempfile.mkdtemp(prefix="arggo-bench-")
+    try:
+        for name, make_log in (
+            ("direct", lambda path: open(path, "w")),
+            ("direct, line flushed", lambda path: LineFlushedFile(open(path, "w"))),
+            ("BufferedFileWriter", lambda path: BufferedFileWriter(open(path, "w"))),
+        ):
+            printed, total = measure(make_log(join(log_dir, "output.log")), count)
+            print(
+                f"{name:<22} {count / printed:>12,.0f} lines/s printed, "
+                f"{count / total:>12,.0f} lines/s including the final drain"
+            )
+    finally:
+        shutil.rmtree(log_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""`_lookup_experiments`, with and without its discovery cache, against the previous
+recursive implementation, on a synthetic logging directory of `<date>/<time>` runs.
+
+Run with `python benchmarks/bench_lookup_experiments.py [number_of_runs]`.
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from functools import partial
+from os.path import join
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arggo.cli.cli import _lookup_experiments  # noqa: E402
+
+RUNS_PER_DAY = 1000
+
+
+def make_tree(base_dir: str, count: int):
+    parameters = {"learning_rate": 0.1, "batch_size": 32, "name": "run"}
+    for i in range(count):
+        run_dir = join(base_dir, f"day-{i // RUNS_PER_DAY:04d}", f"{i:06d}")
+        os.makedirs(join(run_dir, "checkpoints"))
+        script = "train.py" if i % 2 else "evaluate.py"
+        with open(join(run_dir, "parameters.json"), "w") as f:
+            json.dump({**parameters, "__arggo": {"script": script}}, f, indent=4)
+
+
+def recursive_lookup(base_dir: str, experiment_name: str):
+    # The implementation this benchmark compares against
+    def validate(file_path):
+        with open(file_path) as f:
+            script = json.load(f)["__arggo"].get("script", None)
+        return script is not None and script.split("/")[-1].replace(
+            ".py", ""
+        ) == experiment_name.replace(".py", "")
+
+    found_directories = []
+    for sub_folder in os.scandir(base_dir):
+        if sub_folder.is_dir():
+            parameters_file_path = join(sub_folder.path, "parameters.json")
+            if os.path.isfile(parameters_file_path) and validate(parameters_file_path):
+                found_directories.append(sub_folder.path)
+            found_directories += recursive_lookup(sub_folder.path, experiment_name)
+    return found_directories
+
+
+def main(count: int):
+    base_dir = tempfile.mkdtemp(prefix="arggo-bench-")
+    try:
+        print(f"Creating {count} runs in {base_dir}...")
+        make_tree(base_dir, count)
+        # Directories modified within the last couple of seconds are never cached
+        time.sleep(2)
+        for name, lookup in (
+            ("recursive", recursive_lookup),
+            ("uncached", partial(_lookup_experiments, use_cache=False)),
+            ("cold cache", _lookup_experiments),
+            ("warm cache", _lookup_experiments),
+        ):
+            start = time.perf_counter()
+            found = lookup(base_dir, "train")
+            elapsed = time.perf_counter() - start
+            print(f"{name:<20} {elapsed:.3f}s ({len(found)} runs found)")
+    finally:
+        shutil.rmtree(base_dir)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
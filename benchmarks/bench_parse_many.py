@@ -0,0 +1,65 @@
+"""Bulk `DataClassArgumentParser.parse_many` against calling `parse_dict` in a loop.
+
+Run with `python benchmarks/bench_parse_many.py`.
+"""
+import os
+import sys
+import timeit
+from dataclasses import dataclass
+from enum import Enum
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arggo.parser import DataClassArgumentParser  # noqa: E402
+
+
+class Optimizer(Enum):
+    SGD = "sgd"
+    ADAM = "adam"
+
+
+@dataclass
+class Config:
+    learning_rate: float = 0.1
+    batch_size: int = 32
+    optimizer: Optimizer = Optimizer.SGD
+    shuffle: bool = True
+    name: str = "run"
+
+
+def make_rows(count: int):
+    return [
+        {
+            "learning_rate": 0.1 / (i + 1),
+            "batch_size": 32 * (i % 4 + 1),
+            "optimizer": "adam" if i % 2 else "sgd",
+            "shuffle": "true" if i % 3 else "false",
+            "name": f"run-{i}",
+        }
+        for i in range(count)
+    ]
+
+
+def main(count: int = 50_000, repeat: int = 3):
+    parser = DataClassArgumentParser(Config)
+    rows = make_rows(count)
+    columns = {name: [row[name] for row in rows] for name in rows[0]}
+
+    def loop():
+        return [parser.parse_dict(row)[0] for row in rows]
+
+    per_dict = min(timeit.repeat(loop, number=1, repeat=repeat))
+    from_rows = min(
+        timeit.repeat(lambda: parser.parse_many(rows), number=1, repeat=repeat)
+    )
+    from_columns = min(
+        timeit.repeat(lambda: parser.parse_many(columns), number=1, repeat=repeat)
+    )
+    print(f"parse_dict loop:       {per_dict / count * 1e6:.3f} us/config")
+    print(f"parse_many (rows):     {from_rows / count * 1e6:.3f} us/config")
+    print(f"parse_many (columns):  {from_columns / count * 1e6:.3f} us/config")
+    print(f"speedup (columns):     {per_dict / from_columns:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Per-record overhead of structured (JSON lines) capture: printing through the plain
+`output.log` tee alone, and with `StructuredStream` on top of it; and a `logging` call
+with and without a `StructuredLogRecordFactory` installed (as `structured_logs=True` does).
+
+Run with `python benchmarks/bench_structured_logs.py`.
+"""
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from os.path import join
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arggo.logger import (  # noqa: E402
+    BufferedFileWriter,
+    StructuredLogRecordFactory,
+    StructuredStream,
+    WrapperStream,
+    open_structured_log,
+)
+
+LINE = "epoch 1 step 100 loss 0.123456 accuracy 0.987654"
+
+
+def time_prints(stream, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        print(LINE, file=stream)
+    return time.perf_counter() - start
+
+
+def time_logging(logger, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        logger.info("step %d loss %f", 100, 0.123456)
+    return time.perf_counter() - start
+
+
+def main(count: int = 200_000):
+    log_dir = tempfile.mkdtemp(prefix="arggo-bench-")
+    logger = logging.getLogger("bench")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    original_factory = logging.getLogRecordFactory()
+    try:
+        log = BufferedFileWriter(open(join(log_dir, "output.log"), "w"))
+        plain = time_prints(WrapperStream(None, log), count)
+        records = open_structured_log(join(log_dir, "output.jsonl"))
+        structured = time_prints(
+            StructuredStream(WrapperStream(None, log), records, "stdout"), count
+        )
+        start = time.perf_counter()
+        records.close()
+        drain = time.perf_counter() - start
+
+        logger.addHandler(logging.NullHandler())
+        unhandled = time_logging(logger, count)
+        records = open_structured_log(join(log_dir, "logging.jsonl"))
+        logging.setLogRecordFactory(StructuredLogRecordFactory(records))
+        try:
+            handled = time_logging(logger, count)
+        finally:
+            logging.setLogRecordFactory(original_factory)
+        records.close()
+        log.close()
+
+        def per_record(seconds):
+            return seconds / count * 1e6
+
+        print(f"print, output.log only:       {per_record(plain):.3f} us/line")
+        print(f"print, with output.jsonl:     {per_record(structured):.3f} us/line")
+        print(f"  background encoding drain:  {per_record(drain):.3f} us/line")
+        print(f"logging.info, NullHandler:    {per_record(unhandled):.3f} us/record")
+        print(f"logging.info, structured:     {per_record(handled):.3f} us/record")
+    finally:
+        logger.handlers.clear()
+        shutil.rmtree(log_dir)
+
+
+if __name__ == "__main__":
+    main()
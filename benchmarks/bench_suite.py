@@ -0,0 +1,257 @@
+"""The benchmark suite: times Arggo's hot paths and saves the results as JSON, so that
+runs can be compared across commits.
+
+Run with `python benchmarks/bench_suite.py`. Results go to
+`benchmarks/results/<commit>.json` unless `--output` says otherwise. Pass
+`--compare <results.json>` to compare against an earlier run, and `--max_slowdown 1.2`
+to also fail if any case got more than 20% slower. `--quick` skips the largest cases,
+and `-k <substring>` runs only the matching ones.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import field, make_dataclass
+from functools import partial
+from os.path import dirname, join
+from typing import List
+
+_BENCHMARKS_DIR = dirname(os.path.abspath(__file__))
+_REPOSITORY_DIR = dirname(_BENCHMARKS_DIR)
+sys.path.insert(0, _REPOSITORY_DIR)
+
+from arggo._internal.global_store import GlobalStore  # noqa: E402
+from arggo.cli.cli import _lookup_experiments  # noqa: E402
+from arggo.logger import FileLogger  # noqa: E402
+from arggo.parser import DataClassArgumentParser, dataclass_to_json  # noqa: E402
+from bench_lookup_experiments import make_tree  # noqa: E402
+
+# Field types cycle through these, with a default and a command line value for each
+_FIELD_TYPES = ((int, 1, "2"), (float, 0.1, "0.2"), (str, "a", "b"))
+
+
+def make_config(count: int, name: str = "Config"):
+    """A fresh dataclass of `count` fields, so that no per-type cache has seen it yet."""
+    fields = []
+    for i in range(count):
+        tp, default, _ = _FIELD_TYPES[i % len(_FIELD_TYPES)]
+        fields.append((f"field_{i}", tp, field(default=default)))
+    return make_dataclass(f"{name}{count}", fields)
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def measure_parser_construction(count: int) -> float:
+    config = make_config(count)
+    return timed(lambda: DataClassArgumentParser(config))
+
+
+def parser_cases(quick: bool):
+    os.environ.pop("ARGGO_SPEC_CACHE_DIR", None)
+    for count in (10, 100, 1000):
+        yield f"parser_construction[{count} fields]", partial(
+            measure_parser_construction, count
+        )
+
+
+def parse_cases(quick: bool):
+    count = 1000
+    parser = DataClassArgumentParser(make_config(count))
+    args = []
+    for i in range(count):
+        args += [f"--field_{i}", _FIELD_TYPES[i % len(_FIELD_TYPES)][2]]
+    yield f"parse_args_into_dataclasses[{count} fields]", lambda: timed(
+        lambda: parser.parse_args_into_dataclasses(args, look_for_args_file=False)
+    )
+
+    length = 100_000
+    listed = make_dataclass(
+        "Listed", [("values", List[int], field(default_factory=list))]
+    )
+    list_parser = DataClassArgumentParser(listed)
+    list_args = ["--values", *map(str, range(length))]
+    yield f"parse_args_into_dataclasses[list of {length}]", lambda: timed(
+        lambda: list_parser.parse_args_into_dataclasses(
+            list_args, look_for_args_file=False
+        )
+    )
+
+
+def json_cases(quick: bool):
+    length = 100_000
+    results = make_dataclass(
+        "Results",
+        [
+            ("losses", List[float], field(default_factory=list)),
+            ("names", List[str], field(default_factory=list)),
+        ],
+    )
+    instance = results(
+        [i / 7 for i in range(length)], [f"run-{i}" for i in range(length)]
+    )
+    yield f"dataclass_to_json[2 lists of {length}]", lambda: timed(
+        lambda: dataclass_to_json(instance)
+    )
+
+
+def logger_cases(quick: bool):
+    count = 200_000
+    line = "epoch 1 step 100 loss 0.123456 accuracy 0.987654"
+    log_dir = tempfile.mkdtemp(prefix="arggo-bench-")
+    repetitions = []
+
+    def measure():
+        repetitions.append(None)
+        original = sys.stdout
+        terminal = open(os.devnull, "w")
+        sys.stdout = terminal
+        try:
+            # A store of its own, as a logger binds only once per store
+            logger = FileLogger(
+                GlobalStore(f"bench-{len(repetitions)}"),
+                join(log_dir, f"output-{len(repetitions)}.log"),
+            )
+            logger.bind()
+            start = time.perf_counter()
+            for _ in range(count):
+                print(line)
+            # Until everything is on disk
+            logger.log.close()
+            return time.perf_counter() - start
+        finally:
+            sys.stdout = original
+            terminal.close()
+
+    try:
+        yield f"file_logger[{count} lines]", measure
+    finally:
+        shutil.rmtree(log_dir)
+
+
+def lookup_cases(quick: bool):
+    for count in (1000, 10_000) if quick else (1000, 10_000, 100_000):
+        base_dir = tempfile.mkdtemp(prefix="arggo-bench-")
+        try:
+            make_tree(base_dir, count)
+            # Directories modified within the last couple of seconds are never cached
+            time.sleep(2)
+            yield f"lookup_experiments[{count} runs, uncached]", lambda: timed(
+                lambda: _lookup_experiments(base_dir, "train", use_cache=False)
+            )
+            _lookup_experiments(base_dir, "train")
+            yield f"lookup_experiments[{count} runs, warm cache]", lambda: timed(
+                lambda: _lookup_experiments(base_dir, "train")
+            )
+        finally:
+            shutil.rmtree(base_dir)
+
+
+# By the prefix of their names, so that a group that -k rules out isn't even set up
+CASES = {
+    "parser_construction": parser_cases,
+    "parse_args_into_dataclasses": parse_cases,
+    "dataclass_to_json": json_cases,
+    "file_logger": logger_cases,
+    "lookup_experiments": lookup_cases,
+}
+
+
+def run(repeat: int, quick: bool, keyword: str = None):
+    results = dict()
+    for prefix, cases in CASES.items():
+        if keyword is not None and keyword not in prefix and prefix not in keyword:
+            continue
+        for name, measure in cases(quick):
+            if keyword is not None and keyword not in name:
+                continue
+            times = [measure() for _ in range(repeat)]
+            results[name] = {
+                "min": min(times),
+                "median": statistics.median(times),
+                "repeat": repeat,
+            }
+            print(f"{name:<55} {min(times) * 1000:10.3f} ms", flush=True)
+    return results
+
+
+def commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=_REPOSITORY_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, results: dict, max_slowdown: float = None):
+    """Print the ratio of every case's best time to the baseline's, and return the cases slower than `max_slowdown`."""
+    print(f"\nCompared with {baseline['commit']}:")
+    regressions = []
+    for name, result in results.items():
+        before = baseline["results"].get(name, None)
+        if before is None:
+            print(f"{name:<55} {'(new)':>10}")
+            continue
+        ratio = result["min"] / before["min"]
+        print(f"{name:<55} {ratio:9.2f}x")
+        if max_slowdown is not None and ratio > max_slowdown:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None)
+    parser.add_argument("--max_slowdown", type=float, default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true")
+    parser.add_argument("-k", dest="keyword", default=None)
+    args = parser.parse_args()
+
+    revision = commit()
+    results = run(args.repeat, args.quick, args.keyword)
+    output = args.output or join(
+        _BENCHMARKS_DIR, "results", f"{revision or 'unknown'}.json"
+    )
+    os.makedirs(dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(
+            {
+                "commit": revision,
+                "time": datetime.datetime.now().isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "unit": "seconds",
+                "results": results,
+            },
+            f,
+            indent=4,
+        )
+    print(f"Saved the results to {output}")
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.max_slowdown)
+        if regressions:
+            print(f"Slower than {args.max_slowdown}x: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
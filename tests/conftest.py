@@ -15,4 +15,8 @@ def _reset_global_store():
     between tests."""
     GlobalStore().clear()
     yield
+    # As a process would at exit, end the run it started
+    bound_state = GlobalStore().get("bound_state", None)
+    if bound_state is not None:
+        bound_state.end()
     GlobalStore().clear()
@@ -1,3 +1,4 @@
+import json
 from dataclasses import field, dataclass
 from enum import Enum
 
@@ -28,6 +29,13 @@ class ComplexArguments:
     type: GreetingType = field(default=GreetingType.NORMAL)
 
 
+@arggo.configure(parser_argument_index=1)
+def pooled_task(prefix: str, args: SimpleArguments):
+    # Module-level, so that worker processes can resolve it by name
+    print(f"running {args.just_a_string}")
+    return prefix + args.just_a_string
+
+
 class TestSimpleAnnotation:
     def test_function_no_arguments(self):
         @arggo.consume
@@ -104,3 +112,56 @@ class TestMultipleConfigureCalls:
         first()
         with pytest.raises(ArggoAlreadyConfiguredError):
             second()
+
+    def test_repeated_calls_reuse_bound_state(self, monkeypatch):
+        from arggo.experiment import NewExperiment
+
+        saved = []
+        monkeypatch.setattr(
+            NewExperiment, "save_json", lambda self, *args: saved.append(self)
+        )
+
+        @arggo.configure(parser_argument_index=1)
+        def decorated(count: int, args: SimpleArguments):
+            return args
+
+        results = [decorated(i) for i in range(3)]
+        assert len(saved) == 1
+        assert all(result is results[0] for result in results)
+
+
+class TestMultirun:
+    def test_runs_every_point_in_its_own_directory(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(
+            "sys.argv", ["prog", "--arggo_multirun", "just_a_string=a,b,c"]
+        )
+
+        @arggo.configure(parser_argument_index=1)
+        def decorated(prefix: str, args: SimpleArguments):
+            return prefix + args.just_a_string
+
+        assert decorated(">") == [">a", ">b", ">c"]
+        for index, value in enumerate("abc"):
+            (parameters_file,) = tmp_path.glob(f"logs/*/*/{index}/parameters.json")
+            parameters = json.loads(parameters_file.read_text())
+            assert parameters["just_a_string"] == value
+
+    def test_process_pool_gives_each_job_its_own_log(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(
+            "sys.argv",
+            [
+                "prog",
+                "--arggo_multirun",
+                "--arggo_max_workers",
+                "2",
+                "just_a_string=a,b,c",
+            ],
+        )
+
+        assert pooled_task(">") == [">a", ">b", ">c"]
+        for index, value in enumerate("abc"):
+            (job_dir,) = tmp_path.glob(f"logs/*/*/{index}")
+            assert (job_dir / "parameters.json").exists()
+            assert (job_dir / "output.log").read_text() == f"running {value}\n"
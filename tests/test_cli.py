@@ -0,0 +1,198 @@
+import gzip
+import json
+import os
+import shutil
+import time
+
+from arggo._internal.discovery_cache import DiscoveryCache
+from arggo.cli.cli import (
+    _lookup_experiments,
+    _validate_parameters_file,
+    experiment_logs,
+    experiment_reindex,
+)
+from arggo.cli.logs import follow, search_lines, tail_lines
+
+
+def _make_run(directory, script, **extra_metadata):
+    directory.mkdir(parents=True)
+    parameters = {"x": 1, "__arggo": {"script": script, **extra_metadata}}
+    (directory / "parameters.json").write_text(json.dumps(parameters, indent=4))
+    return directory
+
+
+class TestLookupExperiments:
+    def test_finds_runs_at_any_depth(self, tmp_path):
+        _make_run(tmp_path / "2021-01-01" / "10-00-00", "train.py")
+        _make_run(tmp_path / "2021-01-02" / "11-00-00", "scripts/train.py")
+        _make_run(tmp_path / "2021-01-02" / "12-00-00", "evaluate.py")
+        (tmp_path / "empty").mkdir()
+
+        found = sorted(_lookup_experiments(str(tmp_path), "train", max_workers=4))
+        assert found == [
+            str(tmp_path / "2021-01-01" / "10-00-00"),
+            str(tmp_path / "2021-01-02" / "11-00-00"),
+        ]
+
+    def test_does_not_descend_into_runs(self, tmp_path):
+        run = _make_run(tmp_path / "run", "train.py")
+        _make_run(run / "0", "train.py")
+        assert _lookup_experiments(str(tmp_path), "train") == [str(run)]
+
+
+def _age(base_dir):
+    # The discovery cache ignores directories modified in the last couple of seconds
+    an_hour_ago = time.time() - 3600
+    for directory, _, _ in os.walk(base_dir):
+        os.utime(directory, (an_hour_ago, an_hour_ago))
+
+
+class TestDiscoveryCache:
+    def test_unchanged_runs_are_not_read_again(self, tmp_path):
+        run = _make_run(tmp_path / "2021-01-01" / "10-00-00", "train.py")
+        _age(tmp_path)
+        assert _lookup_experiments(str(tmp_path), "train") == [str(run)]
+        assert DiscoveryCache(str(tmp_path)).load() != dict()
+
+        (run / "parameters.json").write_text("{")
+        assert _lookup_experiments(str(tmp_path), "train") == [str(run)]
+        assert _lookup_experiments(str(tmp_path), "train", use_cache=False) == []
+
+    def test_changed_directories_are_rescanned(self, tmp_path):
+        old_run = _make_run(tmp_path / "2021-01-01" / "10-00-00", "train.py")
+        _age(tmp_path)
+        _lookup_experiments(str(tmp_path), "train")
+
+        new_run = _make_run(tmp_path / "2021-01-01" / "11-00-00", "train.py")
+        shutil.rmtree(old_run)
+        assert _lookup_experiments(str(tmp_path), "train") == [str(new_run)]
+
+    def test_recently_modified_directories_are_not_cached(self, tmp_path):
+        _make_run(tmp_path / "2021-01-01" / "10-00-00", "train.py")
+        _lookup_experiments(str(tmp_path), "train")
+        assert DiscoveryCache(str(tmp_path)).load() == dict()
+
+
+class TestValidateParametersFile:
+    def test_reads_script_from_the_tail(self, tmp_path):
+        run = _make_run(tmp_path / "run", 'odd "name".py')
+        assert _validate_parameters_file(str(run / "parameters.json"), 'odd "name"')
+
+    def test_falls_back_to_full_parse(self, tmp_path):
+        # Plugin metadata after the script pushes it out of the tail that is read
+        run = _make_run(tmp_path / "run", "train.py", plugin={"blob": "x" * 100_000})
+        assert _validate_parameters_file(str(run / "parameters.json"), "train")
+        assert not _validate_parameters_file(str(run / "parameters.json"), "other")
+
+    def test_invalid_files_do_not_match(self, tmp_path):
+        (tmp_path / "broken.json").write_text("{")
+        (tmp_path / "no_metadata.json").write_text('{"x": 1}')
+        assert not _validate_parameters_file(str(tmp_path / "broken.json"), "train")
+        assert not _validate_parameters_file(
+            str(tmp_path / "no_metadata.json"), "train"
+        )
+
+
+class TestLogs:
+    def test_tail_lines(self, tmp_path):
+        path = tmp_path / "output.log"
+        path.write_bytes(b"".join(b"line %d\n" % i for i in range(1000)))
+        assert tail_lines(str(path), 2) == [b"line 998\n", b"line 999\n"]
+        assert len(tail_lines(str(path), 5000)) == 1000
+        path.write_bytes(b"first\nunfinished")
+        assert tail_lines(str(path), 1) == [b"unfinished"]
+        path.write_bytes(b"")
+        assert tail_lines(str(path), 1) == []
+
+    def test_search_lines(self, tmp_path):
+        path = tmp_path / "output.log"
+        path.write_bytes(b"loss 0.5 loss 0.4\naccuracy 0.9\nlast loss 0.1")
+        assert list(search_lines(str(path), r"loss \d")) == [
+            b"loss 0.5 loss 0.4\n",
+            b"last loss 0.1",
+        ]
+        assert list(search_lines(str(path), "missing")) == []
+
+    def test_search_lines_one_line_at_a_time(self, tmp_path):
+        text = b"start\nERROR boom\nnot an ERROR\nend start\nlast"
+        path = tmp_path / "output.log"
+        path.write_bytes(text)
+        compressed = tmp_path / "compressed" / "output.log"
+        compressed.parent.mkdir()
+        with gzip.open(tmp_path / "compressed" / "output.log.1.gz", "wb") as f:
+            f.write(text + b"\n")
+        compressed.write_bytes(b"")
+        for log in (path, compressed):
+            assert list(search_lines(str(log), "^ERROR")) == [b"ERROR boom\n"]
+            assert list(search_lines(str(log), "start$")) == [
+                b"start\n",
+                b"end start\n",
+            ]
+            assert list(search_lines(str(log), "^last$")) == [
+                b"last" if log is path else b"last\n"
+            ]
+            # Not across lines
+            assert list(search_lines(str(log), r"boom\snot")) == []
+            # Even where a match first runs on into the next line
+            assert list(search_lines(str(log), r"an ERROR\s*\w*")) == [
+                b"not an ERROR\n"
+            ]
+
+    def test_follow(self, tmp_path):
+        path = tmp_path / "output.log"
+        path.write_bytes(b"old\n")
+        followed = follow(str(path), poll_interval=0.01)
+        with open(path, "ab") as f:
+            f.write(b"new\n")
+        assert next(followed) == b"new\n"
+        followed.close()
+
+    def test_experiment_logs(self, tmp_path, capsysbinary):
+        for name in ("10-00-00", "11-00-00"):
+            run = _make_run(tmp_path / "2021-01-01" / name, "train.py")
+            (run / "output.log").write_text(f"started\n{name}\n")
+
+        experiment_logs("train", str(tmp_path), latest=True, lines=1)
+        assert capsysbinary.readouterr().out == b"11-00-00\n"
+        experiment_logs(
+            "train", str(tmp_path), run=str(run.parent / "10-00-00"), pattern="00"
+        )
+        assert capsysbinary.readouterr().out == b"10-00-00\n"
+
+    def test_rotated_segments_are_read(self, tmp_path):
+        path = tmp_path / "output.log"
+        with gzip.open(tmp_path / "output.log.1.gz", "wb") as f:
+            f.write(b"loss 3\nloss 2\n")
+        (tmp_path / "output.log.2").write_bytes(b"epoch\nloss 1\n")
+        path.write_bytes(b"loss 0\n")
+        assert tail_lines(str(path), 4) == [
+            b"loss 2\n",
+            b"epoch\n",
+            b"loss 1\n",
+            b"loss 0\n",
+        ]
+        assert len(tail_lines(str(path), 100)) == 5
+        assert list(search_lines(str(path), "loss")) == [
+            b"loss 3\n",
+            b"loss 2\n",
+            b"loss 1\n",
+            b"loss 0\n",
+        ]
+
+    def test_run_without_a_log(self, tmp_path, capsys):
+        run = _make_run(tmp_path / "run", "train.py")
+        experiment_logs("train", str(tmp_path), run=str(run))
+        assert capsys.readouterr().out == f"No output.log in {run}\n"
+
+    def test_latest_is_the_last_started(self, tmp_path, capsysbinary):
+        # Multirun jobs, whose paths sort 0, 1, 10, 2, ...
+        for index in range(11):
+            run = _make_run(tmp_path / str(index), "train.py", started=1000.0 + index)
+            (run / "output.log").write_text(f"job {index}\n")
+        experiment_logs("train", str(tmp_path), latest=True)
+        assert capsysbinary.readouterr().out == b"job 10\n"
+
+        experiment_reindex(str(tmp_path))
+        capsysbinary.readouterr()
+        experiment_logs("train", str(tmp_path), latest=True)
+        assert capsysbinary.readouterr().out == b"job 10\n"
@@ -0,0 +1,99 @@
+import json
+import shutil
+
+from arggo.cli.cli import _find_experiments, experiment_reindex
+from arggo.experiment import ExperimentIndex, NewExperiment
+from tests.test_arggo import SimpleArguments
+
+
+def _make_run(logging_dir, name, script):
+    run_dir = logging_dir / name
+    run_dir.mkdir(parents=True)
+    parameters = {"just_a_string": name, "__arggo": {"script": script}}
+    (run_dir / "parameters.json").write_text(json.dumps(parameters))
+    return run_dir
+
+
+class TestExperimentIndex:
+    def test_find_by_experiment_name(self, tmp_path):
+        index = ExperimentIndex.for_logging_dir(str(tmp_path))
+        for name in ("b", "a"):
+            (tmp_path / name).mkdir()
+            index.add(str(tmp_path / name), "scripts/train.py", {"x": 1})
+        (tmp_path / "c").mkdir()
+        index.add(str(tmp_path / "c"), "evaluate.py", {"x": 1})
+
+        assert index.find("train") == [str(tmp_path / "a"), str(tmp_path / "b")]
+        assert index.find("train.py") == index.find("train")
+        assert index.find("evaluate") == [str(tmp_path / "c")]
+
+    def test_deleted_runs_are_skipped(self, tmp_path):
+        index = ExperimentIndex.for_logging_dir(str(tmp_path))
+        (tmp_path / "a").mkdir()
+        index.add(str(tmp_path / "a"), "train.py", {})
+        shutil.rmtree(tmp_path / "a")
+        assert index.find("train") == []
+
+    def test_survives_moving_the_logging_dir(self, tmp_path):
+        index = ExperimentIndex.for_logging_dir(str(tmp_path / "logs"))
+        (tmp_path / "logs" / "a").mkdir(parents=True)
+        index.add(str(tmp_path / "logs" / "a"), "train.py", {})
+        shutil.move(str(tmp_path / "logs"), str(tmp_path / "moved"))
+
+        moved = ExperimentIndex.for_logging_dir(str(tmp_path / "moved"))
+        assert moved.find("train") == [str(tmp_path / "moved" / "a")]
+
+    def test_save_json_records_the_run(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("sys.argv", ["my_experiment.py"])
+        index = ExperimentIndex.for_logging_dir(str(tmp_path))
+        NewExperiment(SimpleArguments()).save_json(str(tmp_path), [], index)
+        assert index.find("my_experiment") == [str(tmp_path)]
+
+
+class TestFindExperiments:
+    def test_falls_back_to_scanning_without_an_index(self, tmp_path):
+        run_dir = _make_run(tmp_path, "run", "train.py")
+        assert _find_experiments(str(tmp_path), "train") == [str(run_dir)]
+
+    def test_reindex_then_query_the_index(self, tmp_path):
+        first = _make_run(tmp_path, "2021-01-01/00-00-00", "train.py")
+        second = _make_run(tmp_path, "2021-01-02/00-00-00", "train.py")
+        _make_run(tmp_path, "2021-01-03/00-00-00", "evaluate.py")
+
+        experiment_reindex(str(tmp_path))
+        assert ExperimentIndex.for_logging_dir(str(tmp_path)).exists()
+        assert _find_experiments(str(tmp_path), "train") == [str(first), str(second)]
+
+    def test_runs_from_before_the_index_are_found(self, tmp_path, monkeypatch):
+        old = _make_run(tmp_path, "2021-01-01/00-00-00", "train.py")
+        # The first run since creates the index, with only itself in it
+        new = tmp_path / "2021-01-02/00-00-00"
+        new.mkdir(parents=True)
+        monkeypatch.setattr("sys.argv", ["train.py"])
+        index = ExperimentIndex.for_logging_dir(str(tmp_path))
+        NewExperiment(SimpleArguments()).save_json(str(new), [], index)
+
+        assert _find_experiments(str(tmp_path), "train") == [str(old), str(new)]
+        assert index.is_complete()
+        # Only the first lookup walks the logging directory
+        monkeypatch.setattr("arggo.cli.cli._read_run", None)
+        assert _find_experiments(str(tmp_path), "train") == [str(old), str(new)]
+
+    def test_reindex_skips_unreadable_runs(self, tmp_path):
+        good = _make_run(tmp_path, "2021-01-01/00-00-00", "train.py")
+        truncated = _make_run(tmp_path, "2021-01-02/00-00-00", "train.py")
+        text = (truncated / "parameters.json").read_text()
+        (truncated / "parameters.json").write_text(text[: len(text) // 2])
+        no_metadata = tmp_path / "2021-01-03/00-00-00"
+        no_metadata.mkdir(parents=True)
+        (no_metadata / "parameters.json").write_text('{"just_a_string": "a"}')
+        # Within a run, not a run of its own
+        (good / "checkpoints").mkdir()
+        (good / "checkpoints" / "parameters.json").write_text(
+            json.dumps({"__arggo": {"script": "train.py"}})
+        )
+        ExperimentIndex.for_logging_dir(str(tmp_path)).try_add(
+            str(tmp_path / "2021-01-04"), "evaluate.py", dict()
+        )
+
+        assert _find_experiments(str(tmp_path), "train") == [str(good)]
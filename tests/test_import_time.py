@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Kept out of `import arggo` until used. Asserting on this, rather than on a wall-clock
+# budget, keeps the test from depending on how busy the machine is.
+_LAZY_MODULES = (
+    "rich",
+    "interactive_argparse",
+    "wandb",
+    "comet_ml",
+    "torch",
+    "asyncio",
+    "concurrent",
+    "sqlite3",
+)
+
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _import_times(statement: str):
+    """Run `statement` in a fresh interpreter under `-X importtime` and return a
+    {module: cumulative microseconds} mapping of everything it imported."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=_ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("statement", ["import arggo", "import arggo; arggo.consume"])
+class TestImportTime:
+    def test_heavy_modules_are_not_imported(self, statement):
+        times = _import_times(statement)
+        loaded = {name.split(".")[0] for name in times}
+        assert loaded.isdisjoint(_LAZY_MODULES)
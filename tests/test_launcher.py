@@ -0,0 +1,103 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+from arggo.launcher import launch_subprocesses, run_subprocesses
+
+_REPOSITORY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _python(code: str):
+    return [sys.executable, "-c", code]
+
+
+class TestRunSubprocesses:
+    def test_collects_exit_codes_in_order(self, tmp_path):
+        commands = [_python(f"import sys; sys.exit({code})") for code in (0, 3, 1)]
+        assert run_subprocesses(commands, str(tmp_path), max_concurrency=2) == [0, 3, 1]
+
+    def test_streams_output_into_each_log(self, tmp_path):
+        commands = (
+            _python(f"import sys; print('out {i}'); print('err {i}', file=sys.stderr)")
+            for i in range(5)
+        )
+        run_subprocesses(commands, str(tmp_path), max_concurrency=3)
+        for i in range(5):
+            log = (tmp_path / f"{i}.log").read_text()
+            assert f"out {i}" in log and f"err {i}" in log
+
+    def test_respects_max_concurrency(self, tmp_path):
+        # Each child holds a lock file while it runs; with a limit of one, no two overlap
+        code = (
+            "import os, sys, time\n"
+            "fd = os.open(sys.argv[1], os.O_CREAT | os.O_EXCL)\n"
+            "time.sleep(0.05)\n"
+            "os.close(fd); os.remove(sys.argv[1])"
+        )
+        lock = str(tmp_path / "lock")
+        commands = [_python(code) + [lock] for _ in range(4)]
+        assert run_subprocesses(commands, str(tmp_path), max_concurrency=1) == [0] * 4
+
+    def test_reports_exits_as_they_happen(self, tmp_path):
+        finished = []
+        commands = [_python("pass"), _python("import sys; sys.exit(2)")]
+        exit_codes = asyncio.run(
+            launch_subprocesses(
+                commands,
+                str(tmp_path),
+                on_exit=lambda index, code: finished.append((index, code)),
+            )
+        )
+        assert exit_codes == [0, 2]
+        assert sorted(finished) == [(0, 0), (1, 2)]
+
+    def test_runs_launched_together_get_their_own_directories(self, tmp_path):
+        # Started at once, so they start within the same second
+        code = (
+            "import sys; sys.argv = sys.argv[:1]\n"
+            "import arggo\n"
+            "from tests.test_arggo import SimpleArguments\n"
+            "@arggo.consume\n"
+            "def main(args: SimpleArguments):\n"
+            "    print('running')\n"
+            "main()\n"
+        )
+        script = tmp_path / "run.py"
+        script.write_text(
+            f"import os, sys\nsys.path.insert(0, {_REPOSITORY_DIR!r})\n"
+            f"os.chdir({str(tmp_path)!r})\n" + code
+        )
+        commands = [[sys.executable, str(script)] for _ in range(4)]
+        assert run_subprocesses(commands, str(tmp_path / "launch")) == [0] * 4
+        run_dirs = {path.parent for path in tmp_path.glob("logs/*/*/parameters.json")}
+        assert len(run_dirs) == 4
+        for run_dir in run_dirs:
+            assert (run_dir / "output.log").read_text() == "running\n"
+
+    def test_a_command_that_cannot_start_fails_alone(self, tmp_path):
+        commands = [_python("pass"), [str(tmp_path / "missing")], _python("pass")]
+        assert run_subprocesses(commands, str(tmp_path)) == [0, 127, 0]
+        assert "Could not run" in (tmp_path / "1.log").read_text()
+
+    def test_running_children_are_killed_on_failure(self, tmp_path):
+        pid_file = tmp_path / "pid"
+        sleeper = _python(
+            f"import os, time\nopen({str(pid_file)!r}, 'w').write(str(os.getpid()))\n"
+            "time.sleep(30)"
+        )
+        waiter = _python(
+            f"import os, time\nwhile not os.path.exists({str(pid_file)!r}): time.sleep(0.01)"
+        )
+
+        def on_exit(index, exit_code):
+            raise RuntimeError("reporting failed")
+
+        start = time.perf_counter()
+        with pytest.raises(RuntimeError):
+            run_subprocesses([sleeper, waiter], str(tmp_path / "logs"), on_exit=on_exit)
+        assert time.perf_counter() - start < 10
+        with pytest.raises(ProcessLookupError):
+            os.kill(int(pid_file.read_text()), 0)
@@ -0,0 +1,89 @@
+import gzip
+import os
+
+import pytest
+
+from arggo.log_rotation import (
+    LogRotation,
+    RotatingFile,
+    read_rotated_lines,
+    read_rotated_log,
+)
+from arggo.logger import BufferedFileWriter
+
+
+def _write_lines(path, rotation, count, write_mode="a"):
+    file = RotatingFile(str(path), rotation, write_mode)
+    for i in range(count):
+        file.write(f"line {i}")
+        file.write("\n")
+    file.close()
+
+
+class TestRotatingFile:
+    def test_rotates_by_size_and_compresses(self, tmp_path):
+        path = tmp_path / "output.log"
+        _write_lines(path, LogRotation(max_bytes=100), 50)
+
+        names = sorted(os.listdir(tmp_path))
+        assert "output.log" in names
+        assert "output.log.1.gz" in names
+        assert not any(name.endswith((".1", ".tmp")) for name in names)
+        with gzip.open(tmp_path / "output.log.1.gz", "rt") as f:
+            assert f.read().startswith("line 0\nline 1\n")
+
+    def test_segments_end_at_line_boundaries(self, tmp_path):
+        path = tmp_path / "output.log"
+        _write_lines(path, LogRotation(max_bytes=1, compression=None), 3)
+        assert (tmp_path / "output.log.1").read_text() == "line 0\n"
+        assert (tmp_path / "output.log.3").read_text() == "line 2\n"
+
+    def test_rotates_by_age(self, tmp_path):
+        path = tmp_path / "output.log"
+        _write_lines(path, LogRotation(interval=0, compression=None), 2)
+        assert (tmp_path / "output.log.2").read_text() == "line 1\n"
+
+    def test_appending_continues_numbering(self, tmp_path):
+        path = tmp_path / "output.log"
+        rotation = LogRotation(max_bytes=1, compression=None)
+        _write_lines(path, rotation, 2)
+        _write_lines(path, rotation, 1)
+        assert (tmp_path / "output.log.3").read_text() == "line 0\n"
+
+        _write_lines(path, rotation, 1, write_mode="w")
+        assert sorted(os.listdir(tmp_path)) == ["output.log", "output.log.1"]
+
+    def test_invalid_rotation(self):
+        with pytest.raises(ValueError):
+            LogRotation()
+        with pytest.raises(ValueError):
+            LogRotation(max_bytes=1, compression="lzma")
+
+
+class TestReadRotatedLog:
+    def test_streams_all_segments_in_order(self, tmp_path):
+        path = tmp_path / "output.log"
+        writer = BufferedFileWriter(RotatingFile(str(path), LogRotation(max_bytes=64)))
+        for i in range(1000):
+            print(f"line {i}", file=writer)
+        writer.write("unfinished")
+        writer.close()
+
+        expected = "".join(f"line {i}\n" for i in range(1000)) + "unfinished"
+        assert len(os.listdir(tmp_path)) > 10
+        assert b"".join(read_rotated_log(str(path), chunk_size=7)) == expected.encode()
+        assert "".join(read_rotated_lines(str(path))) == expected
+
+    def test_mixes_compressed_and_plain_segments(self, tmp_path):
+        path = tmp_path / "output.log"
+        with gzip.open(tmp_path / "output.log.1.gz", "wt") as f:
+            f.write("first\n")
+        (tmp_path / "output.log.2").write_text("second\n")
+        (tmp_path / "output.log.10").write_text("third\n")
+        path.write_text("current\n")
+        assert list(read_rotated_lines(str(path))) == [
+            "first\n",
+            "second\n",
+            "third\n",
+            "current\n",
+        ]
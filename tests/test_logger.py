@@ -0,0 +1,165 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+from arggo.logger import (
+    BufferedFileWriter,
+    StructuredLogRecordFactory,
+    StructuredStream,
+    WrapperStream,
+    open_structured_log,
+)
+
+
+class TestBufferedFileWriter:
+    def test_writes_reach_the_file_on_flush_and_close(self, tmp_path):
+        path = tmp_path / "output.log"
+        writer = BufferedFileWriter(open(path, "w"), flush_interval=60)
+        for i in range(100):
+            writer.write(f"line {i}\n")
+        writer.flush()
+        assert path.read_text().splitlines()[-1] == "line 99"
+
+        writer.write("last\n")
+        writer.close()
+        assert path.read_text().endswith("line 99\nlast\n")
+        assert writer.file.closed
+
+    def test_flushes_in_the_background(self, tmp_path):
+        path = tmp_path / "output.log"
+        writer = BufferedFileWriter(open(path, "w"), flush_interval=0.01)
+        writer.write("hello\n")
+        deadline = time.monotonic() + 5
+        while path.read_text() != "hello\n" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert path.read_text() == "hello\n"
+        writer.close()
+
+    def test_pending_writes_are_bounded(self, tmp_path):
+        path = tmp_path / "output.log"
+        writer = BufferedFileWriter(open(path, "w"), flush_interval=60, max_pending=10)
+        for i in range(25):
+            writer.write(f"{i}\n")
+        assert len(writer._pending) < 10
+        writer.close()
+        assert path.read_text() == "".join(f"{i}\n" for i in range(25))
+
+    def test_wrapper_stream_flush_does_not_wait_on_the_log(self, tmp_path):
+        path = tmp_path / "output.log"
+        writer = BufferedFileWriter(open(path, "w"), flush_interval=60)
+        stream = WrapperStream(None, writer)
+        file_flushes = []
+        writer.file.flush = lambda: file_flushes.append(None)
+        handler = logging.StreamHandler(stream)
+        logger = logging.getLogger("test_wrapper_stream_flush")
+        logger.addHandler(handler)
+        try:
+            for i in range(100):
+                logger.warning("record %d", i)
+        finally:
+            logger.removeHandler(handler)
+        print("hello", file=stream, flush=True)
+        assert file_flushes == []
+        assert path.read_text() == ""
+        del writer.file.flush
+        writer.close()
+        assert path.read_text().endswith("record 99\nhello\n")
+
+
+def _run_script(tmp_path, body):
+    code = textwrap.dedent(
+        """
+        import os, signal, sys
+        from arggo.logger import BufferedFileWriter
+
+        writer = BufferedFileWriter(open(sys.argv[1], "w"), flush_interval=60)
+        writer.write("queued\\n")
+        """
+    )
+    # Earlier tests may have moved into a run's work directory
+    repository_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return subprocess.run(
+        [sys.executable, "-c", code + body, str(tmp_path / "out.log")],
+        cwd=repository_root,
+    )
+
+
+class TestDrainOnExit:
+    def test_drained_at_exit(self, tmp_path):
+        assert _run_script(tmp_path, "").returncode == 0
+        assert (tmp_path / "out.log").read_text() == "queued\n"
+
+    def test_drained_on_sigterm(self, tmp_path):
+        result = _run_script(tmp_path, "os.kill(os.getpid(), signal.SIGTERM)\n")
+        assert result.returncode == -15
+        assert (tmp_path / "out.log").read_text() == "queued\n"
+
+
+class TestStructuredLogs:
+    def test_records_lines_and_logging_records(self, tmp_path):
+        path = tmp_path / "output.jsonl"
+        records = open_structured_log(str(path), flush_interval=60)
+        stdout = StructuredStream(None, records, "stdout")
+        print("hello", "world", file=stdout)
+        stdout.write("two\nlines\nand a partial")
+        factory = logging.getLogRecordFactory()
+        logging.setLogRecordFactory(StructuredLogRecordFactory(records, factory))
+        try:
+            logger = logging.getLogger("arggo.tests.structured")
+            logger.warning("careful: %s", {"x": 1})
+            # Not enabled, so not made
+            logger.debug("ignored")
+        finally:
+            logging.setLogRecordFactory(factory)
+        records.close()
+
+        header, *lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert header["stream"] == "arggo" and "wall_time" in header
+        assert [(r["stream"], r["level"], r["message"]) for r in lines] == [
+            ("stdout", None, "hello world"),
+            ("stdout", None, "two"),
+            ("stdout", None, "lines"),
+            ("logging", "WARNING", "careful: {'x': 1}"),
+        ]
+        assert lines[-1]["logger"] == "arggo.tests.structured"
+        timestamps = [header["time"]] + [r["time"] for r in lines]
+        assert timestamps == sorted(timestamps)
+
+    def test_logging_configuration_is_left_alone(self, tmp_path):
+        code = textwrap.dedent(
+            """
+            import logging, sys
+            from arggo._internal.global_store import GlobalStore
+            from arggo.logger import FileLogger
+
+            FileLogger(
+                GlobalStore("structured"),
+                sys.argv[1] + "/output.log",
+                structured_output_file=sys.argv[1] + "/output.jsonl",
+            ).bind()
+            logging.getLogger("task").warning("before basicConfig")
+            logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+            logging.info("after basicConfig")
+            """
+        )
+        repository_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, "-c", code, str(tmp_path)],
+            cwd=repository_root,
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        # Through logging's last resort, then the handler basicConfig installed
+        assert result.stderr == "before basicConfig\nINFO after basicConfig\n"
+        records = [
+            json.loads(line)
+            for line in (tmp_path / "output.jsonl").read_text().splitlines()
+        ]
+        assert [
+            (r["level"], r["message"]) for r in records if r["stream"] == "logging"
+        ] == [("WARNING", "before basicConfig"), ("INFO", "after basicConfig")]
@@ -13,16 +13,23 @@
 # limitations under the License.
 
 import argparse
+import sys
+import tempfile
 import unittest
 from argparse import Namespace
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, make_dataclass
 from enum import Enum
-from typing import List, Optional
+from pathlib import Path
+from typing import Dict, List, Literal, Optional, Set, Tuple
 
 import pytest
 
 from arggo.dataclass_utils import mapped_field
-from arggo.parser import DataClassArgumentParser
+from arggo.parser import (
+    DataClassArgumentParser,
+    HydraSweep,
+    register_type_converter,
+)
 from arggo.parser import string_to_bool
 
 
@@ -273,6 +280,17 @@ class DataClassArgumentParserTest(unittest.TestCase):
         (example,) = parser.parse_args_into_dataclasses([])
         self.assertEqual(example.point, Point(0, 0))
 
+    def test_multiple_dataclasses_and_extra_arguments(self):
+        parser = DataClassArgumentParser([BasicExample, ListExample])
+        parser.add_argument("--extra", type=int, default=0)
+
+        basic, lists, extra = parser.parse_args_into_dataclasses(
+            "--foo 1 --bar 2.5 --baz x --flag false --foo_int 4 --extra 3".split()
+        )
+        self.assertEqual(basic, BasicExample(foo=1, bar=2.5, baz="x", flag=False))
+        self.assertEqual(lists, ListExample(foo_int=[4]))
+        self.assertEqual(extra, Namespace(extra=3))
+
     def test_parse_dict(self):
         parser = DataClassArgumentParser(BasicExample)
 
@@ -287,6 +305,98 @@ class DataClassArgumentParserTest(unittest.TestCase):
         args = BasicExample(**args_dict)
         self.assertEqual(parsed_args, args)
 
+    def test_parse_dict_with_enum(self):
+        parser = DataClassArgumentParser(EnumExample)
+
+        self.assertEqual(parser.parse_dict({"foo": "titi"})[0].foo, BasicEnum.titi)
+        self.assertEqual(
+            parser.parse_dict({"foo": BasicEnum.toto})[0].foo, BasicEnum.toto
+        )
+        with self.assertRaises(ValueError):
+            parser.parse_dict({"foo": "tata"})
+
+    def test_enum_lookup_is_case_insensitive_and_shared(self):
+        first = DataClassArgumentParser(EnumExample)
+        second = DataClassArgumentParser(RequiredExample)
+
+        (example,) = first.parse_args_into_dataclasses(["--foo", "TITI"])
+        self.assertEqual(example.foo, BasicEnum.titi)
+        self.assertIs(
+            first._option_string_actions["--foo"].type._lookup,
+            second._option_string_actions["--required_enum"].type._lookup,
+        )
+
+    def test_parse_many_from_rows_and_columns(self):
+        parser = DataClassArgumentParser([BasicExample, ListExample])
+        rows = [
+            {"foo": "1", "bar": 1.5, "baz": "a", "flag": "yes"},
+            {"foo": 2, "bar": "2.5", "baz": 3, "flag": False},
+        ]
+        expected = [
+            BasicExample(foo=1, bar=1.5, baz="a", flag=True),
+            BasicExample(foo=2, bar=2.5, baz="3", flag=False),
+        ]
+
+        basics, lists = parser.parse_many(rows)
+        self.assertEqual(basics, expected)
+        self.assertEqual(lists, [ListExample(), ListExample()])
+
+        columns = {key: [row[key] for row in rows] for key in rows[0]}
+        self.assertEqual(parser.parse_many(columns)[0], expected)
+
+    def test_parse_many_converts_enums(self):
+        parser = DataClassArgumentParser(EnumExample)
+        (examples,) = parser.parse_many({"foo": ["titi", BasicEnum.toto, "titi"]})
+        self.assertEqual(
+            [example.foo for example in examples],
+            [BasicEnum.titi, BasicEnum.toto, BasicEnum.titi],
+        )
+
+    def test_parse_many_rows_without_keys_get_defaults(self):
+        parser = DataClassArgumentParser(WithDefaultExample)
+        self.assertEqual(parser.parse_many([{}, {}, {}]), ([WithDefaultExample()] * 3,))
+        self.assertEqual(parser.parse_many([]), ([],))
+
+    def test_parse_many_rejects_ragged_columns(self):
+        parser = DataClassArgumentParser(WithDefaultExample)
+        with self.assertRaises(ValueError):
+            parser.parse_many({"foo": [1, 2], "baz": ["a"]})
+
+    def test_parse_many_rejects_lossy_numbers(self):
+        parser = DataClassArgumentParser(BasicExample)
+        row = {"foo": 1, "bar": 0.5, "baz": "a", "flag": True}
+        for key, value in (("foo", 1.7), ("foo", True), ("bar", False)):
+            with self.subTest(key=key, value=value):
+                with self.assertRaises(ValueError):
+                    parser.parse_many([{**row, key: value}])
+        (examples,) = parser.parse_many([{**row, "foo": 2.0, "bar": 3}])
+        self.assertEqual(examples, [BasicExample(foo=2, bar=3.0, baz="a", flag=True)])
+        self.assertIs(type(examples[0].foo), int)
+
+    def test_parse_many_rejects_rows_with_other_keys(self):
+        parser = DataClassArgumentParser(WithDefaultExample)
+        for second in ({"foo": 2, "baz": "b", "extra": 0}, {"foo": 2}):
+            with self.subTest(second=second):
+                with self.assertRaisesRegex(ValueError, "Row 1"):
+                    parser.parse_many([{"foo": 1, "baz": "a"}, second])
+
+    def test_parse_many_from_structured_array(self):
+        np = pytest.importorskip("numpy")
+        data = np.array(
+            [(1, 0.5, "a", True), (2, 1.5, "b", False)],
+            dtype=[("foo", "i8"), ("bar", "f8"), ("baz", "U8"), ("flag", "?")],
+        )
+        parser = DataClassArgumentParser(BasicExample)
+        (examples,) = parser.parse_many(data)
+        self.assertEqual(
+            examples,
+            [
+                BasicExample(foo=1, bar=0.5, baz="a", flag=True),
+                BasicExample(foo=2, bar=1.5, baz="b", flag=False),
+            ],
+        )
+        self.assertIs(type(examples[0].foo), int)
+
     @pytest.mark.skip(reason="Migrated from HuggingFace Transformers")
     def test_integration_training_args(self):
         # parser = DataClassArgumentParser(TrainingArguments)
@@ -331,3 +441,128 @@ class TestHydraStyleArgs(unittest.TestCase):
         parser = DataClassArgumentParser(Underscored)
         (example,) = parser.parse_args_into_dataclasses(["key-2=value"])
         self.assertEqual(example.key_2, "value")
+
+
+class Celsius(float):
+    pass
+
+
+@dataclass
+class CollectionExample:
+    pair: Tuple[int, str] = (0, "zero")
+    many: Tuple[float, ...] = (1.0,)
+    tags: Set[str] = field(default_factory=set)
+    weights: Dict[str, float] = field(default_factory=dict)
+    enums: List[BasicEnum] = list_field(default=[])
+    flags: List[bool] = list_field(default=[])
+
+
+@dataclass
+class ScalarExample:
+    mode: Literal["train", "eval"] = "train"
+    level: Literal[1, 2, 3] = 1
+    path: Path = Path(".")
+    maybe_path: Optional[Path] = None
+    temperature: Celsius = Celsius(0.0)
+
+
+class TestTypeHandlers(unittest.TestCase):
+    def test_collections(self):
+        parser = DataClassArgumentParser(CollectionExample)
+        (example,) = parser.parse_args_into_dataclasses(
+            "--pair 1 one --many 0.5 1.5 --tags a b a --weights x:1 y:2.5 "
+            "--enums TITI toto --flags yes no".split()
+        )
+        self.assertEqual(example.pair, (1, "one"))
+        self.assertEqual(example.many, (0.5, 1.5))
+        self.assertEqual(example.tags, {"a", "b"})
+        self.assertEqual(example.weights, {"x": 1.0, "y": 2.5})
+        self.assertEqual(example.enums, [BasicEnum.titi, BasicEnum.toto])
+        self.assertEqual(example.flags, [True, False])
+
+    def test_collection_defaults(self):
+        parser = DataClassArgumentParser(CollectionExample)
+        (example,) = parser.parse_args_into_dataclasses([])
+        self.assertEqual(example, CollectionExample())
+
+    def test_malformed_dict_value_is_rejected(self):
+        parser = DataClassArgumentParser(CollectionExample)
+        with self.assertRaises(SystemExit):
+            parser.parse_args(["--weights", "x"])
+
+    def test_scalars(self):
+        register_type_converter(Celsius, lambda s: Celsius(float(s.rstrip("C"))))
+        parser = DataClassArgumentParser(ScalarExample)
+        (example,) = parser.parse_args_into_dataclasses(
+            "--mode eval --level 2 --path /tmp --maybe_path a/b "
+            "--temperature 21.5C".split()
+        )
+        self.assertEqual(example.mode, "eval")
+        self.assertEqual(example.level, 2)
+        self.assertEqual(example.path, Path("/tmp"))
+        self.assertEqual(example.maybe_path, Path("a/b"))
+        self.assertEqual(example.temperature, Celsius(21.5))
+
+    def test_literal_rejects_unknown_value(self):
+        parser = DataClassArgumentParser(ScalarExample)
+        with self.assertRaises(SystemExit):
+            parser.parse_args(["--mode", "test"])
+
+    @pytest.mark.skipif(sys.version_info < (3, 10), reason="PEP 604 unions")
+    def test_pep_604_optional(self):
+        Example = make_dataclass(
+            "Example", [("foo", eval("int | None"), field(default=None))]
+        )
+        parser = DataClassArgumentParser(Example)
+
+        expected = argparse.ArgumentParser()
+        expected.add_argument("--foo", default=None, type=int)
+        DataClassArgumentParserTest.argparsersEqual(self, parser, expected)
+        (example,) = parser.parse_args_into_dataclasses(["--foo", "3"])
+        self.assertEqual(example.foo, 3)
+
+
+class TestHydraSweep(unittest.TestCase):
+    def test_comma_lists_and_ranges(self):
+        sweep = HydraSweep(["foo=range(0,3)", "bar=0.1,0.2", "--baz", "x"])
+        self.assertEqual(len(sweep), 6)
+        self.assertEqual(sweep[0], ["--foo", "0", "--bar", "0.1", "--baz", "x"])
+        self.assertEqual(sweep[1], ["--foo", "0", "--bar", "0.2", "--baz", "x"])
+        self.assertEqual(sweep[-1], ["--foo", "2", "--bar", "0.2", "--baz", "x"])
+        with self.assertRaises(IndexError):
+            sweep[6]
+
+    def test_range_with_step(self):
+        sweep = HydraSweep(["foo=range(10, 0, -5)"])
+        self.assertEqual(list(sweep), [["--foo", "10"], ["--foo", "5"]])
+
+    def test_huge_sweep_is_not_materialized(self):
+        sweep = HydraSweep(["foo=range(0,1000000)", "bar=range(0,1000000)"])
+        self.assertEqual(len(sweep), 10**12)
+        self.assertEqual(sweep[10**12 - 1], ["--foo", "999999", "--bar", "999999"])
+
+    def test_glob(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name in ("b.csv", "a.csv", "c.txt"):
+                Path(tmp_dir, name).touch()
+            sweep = HydraSweep([f"baz={tmp_dir}/*.csv"])
+            self.assertEqual(
+                [run_args[1] for run_args in sweep],
+                [str(Path(tmp_dir, "a.csv")), str(Path(tmp_dir, "b.csv"))],
+            )
+
+    def test_parse_sweep_into_dataclasses(self):
+        parser = DataClassArgumentParser(BasicExample)
+        points = parser.parse_sweep_into_dataclasses(
+            ["foo=1,2", "bar=0.5", "baz=range(0,2)", "flag=true", "--unrelated"],
+            look_for_args_file=False,
+        )
+        self.assertEqual(
+            [point[0] for point in points],
+            [
+                BasicExample(foo=1, bar=0.5, baz="0", flag=True),
+                BasicExample(foo=1, bar=0.5, baz="1", flag=True),
+                BasicExample(foo=2, bar=0.5, baz="0", flag=True),
+                BasicExample(foo=2, bar=0.5, baz="1", flag=True),
+            ],
+        )
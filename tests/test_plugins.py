@@ -0,0 +1,327 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+import pytest
+
+import arggo
+from arggo.experiment import NewExperiment
+from arggo.experiment.experiment import (
+    record_plugin_outcomes,
+    record_startup_profile,
+    wait_for_deferred_writes,
+)
+from arggo.plugin import Plugin, PluginMeta
+from arggo.profiling import StartupProfile
+from tests.test_arggo import SimpleArguments
+
+
+@pytest.fixture(autouse=True)
+def _isolated_registry(monkeypatch):
+    # Plugins defined by these tests must not become default plugins of other tests
+    monkeypatch.setattr(PluginMeta, "registry", list(PluginMeta.registry))
+    monkeypatch.setattr(PluginMeta, "registry_version", PluginMeta.registry_version)
+
+
+def _plugin(plugin_name, dump, timeout=None):
+    class TestPlugin(Plugin):
+        name = plugin_name
+
+        def parameters_dump(self, parameters):
+            return dump(parameters)
+
+    TestPlugin.timeout = timeout
+    return TestPlugin()
+
+
+def _metadata(plugins, **kwargs):
+    experiment = NewExperiment(SimpleArguments())
+    return json.loads(experiment.to_json(plugins, **kwargs))["__arggo"]
+
+
+class TestParametersDump:
+    def test_dumps_run_concurrently(self):
+        def slow(parameters):
+            time.sleep(0.3)
+            return {"seen": parameters["just_a_string"]}
+
+        start = time.perf_counter()
+        metadata = _metadata([_plugin("a", slow), _plugin("b", slow)])
+        assert time.perf_counter() - start < 0.55
+        assert metadata["a"] == metadata["b"] == {"seen": "Hello"}
+        assert metadata["plugins"]["a"]["parameters_dump"]["status"] == "ok"
+        assert metadata["plugins"]["a"]["parameters_dump"]["seconds"] >= 0.3
+
+    def test_timeout_is_recorded(self):
+        release = threading.Event()
+        hanging = _plugin("hanging", lambda parameters: release.wait())
+        quick = _plugin("quick", lambda parameters: {"x": 1})
+        with pytest.warns(UserWarning, match="hanging timed out"):
+            metadata = _metadata([hanging, quick], plugin_timeout=0.1)
+        release.set()
+
+        assert "hanging" not in metadata
+        assert metadata["plugins"]["hanging"]["parameters_dump"] == {
+            "status": "timeout",
+            "seconds": 0.1,
+        }
+        assert metadata["quick"] == {"x": 1}
+
+    def test_plugin_timeout_overrides_the_default(self):
+        release = threading.Event()
+        hanging = _plugin("hanging", lambda parameters: release.wait(), timeout=0.05)
+        with pytest.warns(UserWarning):
+            metadata = _metadata([hanging], plugin_timeout=None)
+        release.set()
+        assert metadata["plugins"]["hanging"]["parameters_dump"]["status"] == "timeout"
+
+    def test_failure_is_recorded(self):
+        def failing(parameters):
+            raise RuntimeError("no network")
+
+        with pytest.warns(UserWarning, match="no network"):
+            metadata = _metadata([_plugin("failing", failing)])
+        status = metadata["plugins"]["failing"]["parameters_dump"]
+        assert status["status"] == "failed"
+        assert status["error"] == "RuntimeError: no network"
+
+
+class TestDeferredParametersDump:
+    def test_written_at_once_and_completed_later(self, tmp_path):
+        release = threading.Event()
+
+        def slow(parameters):
+            release.wait()
+            return {"seen": parameters["just_a_string"]}
+
+        arguments = SimpleArguments()
+        NewExperiment(arguments).save_json(
+            str(tmp_path), [_plugin("slow", slow)], defer_plugins=True
+        )
+        parameters = json.loads((tmp_path / "parameters.json").read_text())
+        assert parameters["just_a_string"] == "Hello"
+        assert parameters["__arggo"]["plugins"] == {
+            "slow": {"parameters_dump": {"status": "pending"}}
+        }
+
+        # The task runs meanwhile, and may change its arguments
+        arguments.just_a_string = "Changed"
+        release.set()
+        assert wait_for_deferred_writes(timeout=5)
+        parameters = json.loads((tmp_path / "parameters.json").read_text())
+        assert parameters["just_a_string"] == "Hello"
+        assert parameters["__arggo"]["slow"] == {"seen": "Hello"}
+        assert (
+            parameters["__arggo"]["plugins"]["slow"]["parameters_dump"]["status"]
+            == "ok"
+        )
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["parameters.json"]
+
+    def test_metadata_updates_do_not_wait_for_the_plugins(self, tmp_path):
+        release = threading.Event()
+
+        def slow(parameters):
+            release.wait()
+            return {"seen": parameters["just_a_string"]}
+
+        NewExperiment(SimpleArguments()).save_json(
+            str(tmp_path), [_plugin("slow", slow)], defer_plugins=True
+        )
+        profile = StartupProfile()
+        profile.add("total", 0.5)
+        start = time.monotonic()
+        record_startup_profile(str(tmp_path), profile)
+        record_plugin_outcomes(
+            str(tmp_path), {"slow": {"on_run_end": {"status": "ok"}}}
+        )
+        assert time.monotonic() - start < 1
+
+        release.set()
+        assert wait_for_deferred_writes(timeout=5)
+        metadata = json.loads((tmp_path / "parameters.json").read_text())["__arggo"]
+        assert metadata["slow"] == {"seen": "Hello"}
+        assert metadata["startup_profile"] == {"total": 0.5}
+        assert metadata["plugins"]["slow"] == {
+            "parameters_dump": {"status": "ok", "seconds": pytest.approx(0, abs=5)},
+            "on_run_end": {"status": "ok"},
+        }
+
+
+class _HookPlugin(Plugin):
+    name = "hooks"
+
+    def __init__(self):
+        self.calls = []
+
+    def parameters_dump(self, parameters):
+        return None
+
+    def on_run_start(self, run_dir, parameters):
+        self.calls.append(("start", parameters.just_a_string))
+
+    def on_run_end(self, run_dir, result):
+        time.sleep(0.01)
+        self.calls.append(("end", result))
+
+    def on_exception(self, run_dir, exception):
+        self.calls.append(("exception", str(exception)))
+        raise RuntimeError("could not upload")
+
+
+def _end_run():
+    # What happens at exit
+    arggo.core.global_store.get("bound_state").end()
+
+
+class TestLifecycleHooks:
+    def _run(self, monkeypatch, tmp_path, task):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("sys.argv", ["prog"])
+        plugin = _HookPlugin()
+        decorated = arggo.configure(plugins=[plugin])(task)
+        return plugin, decorated
+
+    def test_hooks_are_called_and_timed(self, monkeypatch, tmp_path):
+        def task(args: SimpleArguments):
+            return "done"
+
+        plugin, decorated = self._run(monkeypatch, tmp_path, task)
+        assert decorated() == "done"
+        assert plugin.calls == [("start", "Hello")]
+        _end_run()
+        assert plugin.calls == [("start", "Hello"), ("end", "done")]
+
+        (parameters_file,) = tmp_path.glob("logs/*/*/parameters.json")
+        statuses = json.loads(parameters_file.read_text())["__arggo"]["plugins"]
+        assert statuses["hooks"]["on_run_start"]["status"] == "ok"
+        assert statuses["hooks"]["on_run_end"]["seconds"] >= 0.01
+        assert "on_exception" not in statuses["hooks"]
+        # Plugins without hooks of their own only have their parameters dump recorded
+        assert list(statuses["conda"]) == ["parameters_dump"]
+
+    def test_hooks_span_repeated_calls(self, monkeypatch, tmp_path):
+        def task(args: SimpleArguments, i: int):
+            plugin.calls.append(("task", i))
+            return i
+
+        plugin, decorated = self._run(monkeypatch, tmp_path, task)
+        for i in range(3):
+            assert decorated(i) == i
+        _end_run()
+        # Until a second, unrelated end (e.g. at exit)
+        _end_run()
+        assert plugin.calls == [
+            ("start", "Hello"),
+            ("task", 0),
+            ("task", 1),
+            ("task", 2),
+            ("end", 2),
+        ]
+
+    def test_run_ends_at_exit(self, tmp_path):
+        script = tmp_path / "loop.py"
+        script.write_text(
+            textwrap.dedent(
+                """
+                from dataclasses import dataclass
+
+                import arggo
+                from arggo.plugin import Plugin
+
+                @dataclass
+                class Arguments:
+                    name: str = "a"
+
+                class Recorder(Plugin):
+                    name = "recorder"
+
+                    def parameters_dump(self, parameters):
+                        return None
+
+                    def on_run_start(self, run_dir, parameters):
+                        print("start")
+
+                    def on_run_end(self, run_dir, result):
+                        print("end", result)
+
+                @arggo.configure(plugins=[Recorder()])
+                def main(args: Arguments, i: int):
+                    print("task", i)
+
+                for i in range(3):
+                    main(i)
+                """
+            )
+        )
+        repository_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, str(script)],
+            cwd=str(tmp_path),
+            env={**os.environ, "PYTHONPATH": repository_root},
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.splitlines() == [
+            "start",
+            "task 0",
+            "task 1",
+            "task 2",
+            "end None",
+        ]
+        (parameters_file,) = tmp_path.glob("logs/*/*/parameters.json")
+        statuses = json.loads(parameters_file.read_text())["__arggo"]["plugins"]
+        assert statuses["recorder"]["on_run_end"]["status"] == "ok"
+
+    def test_exception_in_a_later_call(self, monkeypatch, tmp_path):
+        def task(args: SimpleArguments, i: int):
+            if i == 1:
+                raise ValueError("diverged")
+            return i
+
+        plugin, decorated = self._run(monkeypatch, tmp_path, task)
+        decorated(0)
+        with pytest.raises(ValueError), pytest.warns(UserWarning):
+            decorated(1)
+        assert plugin.calls == [("start", "Hello"), ("exception", "diverged")]
+        _end_run()
+        assert plugin.calls == [("start", "Hello"), ("exception", "diverged")]
+
+    def test_exception_hook(self, monkeypatch, tmp_path):
+        def task(args: SimpleArguments):
+            raise ValueError("diverged")
+
+        plugin, decorated = self._run(monkeypatch, tmp_path, task)
+        with pytest.raises(ValueError, match="diverged"), pytest.warns(
+            UserWarning, match="could not upload"
+        ):
+            decorated()
+        assert plugin.calls == [("start", "Hello"), ("exception", "diverged")]
+
+        (parameters_file,) = tmp_path.glob("logs/*/*/parameters.json")
+        statuses = json.loads(parameters_file.read_text())["__arggo"]["plugins"]
+        assert statuses["hooks"]["on_exception"]["status"] == "failed"
+        assert "on_run_end" not in statuses["hooks"]
+
+    @pytest.mark.parametrize("code", [None, 0])
+    def test_successful_exit_is_a_normal_end(self, monkeypatch, tmp_path, code):
+        def task(args: SimpleArguments):
+            sys.exit(code)
+
+        plugin, decorated = self._run(monkeypatch, tmp_path, task)
+        with pytest.raises(SystemExit):
+            decorated()
+        assert plugin.calls == [("start", "Hello"), ("end", None)]
+
+    def test_failed_exit_is_an_exception(self, monkeypatch, tmp_path):
+        def task(args: SimpleArguments):
+            sys.exit(2)
+
+        plugin, decorated = self._run(monkeypatch, tmp_path, task)
+        with pytest.raises(SystemExit), pytest.warns(UserWarning):
+            decorated()
+        assert plugin.calls == [("start", "Hello"), ("exception", "2")]
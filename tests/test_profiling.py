@@ -0,0 +1,179 @@
+import json
+import time
+
+import pytest
+
+import arggo
+from arggo.cli.cli import experiment_list, experiment_profile
+from arggo.profiling import StartupProfile
+from tests.test_arggo import SimpleArguments
+
+
+class TestStartupProfile:
+    def test_phases_accumulate_in_order(self):
+        profile = StartupProfile()
+        with profile.phase("b"):
+            pass
+        profile.add("a", 1.0)
+        profile.add("b", 2.0)
+        assert list(profile.phases) == ["b", "a"]
+        assert profile.phases["b"] >= 2.0
+
+    def test_phases_are_recorded_in_parameters(self, monkeypatch, tmp_path, capsys):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("sys.argv", ["prog", "--arggo_profile_startup", "print"])
+
+        @arggo.consume
+        def task(args: SimpleArguments):
+            return args.just_a_string
+
+        assert task() == "Hello"
+        (parameters_file,) = tmp_path.glob("logs/*/*/parameters.json")
+        profile = json.loads(parameters_file.read_text())["__arggo"]["startup_profile"]
+        assert list(profile) == [
+            "meta_arguments",
+            "parser_construction",
+            "parse_arguments",
+            "init_work_directory",
+            "init_logging_to_file",
+            "plugin_dumps",
+            "save_json",
+            "total",
+        ]
+        assert profile["total"] >= profile["save_json"] >= profile["plugin_dumps"]
+        assert "Arggo startup" in capsys.readouterr().out
+
+    def test_not_recorded_by_default(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("sys.argv", ["prog"])
+
+        @arggo.consume
+        def task(args: SimpleArguments):
+            return args.just_a_string
+
+        task()
+        (parameters_file,) = tmp_path.glob("logs/*/*/parameters.json")
+        assert (
+            "startup_profile" not in json.loads(parameters_file.read_text())["__arggo"]
+        )
+
+
+def _busy(args: SimpleArguments):
+    total = 0
+    for i in range(2000000):
+        total += i
+    return [args.just_a_string] * 1000
+
+
+class TestTaskProfile:
+    def _run(self, monkeypatch, tmp_path, mode):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("sys.argv", ["prog", "--arggo_profile", mode])
+        assert len(arggo.consume(_busy)()) == 1000
+        (parameters_file,) = tmp_path.glob("logs/*/*/parameters.json")
+        return parameters_file.parent
+
+    def test_cpu(self, monkeypatch, tmp_path, capsys):
+        run_dir = self._run(monkeypatch, tmp_path, "cpu")
+        assert (run_dir / "profile.prof").exists()
+        capsys.readouterr()
+        experiment_profile(str(run_dir))
+        assert "_busy" in capsys.readouterr().out
+
+    def test_sample(self, monkeypatch, tmp_path, capsys):
+        run_dir = self._run(monkeypatch, tmp_path, "sample")
+        stacks = (run_dir / "profile_samples.txt").read_text().splitlines()
+        # Only the task's stacks, not the frames that called it or the sampler's own
+        assert stacks and all(";_busy (" in stack for stack in stacks)
+        assert not any("stop (" in stack for stack in stacks)
+        capsys.readouterr()
+        experiment_profile(str(run_dir))
+        assert "samples" in capsys.readouterr().out
+
+    def test_memory(self, monkeypatch, tmp_path):
+        run_dir = self._run(monkeypatch, tmp_path, "memory")
+        report = (run_dir / "profile_memory.txt").read_text()
+        assert report.startswith("Current: ")
+        assert "test_profiling.py" in report
+
+    def test_profile_of_a_failed_task_is_saved(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("sys.argv", ["prog", "--arggo_profile"])
+
+        @arggo.consume
+        def task(args: SimpleArguments):
+            raise ValueError("diverged")
+
+        with pytest.raises(ValueError):
+            task()
+        assert list(tmp_path.glob("logs/*/*/profile.prof"))
+
+
+class TestResourceUsage:
+    def _resources(self, tmp_path):
+        return [
+            json.loads(parameters_file.read_text())["__arggo"]["resources"]
+            for parameters_file in sorted(tmp_path.glob("logs/**/parameters.json"))
+        ]
+
+    def test_recorded_for_a_run(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("sys.argv", ["prog"])
+        arggo.consume(_busy)()
+        # What happens at exit
+        arggo.core.global_store.get("bound_state").end()
+        (resources,) = self._resources(tmp_path)
+        assert resources["wall_seconds"] > 0
+        assert resources["user_seconds"] + resources["system_seconds"] > 0
+        assert resources["peak_rss_bytes"] > 1024 * 1024
+
+    def test_recorded_over_repeated_calls(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("sys.argv", ["prog"])
+
+        @arggo.consume
+        def task(args: SimpleArguments):
+            time.sleep(0.05)
+
+        for _ in range(3):
+            task()
+        arggo.core.global_store.get("bound_state").end()
+        (resources,) = self._resources(tmp_path)
+        assert resources["wall_seconds"] >= 0.15
+
+    def test_recorded_for_a_failed_run(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("sys.argv", ["prog"])
+
+        @arggo.consume
+        def task(args: SimpleArguments):
+            raise ValueError("diverged")
+
+        with pytest.raises(ValueError):
+            task()
+        (resources,) = self._resources(tmp_path)
+        assert resources["wall_seconds"] >= 0
+
+    def test_recorded_for_every_job_of_a_sweep(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(
+            "sys.argv", ["prog", "--arggo_multirun", "just_a_string=a,b"]
+        )
+        arggo.consume(_busy)()
+        assert len(self._resources(tmp_path)) == 2
+
+    def test_runs_are_listed_by_cost(self, tmp_path, capsys):
+        for run, seconds in (("cheap", 1.0), ("costly", 9.0), ("running", None)):
+            (tmp_path / run).mkdir()
+            metadata = {"script": "main.py"}
+            if seconds is not None:
+                metadata["resources"] = {"wall_seconds": seconds}
+            (tmp_path / run / "parameters.json").write_text(
+                json.dumps({"__arggo": metadata})
+            )
+        experiment_list("main", str(tmp_path), sort_by="wall_seconds")
+        assert capsys.readouterr().out.splitlines() == [
+            f"{tmp_path / 'costly'}\t9.0",
+            f"{tmp_path / 'cheap'}\t1.0",
+            f"{tmp_path / 'running'}\t-",
+        ]
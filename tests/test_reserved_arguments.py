@@ -1,9 +1,14 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, make_dataclass
 
 import pytest
 
-from arggo.core import _check_reserved_arguments
+from arggo.core import (
+    _build_meta_parser,
+    _check_reserved_arguments,
+    _reserved_argument_names,
+)
 from arggo.exceptions import ArggoReservedError
+from arggo.plugin import Plugin, PluginMeta
 
 
 @dataclass
@@ -30,3 +35,32 @@ class TestCheckReservedArguments:
         _check_reserved_arguments(
             UnreservedArguments, override_reserved_arguments=False
         )
+
+
+class TestReservedArgumentNamesCache:
+    def test_is_a_frozenset(self):
+        assert isinstance(_reserved_argument_names(), frozenset)
+
+    def test_cached_until_a_plugin_registers(self, monkeypatch):
+        monkeypatch.setattr(PluginMeta, "registry", list(PluginMeta.registry))
+        monkeypatch.setattr(PluginMeta, "registry_version", PluginMeta.registry_version)
+        before = _build_meta_parser()
+        assert _build_meta_parser() is before
+
+        class ReservingPlugin(Plugin):
+            name = "reserving"
+
+            def parameters_dump(self, parameters):
+                return None
+
+            @classmethod
+            def add_meta_arguments(cls, meta_parser):
+                meta_parser.add_argument("--reserving_flag", action="store_true")
+
+        assert _build_meta_parser() is not before
+        assert "reserving_flag" in _reserved_argument_names()
+        with pytest.raises(ArggoReservedError):
+            _check_reserved_arguments(
+                make_dataclass("Reserving", [("reserving_flag", bool)]),
+                override_reserved_arguments=False,
+            )
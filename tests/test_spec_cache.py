@@ -0,0 +1,117 @@
+from dataclasses import dataclass, field, make_dataclass
+from typing import List, Optional
+
+from arggo._internal.spec_cache import SpecCache, spec_cache_key
+from arggo.dataclass_utils import mapped_field
+from arggo.parser import DataClassArgumentParser
+from tests.test_parser import BasicEnum
+
+
+@dataclass
+class CachedExample:
+    foo: int = 1
+    bar: Optional[float] = None
+    baz: List[str] = field(default_factory=lambda: ["a", "b"])
+    flag: bool = True
+    choice: BasicEnum = BasicEnum.titi
+
+
+def _fail_compile(dtype):
+    raise AssertionError("Expected the spec to be loaded from the cache")
+
+
+class TestSpecCacheKey:
+    def test_stable_for_same_definition(self):
+        assert spec_cache_key(CachedExample) == spec_cache_key(CachedExample)
+
+    def test_changes_with_default(self):
+        first = make_dataclass("Example", [("foo", int, field(default=1))])
+        second = make_dataclass("Example", [("foo", int, field(default=2))])
+        assert spec_cache_key(first) != spec_cache_key(second)
+
+    def test_does_not_call_default_factories(self):
+        def factory():
+            raise AssertionError("Expected the key not to call the default factory")
+
+        example = make_dataclass(
+            "Example", [("foo", List[int], field(default_factory=factory))]
+        )
+        assert spec_cache_key(example) == spec_cache_key(example)
+
+    def test_none_for_defaults_without_a_stable_repr(self):
+        example = make_dataclass("Example", [("foo", object, field(default=object()))])
+        assert spec_cache_key(example) is None
+
+    def test_changes_with_type(self):
+        first = make_dataclass("Example", [("foo", int, field(default=1))])
+        second = make_dataclass("Example", [("foo", float, field(default=1))])
+        assert spec_cache_key(first) != spec_cache_key(second)
+
+
+class TestDataClassArgumentParserSpecCache:
+    def test_warm_start_skips_compilation(self, tmp_path, monkeypatch):
+        DataClassArgumentParser(CachedExample, spec_cache_dir=str(tmp_path))
+
+        monkeypatch.setattr(
+            DataClassArgumentParser,
+            "_compile_dataclass_arguments",
+            staticmethod(_fail_compile),
+        )
+        parser = DataClassArgumentParser(CachedExample, spec_cache_dir=str(tmp_path))
+        (example,) = parser.parse_args_into_dataclasses(
+            ["--foo", "3", "--baz", "x", "--no_flag", "--choice", "toto"]
+        )
+        assert example == CachedExample(
+            foo=3, bar=None, baz=["x"], flag=False, choice=BasicEnum.toto
+        )
+
+    def test_cached_parser_matches_uncached(self, tmp_path):
+        DataClassArgumentParser(CachedExample, spec_cache_dir=str(tmp_path))
+        cached = DataClassArgumentParser(CachedExample, spec_cache_dir=str(tmp_path))
+        uncached = DataClassArgumentParser(CachedExample)
+        assert cached.parse_args([]) == uncached.parse_args([])
+
+    def test_cache_dir_from_environment(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("ARGGO_SPEC_CACHE_DIR", str(tmp_path))
+        DataClassArgumentParser(CachedExample)
+        assert len(list(tmp_path.glob("*.pickle"))) == 1
+
+    def test_unpicklable_spec_is_not_cached(self, tmp_path):
+        @dataclass
+        class Unpicklable:
+            value: int = mapped_field(mapper=lambda s: int(s) * 2, default="1")
+
+        parser = DataClassArgumentParser(Unpicklable, spec_cache_dir=str(tmp_path))
+        assert parser.parse_args_into_dataclasses([])[0].value == 2
+        assert list(tmp_path.iterdir()) == []
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        cache = SpecCache(str(tmp_path))
+        key = spec_cache_key(CachedExample)
+        (tmp_path / f"{key}.pickle").write_bytes(b"not a pickle")
+        assert cache.load(key) is None
+        parser = DataClassArgumentParser(CachedExample, spec_cache_dir=str(tmp_path))
+        assert parser.parse_args_into_dataclasses([])[0] == CachedExample()
+
+    def test_unstable_key_is_not_cached(self, tmp_path):
+        sentinel = object()
+        example = make_dataclass("Example", [("foo", object, field(default=sentinel))])
+        parser = DataClassArgumentParser(example, spec_cache_dir=str(tmp_path))
+        assert parser.parse_args_into_dataclasses([])[0].foo is sentinel
+        assert list(tmp_path.iterdir()) == []
+
+    def test_cached_spec_calls_default_factories_again(self, tmp_path):
+        calls = []
+
+        def factory():
+            calls.append(None)
+            return [len(calls)]
+
+        example = make_dataclass(
+            "Example", [("foo", List[int], field(default_factory=factory))]
+        )
+        first = DataClassArgumentParser(example, spec_cache_dir=str(tmp_path))
+        second = DataClassArgumentParser(example, spec_cache_dir=str(tmp_path))
+        assert len(list(tmp_path.glob("*.pickle"))) == 1
+        assert first.parse_args_into_dataclasses([])[0].foo == [1]
+        assert second.parse_args_into_dataclasses([])[0].foo == [2]
@@ -85,3 +85,27 @@ class TestWandbPlugin:
     def test_parameters_dump_returns_none_when_unavailable(self, monkeypatch):
         monkeypatch.setattr("arggo.integration.wandb.is_wandb_available", lambda: False)
         assert WandbPlugin().parameters_dump({}) is None
+
+    def test_finishes_the_run_it_started(self, monkeypatch):
+        monkeypatch.setattr(
+            wandb, "init", lambda **kwargs: setattr(wandb, "run", _fake_run())
+        )
+        mock_finish = MagicMock()
+        monkeypatch.setattr(wandb, "finish", mock_finish)
+
+        plugin = WandbPlugin()
+        plugin.parameters_dump({})
+        plugin.on_exception("run_dir", RuntimeError())
+        mock_finish.assert_called_once_with(exit_code=1)
+        plugin.on_run_end("run_dir", None)
+        mock_finish.assert_called_once()
+
+    def test_leaves_an_existing_run_alone(self, monkeypatch):
+        monkeypatch.setattr(wandb, "run", _fake_run())
+        mock_finish = MagicMock()
+        monkeypatch.setattr(wandb, "finish", mock_finish)
+
+        plugin = WandbPlugin()
+        plugin.parameters_dump({})
+        plugin.on_run_end("run_dir", None)
+        mock_finish.assert_not_called()
@@ -4,7 +4,12 @@ from os.path import abspath
 import pytest
 
 from arggo._internal.global_store import GlobalStore
-from arggo.environment.workdir import Workdir, DirectoryStrategy
+from arggo.environment.workdir import (
+    DefaultDirectoryStrategy,
+    DirectoryStrategy,
+    Workdir,
+    init_workdir,
+)
 from tests.test_utils import FakeDirectoryStrategy
 
 
@@ -34,3 +39,13 @@ class TestWorkdir:
         workdir.initialize("logs")
         assert abspath(workdir.workdir()) == abspath(strategy.getcwd())
         workdir.revert()
+
+    def test_runs_started_in_the_same_second_get_their_own_directory(
+        self, monkeypatch, tmp_path
+    ):
+        monkeypatch.chdir(tmp_path)
+        first, _ = init_workdir("logs", DefaultDirectoryStrategy(), _template="run")
+        os.chdir(tmp_path)
+        second, _ = init_workdir("logs", DefaultDirectoryStrategy(), _template="run")
+        assert first == str(tmp_path / "logs" / "run")
+        assert second == str(tmp_path / "logs" / "run-1")